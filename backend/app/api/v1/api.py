@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, projects, features, sandbox
+from app.api.v1.endpoints import auth, projects, features, sandbox, metrics
 
 api_router = APIRouter()
 
@@ -7,4 +7,5 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
 api_router.include_router(features.router, prefix="/features", tags=["features"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 # api_router.include_router(sandbox.router, prefix="/sandbox", tags=["sandbox"])
\ No newline at end of file
@@ -0,0 +1,45 @@
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.services.library_service import library_service
+
+router = APIRouter()
+
+GROUP_LABELS = ("provider", "model", "project", "node")
+
+
+def _usage_metrics():
+    """LLM usage registry living in the llm-universal feature."""
+    try:
+        return library_service.import_core_module("llm-universal", "metrics").usage_metrics
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"LLM metrics unavailable: {str(e)}")
+
+
+@router.get("/llm", response_model=Dict[str, Any])
+def get_llm_metrics(
+    project: Optional[str] = Query(None, description="Only series for this project id"),
+    group_by: Optional[str] = Query(None, description="Comma-separated: provider,model,project,node"),
+):
+    """
+    Token, latency, retry and cost accounting per provider/model/project/node.
+    e.g. ?group_by=node for the most expensive nodes, ?group_by=project for budgets.
+    """
+    labels = [label.strip() for label in group_by.split(",") if label.strip()] if group_by else None
+
+    if labels:
+        unknown = [label for label in labels if label not in GROUP_LABELS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown group_by label(s): {', '.join(unknown)}")
+
+    return {"series": _usage_metrics().snapshot(project=project, group_by=labels)}
+
+
+@router.get("/llm/prometheus", response_class=PlainTextResponse)
+def get_llm_metrics_prometheus():
+    """Same metrics in Prometheus text exposition format (for scraping)."""
+    return PlainTextResponse(
+        _usage_metrics().to_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
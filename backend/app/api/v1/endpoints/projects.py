@@ -9,6 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.responses import PlainTextResponse, StreamingResponse
 
 from app.entities.user_entity import User
+from app.core.serialization import encode_arrays
 from app.api.deps import get_db, get_current_user
 from app.entities.project_entity import ProjectEntity
 from app.services.executor_service import GraphExecutor
@@ -61,12 +62,14 @@ def run_project(
         raise HTTPException(status_code=404, detail="Project not found")
 
     try:
-        executor = GraphExecutor(project.graph_json)
+        executor = GraphExecutor(project.graph_json, project_id=project_id)
         # Pass the frontend's injected data to the executor
         results = executor.run(
             entry_node_id=payload.entry_node_id, 
             initial_inputs=payload.inputs
         )
+        # Arrays stay NumPy through execution; encode them only for the response
+        results = encode_arrays(results, payload.vector_encoding)
         # ---  Look for the clean output! ---
         clean_output = None
         for node_id, data in results.items():
@@ -0,0 +1,52 @@
+"""
+Response encoding for graph results.
+
+Nodes keep numeric payloads (embedding vectors, matrices) as NumPy arrays
+inside the execution state; they are only turned into JSON here, at the API
+boundary:
+
+- "list"   (default) nested lists of floats, readable by any client
+- "base64" {"dtype", "shape", "data"} with the raw little-endian bytes in
+           base64 - about 5x smaller than a float list for float32 vectors
+
+Only standard library imports: arrays are recognised by duck typing so this
+module also ships unchanged with packaged projects.
+"""
+
+import base64
+from typing import Any
+
+VECTOR_ENCODINGS = ("list", "base64")
+
+
+def _is_array(value: Any) -> bool:
+    return hasattr(value, "dtype") and hasattr(value, "shape") and hasattr(value, "tobytes")
+
+
+def _encode_array(array: Any, encoding: str) -> Any:
+    if encoding == "base64":
+        # Normalise to little-endian contiguous bytes so clients can decode portably
+        array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+        return {
+            "dtype": array.dtype.name,
+            "shape": list(array.shape),
+            "data": base64.b64encode(array.tobytes(order="C")).decode("ascii")
+        }
+    return array.tolist()
+
+
+def encode_arrays(value: Any, encoding: str = "list") -> Any:
+    """Copy of `value` with every array (at any depth) encoded for JSON."""
+    if encoding not in VECTOR_ENCODINGS:
+        raise ValueError(f"Unsupported vector encoding '{encoding}'. Use one of: {', '.join(VECTOR_ENCODINGS)}")
+
+    if _is_array(value):
+        # 0-d arrays and NumPy scalars become plain numbers
+        if not value.shape:
+            return value.item()
+        return _encode_array(value, encoding)
+    if isinstance(value, dict):
+        return {key: encode_arrays(item, encoding) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_arrays(item, encoding) for item in value]
+    return value
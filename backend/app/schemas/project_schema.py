@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 from pydantic import BaseModel
 
 class ProjectCreate(BaseModel):
@@ -7,4 +7,6 @@ class ProjectCreate(BaseModel):
 
 class RunPayload(BaseModel):
     entry_node_id: Optional[str] = None
-    inputs: Dict[str, Any] = {}
\ No newline at end of file
+    inputs: Dict[str, Any] = {}
+    # How NumPy arrays (e.g. embedding vectors) are encoded in the response
+    vector_encoding: Literal["list", "base64"] = "list"
\ No newline at end of file
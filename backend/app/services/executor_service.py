@@ -3,7 +3,8 @@ from typing import Dict, Any, List
 from app.services.library_service import library_service
 
 class GraphExecutor:
-    def __init__(self, graph_data: Dict[str, Any]):
+    def __init__(self, graph_data: Dict[str, Any], project_id: Any = None):
+        self.project_id = project_id  # attributes LLM usage metrics to the project
         self.nodes = {n['id']: n for n in graph_data.get('nodes', [])}
         self.edges = graph_data.get('edges', [])
         self.execution_state = {} 
@@ -80,7 +81,9 @@ class GraphExecutor:
             
             context = {
                 "execution_mode": "tool_call",
-                "execution_state": self.execution_state
+                "execution_state": self.execution_state,
+                "project_id": self.project_id,
+                "node_id": tool_node_id
             }
             
             result = adapter_module.run(args, context)
@@ -126,7 +129,9 @@ class GraphExecutor:
             
             context = {
                 "execution_state": self.execution_state,
-                "node_config": llm_node['data']
+                "node_config": llm_node['data'],
+                "project_id": self.project_id,
+                "node_id": llm_node_id
             }
             
             result = adapter_module.run(inputs, context)
@@ -172,7 +177,9 @@ class GraphExecutor:
             
             context = {
                 "execution_state": self.execution_state,
-                "node_config": node['data']
+                "node_config": node['data'],
+                "project_id": self.project_id,
+                "node_id": node_id
             }
             
             # AGENT-SPECIFIC SETUP
@@ -99,6 +99,25 @@ class LibraryService:
         print(f" Loaded runtime adapter: {module_name}")
         return module
 
+    def import_core_module(self, key: str, module: str):
+        """
+        Imports library.<feature folder>.core.<module> - the same module object
+        the runtime adapter uses, so process-wide state (e.g. metrics) is shared.
+        """
+        feature = self.get_feature(key)
+        if not feature:
+            raise ValueError(f"Feature '{key}' not found")
+
+        from pathlib import Path
+        import sys, importlib
+
+        project_root = Path(__file__).resolve().parents[2]
+        if str(project_root) not in sys.path:
+            sys.path.insert(0, str(project_root))
+
+        folder = Path(feature.base_path).name
+        return importlib.import_module(f"library.{folder}.core.{module}")
+
 
 # Singleton Instance
 library_service = LibraryService()
\ No newline at end of file
@@ -101,6 +101,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 
 from executor import GraphExecutor
+from serialization import encode_arrays
 from library_service import LibraryService
 
 load_dotenv()
@@ -135,6 +136,7 @@ class RunPayload(BaseModel):
     entry_node_id: str
     inputs: Dict[str, Any]
     session_id: Optional[str] = None
+    vector_encoding: str = "list"   # "list" | "base64"
 
 
 # ── Universal run endpoints ───────────────────────────────────────────────────
@@ -167,6 +169,7 @@ if __name__ == "__main__":
             entry_node_id=payload.entry_node_id,
             initial_inputs=payload.inputs,
         )
+        results = encode_arrays(results, payload.vector_encoding)
 
         for node_id, data in results.items():
             if isinstance(data, dict) and data.get("is_final_output"):
@@ -567,6 +570,7 @@ async def info():
         - executor.py       (GraphExecutor — the orchestration engine)
         - library_service.py (LibraryService — dynamic feature loader)
         - feature_spec.py   (Pydantic models — shared schema)
+        - serialization.py  (response encoding for NumPy results)
         - graph.json        (the user's graph — the "program" being run)
         """
         files = {}
@@ -621,6 +625,16 @@ async def info():
         else:
             print(f"    [BackendGen] WARNING: library_service.py not found at {library_src}")
 
+        # ── serialization.py ──────────────────────────────────────────────────────
+        serialization_src = platform_root / "app" / "core" / "serialization.py"
+
+        if serialization_src.exists():
+            # No rewrites needed — only standard library imports
+            files['backend/serialization.py'] = serialization_src.read_text(encoding="utf-8")
+            print("    [BackendGen] Packaged serialization.py")
+        else:
+            print(f"    [BackendGen] WARNING: serialization.py not found at {serialization_src}")
+
         # ── feature_spec.py ───────────────────────────────────────────────────────
         spec_src = platform_root / "app" / "schemas" / "feature_spec.py"
 
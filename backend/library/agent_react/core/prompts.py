@@ -2,7 +2,8 @@ def build_system_prompt(tools: list) -> str:
     """Build system prompt with available tools"""
 
     tool_descriptions = []
-    for tool in tools:
+    # Deterministic order keeps the prompt prefix identical across runs (provider prompt caching)
+    for tool in sorted(tools, key=lambda t: t['name']):
         tool_desc = f"- {tool['name']}: {tool['description']}"
         if tool.get('parameters'):
             params = ', '.join(tool['parameters'].keys())
@@ -8,6 +8,8 @@ class CodeIndexer:
     
     def __init__(self, workspace_path: str):
         self.workspace_path = Path(workspace_path)
+        # Path + content per indexed file (same order as index['files']), for embedding
+        self.documents: List[str] = []
     
     def index_workspace(self) -> Dict[str, Any]:
         """Index workspace files"""
@@ -37,6 +39,7 @@ class CodeIndexer:
                     'lines': content.count('\n'),
                     'extension': ext
                 })
+                self.documents.append(f"{rel_path}\n{content}")
                 
                 index['extensions'][ext] = index['extensions'].get(ext, 0) + 1
             
@@ -1,32 +1,115 @@
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+# Characters of each file that go into its embedding
+MAX_EMBED_CHARS = 20000
+
+
+def _get_embeddings() -> Optional[Any]:
+    """
+    Embeddings model for code search (CODE_SEARCH_EMBEDDING_PROVIDER, default 'local'),
+    or None when disabled, when the embeddings-universal feature is not available,
+    or when the provider is not configured (e.g. a missing API key).
+    """
+    provider = os.getenv("CODE_SEARCH_EMBEDDING_PROVIDER", "local").lower()
+    if provider in ("", "none", "off"):
+        return None
+
+    try:
+        # Try backend library context
+        from library.embeddings_universal.core.service import get_embeddings_model
+    except ImportError:
+        try:
+            # Try generated app context
+            from features.embeddings_universal.service import get_embeddings_model
+        except ImportError:
+            try:
+                # Try relative import
+                from ...embeddings_universal.core.service import get_embeddings_model
+            except ImportError:
+                print("  [Search] embeddings-universal not available, using keyword search")
+                return None
+
+    try:
+        return get_embeddings_model({"provider": provider})
+    except Exception as e:
+        print(f"  [Search] Embedding provider '{provider}' unavailable ({str(e)}), using keyword search")
+        return None
+
+
+def _embed_query(embeddings: Any, text: str) -> np.ndarray:
+    if hasattr(embeddings, "embed_query_array"):
+        return embeddings.embed_query_array(text)
+    return np.asarray(embeddings.embed_query(text), dtype=np.float32)
+
+
+def embed_files(documents: List[str]) -> Optional[np.ndarray]:
+    """
+    Embed file documents (path + content) into a float32 matrix, or None
+    without embeddings or when the provider fails (the index is then keyword only).
+    """
+    if not documents:
+        return None
+    embeddings = _get_embeddings()
+    if embeddings is None:
+        return None
+
+    texts = [doc[:MAX_EMBED_CHARS] for doc in documents]
+    try:
+        if hasattr(embeddings, "embed_documents_array"):
+            vectors = embeddings.embed_documents_array(texts)
+        else:
+            vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    except Exception as e:
+        print(f"  [Search] Embedding files failed ({str(e)}), indexing for keyword search only")
+        return None
+
+    print(f" [Search] Embedded {len(texts)} files")
+    return vectors
 
 
 class SemanticSearch:
-    """Simple keyword-based search (V1 - no embeddings yet)"""
-    
-    def __init__(self, index: Dict[str, Any]):
+    """File search: embedding similarity when the index has vectors, keyword matching on paths otherwise"""
+
+    def __init__(self, index: Dict[str, Any], vectors: Optional[np.ndarray] = None):
         self.index = index
-    
+        self.vectors = vectors
+
+    def _path_scores(self, query: str) -> np.ndarray:
+        query_words = query.lower().split()
+        return np.array(
+            [sum(1 for word in query_words if word in file_info['path'].lower()) for file_info in self.index.get('files', [])],
+            dtype=np.float32
+        )
+
     def search(self, query: str, max_results: int = 5) -> List[str]:
         """Search for relevant files"""
         print(f"🔍 [Search] Query: {query}")
-        
-        query_lower = query.lower()
-        results = []
-        
-        for file_info in self.index.get('files', []):
-            path = file_info['path']
-            
+
+        files = self.index.get('files', [])
+        path_scores = self._path_scores(query)
+
+        embeddings = _get_embeddings() if self.vectors is not None and len(self.vectors) == len(files) else None
+        query_vector = None
+        if embeddings is not None:
+            try:
+                query_vector = _embed_query(embeddings, query)
+            except Exception as e:
+                print(f"  [Search] Embedding the query failed ({str(e)}), using keyword search")
+
+        if query_vector is not None and query_vector.shape[0] == self.vectors.shape[1]:
+            # Cosine similarity (vectors are normalised), with a small bonus for path matches
+            scores = self.vectors @ query_vector + 0.1 * path_scores
+        else:
             # Simple scoring: check if query words in path
-            score = sum(1 for word in query_lower.split() if word in path.lower())
-            
-            if score > 0:
-                results.append((path, score))
-        
-        # Sort by score
-        results.sort(key=lambda x: x[1], reverse=True)
-        
-        matched = [path for path, score in results[:max_results]]
+            scores = path_scores
+
+        candidates = np.flatnonzero(scores > 0)
+        top = candidates[np.argsort(-scores[candidates], kind="stable")][:max_results]
+
+        matched = [files[i]['path'] for i in top]
         print(f" [Search] Found {len(matched)} files")
-        
-        return matched
\ No newline at end of file
+
+        return matched
@@ -1,9 +1,10 @@
 import os
 import json
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import numpy as np
 from .indexer import CodeIndexer
-from .semantic_search import SemanticSearch
+from .semantic_search import SemanticSearch, embed_files
 from .errors import IndexNotFoundError, IndexingError, SearchError
 
 
@@ -14,6 +15,12 @@ class CodeIntelligenceService:
         self.workspace_path = Path(workspace_path) if workspace_path else Path.cwd()
         self.index_path = Path(index_path) if index_path else self.workspace_path / '.code_index.json'
         self.index = None
+        self.vectors: Optional[np.ndarray] = None
+    
+    @property
+    def vectors_path(self) -> Path:
+        """File embeddings sidecar, rows aligned with index['files']"""
+        return self.index_path.with_name(self.index_path.stem + '.vectors.npy')
     
     def _load_index(self) -> Dict[str, Any]:
         """Load existing index"""
@@ -22,10 +29,21 @@ class CodeIntelligenceService:
                 return json.load(f)
         raise IndexNotFoundError("Index not found. Run 'index' operation first.")
     
-    def _save_index(self, index: Dict[str, Any]):
-        """Save index to disk"""
+    def _load_vectors(self) -> Optional[np.ndarray]:
+        """Load file embeddings (memory-mapped) if the index has them"""
+        if self.vectors_path.exists():
+            return np.load(self.vectors_path, mmap_mode='r')
+        return None
+    
+    def _save_index(self, index: Dict[str, Any], vectors: Optional[np.ndarray] = None):
+        """Save index (and file embeddings) to disk"""
         with open(self.index_path, 'w') as f:
             json.dump(index, f, indent=2)
+        
+        if vectors is not None:
+            np.save(self.vectors_path, vectors)
+        elif self.vectors_path.exists():
+            self.vectors_path.unlink()
     
     def index_workspace(self) -> str:
         """Index the workspace"""
@@ -34,9 +52,11 @@ class CodeIntelligenceService:
         try:
             indexer = CodeIndexer(str(self.workspace_path))
             self.index = indexer.index_workspace()
-            self._save_index(self.index)
+            self.vectors = embed_files(indexer.documents)
+            self._save_index(self.index, self.vectors)
             
-            return f"Indexed {self.index['total_files']} files"
+            mode = "with embeddings" if self.vectors is not None else "keyword only"
+            return f"Indexed {self.index['total_files']} files ({mode})"
         
         except Exception as e:
             raise IndexingError(f"Indexing failed: {e}")
@@ -48,8 +68,9 @@ class CodeIntelligenceService:
         try:
             if not self.index:
                 self.index = self._load_index()
+                self.vectors = self._load_vectors()
             
-            searcher = SemanticSearch(self.index)
+            searcher = SemanticSearch(self.index, self.vectors)
             results = searcher.search(query, max_results)
             
             return results
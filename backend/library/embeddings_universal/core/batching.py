@@ -0,0 +1,159 @@
+"""
+Provider-aware batching for embed_documents.
+
+- Identical texts in one request are embedded once
+- Inputs are split by the provider's per-request item and token limits
+- Batches run concurrently (EMBEDDING_BATCH_CONCURRENCY)
+- A failed batch is retried on its own with exponential backoff
+- Output order always matches input order
+- Batches are written straight into one contiguous float32 matrix
+"""
+
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .errors import EmbeddingError, EmbeddingAuthError, EmbeddingQuotaError
+from .vectors import as_matrix, as_vector, embed_documents_array
+
+# Per-request limits of each provider's embeddings API
+PROVIDER_LIMITS = {
+    "openai": {"max_items": 2048, "max_tokens": 300_000},
+    "azure": {"max_items": 2048, "max_tokens": 300_000},
+    "gemini": {"max_items": 100, "max_tokens": 20_000},
+}
+
+DEFAULT_LIMITS = {"max_items": 100, "max_tokens": 8_000}
+
+
+def get_batch_config(provider: str) -> Dict[str, Any]:
+    """Provider limits, overridable with EMBEDDING_BATCH_MAX_ITEMS / EMBEDDING_BATCH_MAX_TOKENS."""
+    limits = PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS)
+    return {
+        "max_items": int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS") or limits["max_items"]),
+        "max_tokens": int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS") or limits["max_tokens"]),
+        "concurrency": int(os.getenv("EMBEDDING_BATCH_CONCURRENCY", "4")),
+        "max_retries": int(os.getenv("EMBEDDING_BATCH_MAX_RETRIES", "3"))
+    }
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token; a cheap upper-bound style estimate is enough for batching
+    return len(text) // 4 + 1
+
+
+def make_batches(texts: List[str], max_items: int, max_tokens: int) -> List[List[int]]:
+    """Group text indices into batches respecting both limits (an oversized text gets its own batch)."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+
+        current.append(index)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def _is_transient(error: Exception) -> bool:
+    error_str = str(error).lower()
+    markers = ("429", "rate limit", "quota", "timeout", "timed out", "connection", "500", "502", "503", "504", "unavailable")
+    return any(marker in error_str for marker in markers)
+
+
+class BatchingEmbeddings(Embeddings):
+    """Wraps a provider's Embeddings with batching, concurrency and per-batch retries."""
+
+    def __init__(self, inner: Embeddings, provider: str):
+        self.inner = inner
+        self.provider = provider
+        self.conf = get_batch_config(provider)
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        attempt = 1
+
+        while True:
+            try:
+                vectors = embed_documents_array(self.inner, texts)
+                if len(vectors) != len(texts):
+                    raise EmbeddingError(f"Provider returned {len(vectors)} vectors for {len(texts)} texts", self.provider)
+                return vectors
+
+            except Exception as e:
+                if not _is_transient(e) or attempt >= self.conf["max_retries"]:
+                    error_str = str(e).lower()
+                    if "api key" in error_str or "401" in error_str or "unauthorized" in error_str:
+                        raise EmbeddingAuthError(str(e), self.provider)
+                    if "429" in error_str or "quota" in error_str or "rate limit" in error_str:
+                        raise EmbeddingQuotaError(str(e), self.provider)
+                    if isinstance(e, EmbeddingError):
+                        raise
+                    raise EmbeddingError(f"Embedding batch of {len(texts)} failed: {str(e)}", self.provider)
+
+                sleep_time = min(30, 2 ** (attempt - 1)) + random.uniform(0, 1)
+                print(f" [Embeddings] Batch of {len(texts)} failed ({str(e)[:100]}). Retry {attempt}/{self.conf['max_retries'] - 1} in {sleep_time:.2f}s...")
+                time.sleep(sleep_time)
+                attempt += 1
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return as_matrix([])
+
+        # De-duplicate, remembering where each distinct text goes
+        positions: Dict[str, int] = {}
+        unique: List[str] = []
+        for text in texts:
+            if text not in positions:
+                positions[text] = len(unique)
+                unique.append(text)
+
+        batches = make_batches(unique, self.conf["max_items"], self.conf["max_tokens"])
+        # Allocated once the first batch reveals the dimension
+        state: Dict[str, Any] = {"matrix": None}
+        lock = threading.Lock()
+
+        def run(batch: List[int]):
+            vectors = self._embed_batch([unique[i] for i in batch])
+            with lock:
+                if state["matrix"] is None:
+                    state["matrix"] = np.empty((len(unique), vectors.shape[1]), dtype=np.float32)
+            state["matrix"][batch] = vectors
+
+        if len(batches) == 1:
+            run(batches[0])
+        else:
+            workers = max(1, min(self.conf["concurrency"], len(batches)))
+            print(f" [Embeddings] {len(unique)} distinct texts in {len(batches)} batches ({workers} concurrent)")
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed-batch") as pool:
+                # list() re-raises the first batch failure
+                list(pool.map(run, batches))
+
+        matrix = state["matrix"]
+        if len(unique) == len(texts):
+            return matrix
+        return matrix[[positions[text] for text in texts]]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query_array(self, text: str) -> np.ndarray:
+        # Single text - no batching needed, and providers may treat queries differently
+        return as_vector(self.inner.embed_query(text))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.inner.embed_query(text)
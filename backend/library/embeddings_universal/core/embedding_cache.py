@@ -0,0 +1,443 @@
+"""
+Persistent embedding cache keyed by (provider, model, sha256(text)).
+
+Each provider/model gets its own store:
+- <name>.f32       float32 rows (memory-mapped, grows on demand)
+- <name>.idx.npy   compact index: 32-byte digest + row number per entry,
+                   saved in LRU order (least recently used first)
+- <name>.json      dimension and capacity
+
+Entries are evicted least-recently-used once the store exceeds
+EMBEDDING_CACHE_MAX_MB; freed rows are reused for new vectors.
+
+Each store is owned by one process at a time (exclusive lock on
+<name>.lock). A process that finds it locked uses the next free slot
+(<name>.1, <name>.2, ... up to EMBEDDING_CACHE_SLOTS), else a private
+temporary directory.
+
+A row is only overwritten once the index on disk no longer references it,
+so a crash between index flushes never maps a digest to another text's
+vector; rows are evicted in batches to keep those index writes rare.
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .vectors import as_matrix, as_vector, embed_documents_array
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+INDEX_DTYPE = np.dtype([("digest", "S32"), ("row", "<i8")])
+
+# Index is written at most this often (and at exit); vectors are flushed with it
+FLUSH_INTERVAL_SECONDS = 5.0
+
+# Share of the rows evicted at once when the store is full
+EVICT_FRACTION = 1 / 64
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def cache_enabled() -> bool:
+    return os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+
+
+def _cache_dir() -> str:
+    return os.getenv("EMBEDDING_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".ai-builder", "embedding_cache")
+
+
+def _try_lock(path: str) -> Optional[Any]:
+    """Exclusive non-blocking lock on path; the open file holds it, None if another process does"""
+    lock_file = open(path, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+class EmbeddingCacheStore:
+    """Memory-mapped vector store for one provider/model."""
+
+    def __init__(self, path_prefix: str, max_bytes: int, lock_file: Any = None):
+        # Held for the life of the store; released when the process exits
+        self.lock_file = lock_file
+        self.data_path = path_prefix + ".f32"
+        self.index_path = path_prefix + ".idx.npy"
+        self.meta_path = path_prefix + ".json"
+        self.max_bytes = max_bytes
+
+        self.dim: Optional[int] = None
+        self.capacity = 0
+        self._data: Optional[np.memmap] = None
+        self._entries: "OrderedDict[bytes, int]" = OrderedDict()
+        self._free_rows: List[int] = []
+        self._next_row = 0
+        # Rows referenced by the index on disk: not overwritten until it is rewritten
+        self._persisted_rows = set()
+        self._dirty = False
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        if not (os.path.exists(self.meta_path) and os.path.exists(self.index_path) and os.path.exists(self.data_path)):
+            return
+
+        try:
+            with open(self.meta_path, "r") as f:
+                meta = json.load(f)
+            index = np.load(self.index_path)
+
+            self.dim = int(meta["dim"])
+            self.capacity = int(meta["capacity"])
+            self._data = np.memmap(self.data_path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim))
+
+            for digest, row in index:
+                self._entries[bytes(digest)] = int(row)
+
+            used = set(self._entries.values())
+            self._persisted_rows = set(used)
+            self._next_row = max(used) + 1 if used else 0
+            self._free_rows = [row for row in range(self._next_row) if row not in used]
+
+        except Exception as e:
+            print(f" [EmbeddingCache] Discarding unreadable cache {self.data_path}: {str(e)}")
+            self._reset()
+
+    def _reset(self, dim: Optional[int] = None):
+        self._data = None
+        self._entries.clear()
+        self._free_rows = []
+        self._next_row = 0
+        self._persisted_rows = set()
+        self.capacity = 0
+        self.dim = dim
+        for path in (self.data_path, self.index_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self, force: bool = False):
+        if not (self._dirty or force) or self._data is None:
+            return
+
+        self._data.flush()
+
+        index = np.fromiter(
+            ((digest, row) for digest, row in self._entries.items()),
+            dtype=INDEX_DTYPE,
+            count=len(self._entries)
+        )
+        # Atomic replace so a crash never leaves a half-written index
+        tmp_path = self.index_path + ".tmp.npy"
+        np.save(tmp_path, index)
+        os.replace(tmp_path, self.index_path)
+
+        with open(self.meta_path, "w") as f:
+            json.dump({"dim": self.dim, "capacity": self.capacity}, f)
+
+        self._persisted_rows = set(self._entries.values())
+        self._dirty = False
+        self._last_flush = time.time()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @property
+    def _row_bytes(self) -> int:
+        return (self.dim or 0) * 4
+
+    def _max_rows(self) -> int:
+        return max(1, self.max_bytes // self._row_bytes)
+
+    def _grow(self, min_capacity: int):
+        new_capacity = min(self._max_rows(), max(min_capacity, self.capacity * 2, 1024))
+
+        if self._data is not None:
+            self._data.flush()
+            del self._data
+
+        # Extend the file, then map the larger shape
+        with open(self.data_path, "ab") as f:
+            f.truncate(new_capacity * self._row_bytes)
+
+        self._data = np.memmap(self.data_path, dtype=np.float32, mode="r+", shape=(new_capacity, self.dim))
+        self.capacity = new_capacity
+
+    def _allocate_row(self) -> Optional[int]:
+        """A row for a new entry; None if the store is full of entries being written"""
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        # At the size limit: evict a batch of least recently used entries and reuse their rows
+        if self._next_row >= self._max_rows():
+            for _ in range(min(len(self._entries), max(1, int(self._max_rows() * EVICT_FRACTION)))):
+                _, row = self._entries.popitem(last=False)
+                self._free_rows.append(row)
+                self.evictions += 1
+            return self._free_rows.pop() if self._free_rows else None
+
+        if self._next_row >= self.capacity:
+            self._grow(self._next_row + 1)
+
+        row = self._next_row
+        self._next_row += 1
+        return row
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_many(self, digests: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """Cached vectors (float32 copies) or None per digest."""
+        results: List[Optional[np.ndarray]] = []
+
+        with self._lock:
+            for digest in digests:
+                row = self._entries.get(digest)
+                if row is None or self._data is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                results.append(np.array(self._data[row], dtype=np.float32))
+
+        return results
+
+    def gather(self, digests: Sequence[bytes]) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        (matrix, found): an (n, dim) float32 matrix with the cached rows filled
+        in (one gather from the memmap), and a boolean mask of the hits.
+        matrix is None while the store is empty.
+        """
+        rows = np.full(len(digests), -1, dtype=np.int64)
+
+        with self._lock:
+            if self._data is None:
+                self.misses += len(digests)
+                return None, rows >= 0
+
+            for i, digest in enumerate(digests):
+                row = self._entries.get(digest)
+                if row is not None:
+                    self._entries.move_to_end(digest)
+                    rows[i] = row
+
+            found = rows >= 0
+            hits = int(found.sum())
+            self.hits += hits
+            self.misses += len(digests) - hits
+
+            matrix = np.empty((len(digests), self.dim), dtype=np.float32)
+            matrix[found] = self._data[rows[found]]
+
+        return matrix, found
+
+    def put_many(self, digests: Sequence[bytes], vectors: Sequence[Any]):
+        if not digests:
+            return
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            return
+
+        with self._lock:
+            if self.dim != matrix.shape[1]:
+                if self.dim is not None:
+                    print(f" [EmbeddingCache] Dimension changed {self.dim} -> {matrix.shape[1]}, resetting {self.data_path}")
+                self._reset(matrix.shape[1])
+
+            # Entries being rewritten are taken out first so allocation cannot evict them
+            rows: Dict[bytes, int] = {}
+            for digest in digests:
+                row = self._entries.pop(digest, None)
+                if row is not None:
+                    rows[digest] = row
+            allocated = []
+            for digest in digests:
+                if digest not in rows:
+                    row = self._allocate_row()
+                    if row is None:
+                        # Batch larger than the whole store
+                        break
+                    rows[digest] = row
+                    allocated.append(row)
+
+            # Evicted rows are still referenced on disk: drop them from the index before reuse
+            if any(row in self._persisted_rows for row in allocated):
+                self._flush_locked(force=True)
+
+            for digest, vector in zip(digests, matrix):
+                if digest in rows:
+                    self._data[rows[digest]] = vector
+            for digest, row in rows.items():
+                self._entries[digest] = row
+
+            self._dirty = True
+            if time.time() - self._last_flush >= FLUSH_INTERVAL_SECONDS:
+                self._flush_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "dimension": self.dim,
+                "size_mb": round(len(self._entries) * self._row_bytes / (1024 * 1024), 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+
+_stores: Dict[str, EmbeddingCacheStore] = {}
+_stores_lock = threading.Lock()
+
+
+_private_dir: Optional[str] = None
+
+
+def _open_store(name: str, max_bytes: int) -> EmbeddingCacheStore:
+    """The first store slot no other process holds, else one in this process's own directory"""
+    global _private_dir
+    directory = _cache_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    for slot in range(max(1, int(os.getenv("EMBEDDING_CACHE_SLOTS", "4")))):
+        prefix = os.path.join(directory, name if slot == 0 else f"{name}.{slot}")
+        lock_file = _try_lock(prefix + ".lock")
+        if lock_file is not None:
+            return EmbeddingCacheStore(prefix, max_bytes, lock_file)
+
+    if _private_dir is None:
+        # Removed by flush_all at exit
+        _private_dir = tempfile.mkdtemp(prefix="embedding_cache-")
+    print(f"  [EmbeddingCache] All slots of {name} are in use by other processes, caching in {_private_dir}")
+    return EmbeddingCacheStore(os.path.join(_private_dir, name), max_bytes)
+
+
+def get_cache_store(provider: str, model: str) -> EmbeddingCacheStore:
+    """Process-wide store for a provider/model."""
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{provider}__{model}")
+
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is None:
+            max_bytes = int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "512")) * 1024 * 1024)
+            store = _stores[name] = _open_store(name, max_bytes)
+        return store
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _stores_lock:
+        return {name: store.stats() for name, store in _stores.items()}
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends texts without a cached vector to the provider."""
+
+    def __init__(self, inner: Embeddings, provider: str, model: str):
+        self.inner = inner
+        self.provider = provider
+        self.model = model
+        self.store = get_cache_store(provider, model)
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return as_matrix([])
+
+        digests = [text_digest(text) for text in texts]
+        matrix, found = self.store.gather(digests)
+
+        if found.all():
+            return matrix
+
+        # Embed each distinct missing text once
+        missing: Dict[bytes, str] = {}
+        for index in np.flatnonzero(~found):
+            missing.setdefault(digests[index], texts[index])
+
+        print(f" [EmbeddingCache] {int(found.sum())}/{len(texts)} cached, embedding {len(missing)}")
+        new_vectors = embed_documents_array(self.inner, list(missing.values()))
+        self.store.put_many(list(missing.keys()), new_vectors)
+
+        if matrix is None or matrix.shape[1] != new_vectors.shape[1]:
+            # Empty store, or the model's dimension changed (cached rows are stale)
+            if matrix is not None:
+                return embed_documents_array(self.inner, texts)
+            matrix = np.empty((len(texts), new_vectors.shape[1]), dtype=np.float32)
+
+        slot = {digest: i for i, digest in enumerate(missing)}
+        missing_rows = np.flatnonzero(~found)
+        matrix[missing_rows] = new_vectors[[slot[digests[i]] for i in missing_rows]]
+        return matrix
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query_array(self, text: str) -> np.ndarray:
+        digest = text_digest(text)
+        vector = self.store.get_many([digest])[0]
+
+        if vector is None:
+            vector = as_vector(self.inner.embed_query(text))
+            self.store.put_many([digest], [vector])
+
+        return vector
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_query_array(text).tolist()
+
+
+@atexit.register
+def flush_all():
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        try:
+            store.flush()
+        except Exception as e:
+            print(f" [EmbeddingCache] Flush failed: {str(e)}")
+
+    if _private_dir is not None:
+        shutil.rmtree(_private_dir, ignore_errors=True)
@@ -0,0 +1,192 @@
+"""
+Local embeddings: feature hashing with optional TF-IDF weighting.
+
+Runs fully in-process (no network, no model download), so query embeddings
+take well under a millisecond. Quality is lexical rather than semantic, which
+makes it a good fit for latency-critical or air-gapped deployments, code
+search, and as a realistic stand-in for remote providers in tests.
+
+Features per text:
+- words (lowercased), plus the parts of snake_case / camelCase identifiers
+- word n-grams up to EMBEDDING_LOCAL_NGRAMS (default 2)
+
+Each feature is hashed to one of EMBEDDING_LOCAL_DIMENSIONS buckets with a
++/-1 sign (so collisions cancel out instead of piling up). Term frequencies
+are damped (1 + log tf); with EMBEDDING_LOCAL_TFIDF, buckets are also weighted
+by inverse document frequency (persisted to EMBEDDING_LOCAL_IDF_PATH when set).
+The IDF statistics are fitted once, by fit() or else on the first documents
+embedded, and then stay fixed: vectors embedded at different times remain
+comparable, and re-indexing the same documents does not skew the counts.
+Rows are L2-normalised, so dot product equals cosine similarity.
+"""
+
+import os
+import re
+import hashlib
+import threading
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .vectors import as_matrix
+
+DEFAULT_DIMENSIONS = 1024
+
+# Documents vectorised per bincount pass (bounds the dense scratch buffer)
+VECTORIZE_CHUNK = 256
+
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+_PART_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+_SIGN_BIT = np.uint64(1 << 63)
+
+
+@lru_cache(maxsize=262144)
+def _feature_hash(feature: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def extract_features(text: str, ngrams: int = 2) -> List[str]:
+    """Words, identifier parts and word n-grams of a text."""
+    features: List[str] = []
+    words: List[str] = []
+
+    for raw in _WORD_RE.findall(text):
+        word = raw.lower()
+        words.append(word)
+        features.append(word)
+
+        # getUserName / get_user_name -> get, user, name
+        parts = [part.lower() for part in _PART_RE.findall(raw)]
+        if len(parts) > 1:
+            features.extend(parts)
+
+    for n in range(2, ngrams + 1):
+        features.extend(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+
+    return features
+
+
+class HashingIDF:
+    """Document frequencies per hash bucket, replaced as a whole by fit()."""
+
+    def __init__(self, dimensions: int, path: Optional[str] = None):
+        self.path = path
+        self.doc_freq = np.zeros(dimensions, dtype=np.float64)
+        self.num_docs = 0
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            try:
+                with np.load(path) as saved:
+                    if saved["doc_freq"].shape == self.doc_freq.shape:
+                        self.doc_freq = saved["doc_freq"].astype(np.float64)
+                        self.num_docs = int(saved["num_docs"])
+            except Exception as e:
+                print(f" [Embeddings] Ignoring unreadable IDF statistics {path}: {str(e)}")
+
+    @property
+    def fitted(self) -> bool:
+        return self.num_docs > 0
+
+    def fit(self, doc_freq: np.ndarray, num_docs: int):
+        with self._lock:
+            self.doc_freq = doc_freq.astype(np.float64)
+            self.num_docs = num_docs
+
+            if self.path:
+                tmp_path = self.path + ".tmp.npz"
+                np.savez(tmp_path, doc_freq=self.doc_freq, num_docs=self.num_docs)
+                os.replace(tmp_path, self.path)
+
+    def weights(self) -> np.ndarray:
+        with self._lock:
+            # Smoothed idf, as in scikit-learn: log((1 + n) / (1 + df)) + 1
+            return np.log((1.0 + self.num_docs) / (1.0 + self.doc_freq)) + 1.0
+
+
+class LocalHashingEmbeddings(Embeddings):
+    """In-process hashing vectorizer exposed as LangChain Embeddings."""
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS, ngrams: int = 2, tfidf: bool = False, idf_path: Optional[str] = None):
+        self.dimensions = dimensions
+        self.ngrams = max(1, ngrams)
+        self.idf = HashingIDF(dimensions, idf_path) if tfidf else None
+        self._fit_lock = threading.Lock()
+
+    def _counts(self, texts: List[str]) -> np.ndarray:
+        """Signed, hashed term counts: (len(texts), dimensions) float64."""
+        features = [extract_features(text, self.ngrams) for text in texts]
+        lengths = np.fromiter((len(f) for f in features), dtype=np.int64, count=len(features))
+        total = int(lengths.sum())
+
+        hashes = np.fromiter(
+            (_feature_hash(feature) for doc in features for feature in doc),
+            dtype=np.uint64,
+            count=total
+        )
+        buckets = (hashes % np.uint64(self.dimensions)).astype(np.int64)
+        signs = np.where(hashes & _SIGN_BIT, -1.0, 1.0)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        counts = np.bincount(rows * self.dimensions + buckets, weights=signs, minlength=len(texts) * self.dimensions)
+        return counts.reshape(len(texts), self.dimensions)
+
+    def fit(self, texts: List[str]) -> "LocalHashingEmbeddings":
+        """
+        Learn IDF statistics from a corpus, replacing any earlier ones. Vectors
+        embedded before a refit use the old weights, so re-embed them too.
+        """
+        if self.idf is None or not texts:
+            return self
+
+        doc_freq = np.zeros(self.dimensions, dtype=np.float64)
+        for start in range(0, len(texts), VECTORIZE_CHUNK):
+            doc_freq += (self._counts(texts[start:start + VECTORIZE_CHUNK]) != 0).sum(axis=0)
+        self.idf.fit(doc_freq, len(texts))
+        return self
+
+    def _vectorize(self, texts: List[str]) -> np.ndarray:
+        matrix = np.empty((len(texts), self.dimensions), dtype=np.float32)
+
+        for start in range(0, len(texts), VECTORIZE_CHUNK):
+            counts = self._counts(texts[start:start + VECTORIZE_CHUNK])
+
+            # Sublinear term frequency keeps repeated tokens from dominating
+            weighted = np.sign(counts) * np.log1p(np.abs(counts))
+
+            if self.idf is not None:
+                weighted *= self.idf.weights()
+
+            norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+            np.divide(weighted, norms, out=weighted, where=norms > 0)
+            matrix[start:start + len(counts)] = weighted
+
+        return matrix
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return as_matrix([], self.dimensions)
+        if self.idf is not None and not self.idf.fitted:
+            with self._fit_lock:
+                if not self.idf.fitted:
+                    self.fit(texts)
+        return self._vectorize(texts)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query_array(self, text: str) -> np.ndarray:
+        return self._vectorize([text])[0]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_query_array(text).tolist()
+
+    def embed_queries_array(self, texts: List[str]) -> np.ndarray:
+        """Several queries at once; unlike embed_documents, queries never fit IDF statistics."""
+        if not texts:
+            return as_matrix([], self.dimensions)
+        return self._vectorize(texts)
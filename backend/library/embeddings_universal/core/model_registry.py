@@ -0,0 +1,71 @@
+"""
+Registry of embedding model instances.
+
+Building an embeddings client (HTTP session, genai.Client, ...) per call is
+wasteful; instances are reused per resolved configuration instead. The key
+covers everything the client is built from (provider, model, endpoint, a
+fingerprint of the API key, ...), so a configuration change simply resolves
+to a new key. Instances for keys no longer in use age out (LRU).
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+MAX_INSTANCES = 16
+
+
+def fingerprint(secret: Optional[str]) -> str:
+    """Short one-way fingerprint so API keys never sit in registry keys."""
+    return hashlib.sha256((secret or "").encode("utf-8")).hexdigest()[:16]
+
+
+class EmbeddingModelRegistry:
+    """Thread-safe keyed cache of embedding model instances."""
+
+    def __init__(self, max_instances: int = MAX_INSTANCES):
+        self.max_instances = max_instances
+        self._instances: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._build_locks: Dict[Tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: Tuple, factory: Callable[[], Any]) -> Any:
+        """Instance for `key` (key[0] is the provider), built once with `factory()`."""
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is not None:
+                self._instances.move_to_end(key)
+                return instance
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        # Build outside the registry lock so other configurations are not blocked
+        with build_lock:
+            with self._lock:
+                instance = self._instances.get(key)
+            if instance is not None:
+                return instance
+
+            instance = factory()
+
+            with self._lock:
+                self._instances[key] = instance
+                while len(self._instances) > self.max_instances:
+                    stale, _ = self._instances.popitem(last=False)
+                    self._build_locks.pop(stale, None)
+
+            return instance
+
+    def invalidate(self, provider: Optional[str] = None):
+        """Drop cached instances (all, or one provider's), e.g. after rotating keys."""
+        with self._lock:
+            for key in [k for k in self._instances if provider is None or k[0] == provider]:
+                del self._instances[key]
+                self._build_locks.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+
+# Process-wide registry
+embedding_models = EmbeddingModelRegistry()
@@ -1,74 +1,167 @@
 import os
-from typing import Any, List
+from typing import Any, List, Tuple
+import numpy as np
 from langchain_openai import OpenAIEmbeddings, AzureOpenAIEmbeddings
 from .errors import EmbeddingError, EmbeddingAuthError, EmbeddingQuotaError, EmbeddingConfigError
 from .gemini_embeddings import create_gemini_embeddings
+from .local_embeddings import LocalHashingEmbeddings, DEFAULT_DIMENSIONS
+from .embedding_cache import CachedEmbeddings, cache_enabled, get_cache_stats
+from .model_registry import embedding_models, fingerprint
+from .batching import BatchingEmbeddings
+from .vectors import embed_query_array, embed_documents_array
 
 
 def get_embeddings_model(override_config: dict = None) -> Any:
     """
     Factory: Returns a LangChain Embeddings Object.
+    Instances are reused per resolved configuration (thread-safe registry),
+    documents are batched per provider limits, and vectors are served from the persistent embedding cache when possible
+    (EMBEDDING_CACHE_ENABLED), so unchanged texts are never re-embedded.
     """
+    provider, settings, use_cache, key = _resolve_model(override_config)
+    
+    def build():
+        if provider == "local":
+            # In-process and cheaper than a cache lookup; nothing to batch or retry
+            return _create_embeddings_model(provider, settings)
+        
+        embeddings = BatchingEmbeddings(_create_embeddings_model(provider, settings), provider)
+        if use_cache:
+            return CachedEmbeddings(embeddings, provider, settings["model"])
+        return embeddings
+    
+    return embedding_models.get_or_create(key, build)
+
+
+def get_embeddings_key(override_config: dict = None) -> Tuple:
+    """
+    Registry key of the model get_embeddings_model() returns for this
+    configuration: provider and every resolved client setting (API keys
+    fingerprinted). Vectors from two calls are interchangeable when their keys match,
+    so callers caching vectors can key them by it.
+    """
+    return _resolve_model(override_config)[3]
+
+
+def _resolve_model(override_config: dict = None) -> tuple:
+    """(provider, settings, use_cache, registry key) for a configuration"""
     config = override_config or {}
     provider = config.get("provider") or os.getenv("EMBEDDING_PROVIDER", "openai").lower()
     
+    settings = _resolve_settings(provider, config)
+    use_cache = cache_enabled()
+    
+    # Everything the client is built from; any config change yields a new key
+    key = (provider, use_cache) + tuple(
+        (name, fingerprint(value) if name == "api_key" else value)
+        for name, value in sorted(settings.items())
+    )
+    return provider, settings, use_cache, key
+
+
+def invalidate_embeddings_models(provider: str = None):
+    """Forget cached model instances (e.g. after rotating API keys in-process)."""
+    embedding_models.invalidate(provider)
+
+
+def _resolve_settings(provider: str, config: dict) -> dict:
+    """Effective client settings (overrides > env > defaults). 'model' is the model or deployment name."""
+    if provider == "openai":
+        api_key = config.get("api_key") or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise EmbeddingConfigError("Missing OPENAI_API_KEY", provider)
+        
+        return {
+            "api_key": api_key,
+            "model": config.get("model") or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+        }
+    
+    elif provider == "azure":
+        api_key = config.get("api_key") or os.getenv("AZURE_OPENAI_API_KEY")
+        endpoint = config.get("endpoint") or os.getenv("AZURE_OPENAI_ENDPOINT")
+        deployment = config.get("deployment") or os.getenv("AZURE_EMBEDDING_DEPLOYMENT")
+        
+        if not all([api_key, endpoint, deployment]):
+            raise EmbeddingConfigError(
+                "Missing required Azure config: AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT, AZURE_EMBEDDING_DEPLOYMENT",
+                provider
+            )
+        
+        return {
+            "api_key": api_key,
+            "endpoint": endpoint,
+            "model": deployment,
+            "api_version": os.getenv("AZURE_API_VERSION", "2023-05-15")
+        }
+    
+    elif provider == "gemini":
+        api_key = config.get("api_key") or os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise EmbeddingConfigError("Missing GOOGLE_API_KEY", provider)
+        
+        model = config.get("model") or os.getenv("EMBEDDING_MODEL", "gemini-embedding-001")
+        
+        # Clean model name (remove models/ prefix if present)
+        if model.startswith("models/"):
+            model = model.replace("models/", "")
+        
+        return {"api_key": api_key, "model": model}
+    
+    elif provider == "local":
+        dimensions = int(config.get("dimensions") or os.getenv("EMBEDDING_LOCAL_DIMENSIONS", str(DEFAULT_DIMENSIONS)))
+        ngrams = int(config.get("ngrams") or os.getenv("EMBEDDING_LOCAL_NGRAMS", "2"))
+        tfidf = str(config.get("tfidf", os.getenv("EMBEDDING_LOCAL_TFIDF", "false"))).lower() == "true"
+        
+        if dimensions <= 0:
+            raise EmbeddingConfigError(f"EMBEDDING_LOCAL_DIMENSIONS must be positive, got {dimensions}", provider)
+        
+        return {
+            "model": f"{'tfidf' if tfidf else 'hashing'}-{dimensions}-ng{ngrams}",
+            "dimensions": dimensions,
+            "ngrams": ngrams,
+            "tfidf": tfidf,
+            "idf_path": os.getenv("EMBEDDING_LOCAL_IDF_PATH") if tfidf else None
+        }
+    
+    else:
+        raise EmbeddingConfigError(f"Unsupported provider: {provider}. Use 'openai', 'azure', 'gemini', or 'local'", provider)
+
+
+def _create_embeddings_model(provider: str, settings: dict) -> Any:
+    """Build the LangChain Embeddings object for resolved settings."""
     print(f" [Embeddings] Initializing provider: {provider}")
     
     try:
         if provider == "openai":
-            api_key = config.get("api_key") or os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                raise EmbeddingConfigError("Missing OPENAI_API_KEY", provider)
-            
-            model = config.get("model") or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
-            
             return OpenAIEmbeddings(
-                api_key=api_key,
-                model=model
+                api_key=settings["api_key"],
+                model=settings["model"]
             )
         
         elif provider == "azure":
-            api_key = config.get("api_key") or os.getenv("AZURE_OPENAI_API_KEY")
-            endpoint = config.get("endpoint") or os.getenv("AZURE_OPENAI_ENDPOINT")
-            deployment = config.get("deployment") or os.getenv("AZURE_EMBEDDING_DEPLOYMENT")
-            
-            if not all([api_key, endpoint, deployment]):
-                raise EmbeddingConfigError(
-                    "Missing required Azure config: AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT, AZURE_EMBEDDING_DEPLOYMENT",
-                    provider
-                )
-            
             return AzureOpenAIEmbeddings(
-                azure_deployment=deployment,
-                openai_api_version=os.getenv("AZURE_API_VERSION", "2023-05-15"),
-                azure_endpoint=endpoint,
-                api_key=api_key
+                azure_deployment=settings["model"],
+                openai_api_version=settings["api_version"],
+                azure_endpoint=settings["endpoint"],
+                api_key=settings["api_key"]
             )
         
-        elif provider == "gemini":
-            api_key = config.get("api_key") or os.getenv("GOOGLE_API_KEY")
-            if not api_key:
-                raise EmbeddingConfigError("Missing GOOGLE_API_KEY", provider)
-            
+        elif provider == "local":
+            return LocalHashingEmbeddings(
+                dimensions=settings["dimensions"],
+                ngrams=settings["ngrams"],
+                tfidf=settings["tfidf"],
+                idf_path=settings["idf_path"]
+            )
+        
+        else:
             # Use custom Gemini embeddings with new SDK
-            model = config.get("model") or os.getenv("EMBEDDING_MODEL", "gemini-embedding-001")
-            
-            # Clean model name (remove models/ prefix if present)
-            if model.startswith("models/"):
-                model = model.replace("models/", "")
-            
-            print(f"🔍 [Embeddings] Using Gemini model: {model}")
+            print(f"🔍 [Embeddings] Using Gemini model: {settings['model']}")
             
             return create_gemini_embeddings(
-                api_key=api_key,
-                model=model
+                api_key=settings["api_key"],
+                model=settings["model"]
             )
-        
-        else:
-            raise EmbeddingConfigError(f"Unsupported provider: {provider}. Use 'openai', 'azure', or 'gemini'", provider)
-    
-    except EmbeddingConfigError:
-        raise
     
     except Exception as e:
         error_str = str(e).lower()
@@ -82,7 +175,7 @@ def get_embeddings_model(override_config: dict = None) -> Any:
             raise EmbeddingError(f"Failed to initialize embeddings: {str(e)}", provider)
 
 
-def embed_text(text: str, override_config: dict = None) -> List[float]:
+def embed_text(text: str, override_config: dict = None) -> np.ndarray:
     """
     Embed a single text string.
     
@@ -91,11 +184,11 @@ def embed_text(text: str, override_config: dict = None) -> List[float]:
         override_config: Optional config overrides
         
     Returns:
-        List of floats (embedding vector)
+        Embedding vector as a contiguous float32 array of shape (dimension,)
     """
     try:
         embeddings = get_embeddings_model(override_config)
-        vector = embeddings.embed_query(text)
+        vector = embed_query_array(embeddings, text)
         print(f" [Embeddings] Generated vector of dimension {len(vector)}")
         return vector
     
@@ -104,7 +197,7 @@ def embed_text(text: str, override_config: dict = None) -> List[float]:
         raise
 
 
-def embed_documents(texts: List[str], override_config: dict = None) -> List[List[float]]:
+def embed_documents(texts: List[str], override_config: dict = None) -> np.ndarray:
     """
     Embed multiple text strings (batch operation).
     
@@ -113,11 +206,11 @@ def embed_documents(texts: List[str], override_config: dict = None) -> List[List
         override_config: Optional config overrides
         
     Returns:
-        List of embedding vectors
+        Contiguous float32 matrix of shape (len(texts), dimension)
     """
     try:
         embeddings = get_embeddings_model(override_config)
-        vectors = embeddings.embed_documents(texts)
+        vectors = embed_documents_array(embeddings, texts)
         print(f" [Embeddings] Generated {len(vectors)} vectors")
         return vectors
     
@@ -136,6 +229,8 @@ def get_provider_info() -> dict:
         "available": {
             "openai": bool(os.getenv("OPENAI_API_KEY")),
             "azure": bool(os.getenv("AZURE_OPENAI_API_KEY") and os.getenv("AZURE_OPENAI_ENDPOINT")),
-            "gemini": bool(os.getenv("GOOGLE_API_KEY"))
-        }
+            "gemini": bool(os.getenv("GOOGLE_API_KEY")),
+            "local": True
+        },
+        "cache": get_cache_stats()
     }
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+Vector representation helpers.
+
+Embeddings travel through the pipeline as contiguous float32 NumPy arrays
+(4 bytes per component, one buffer per batch) rather than lists of Python
+floats; conversion to JSON happens only at the API boundary.
+"""
+
+from typing import Any, List
+
+import numpy as np
+
+
+def as_vector(vector: Any) -> np.ndarray:
+    """Contiguous float32 1-D array (no copy when it already is one)."""
+    return np.ascontiguousarray(vector, dtype=np.float32).reshape(-1)
+
+
+def as_matrix(vectors: Any, dim: int = 0) -> np.ndarray:
+    """Contiguous float32 (n, dim) array (no copy when it already is one)."""
+    if len(vectors) == 0:
+        return np.empty((0, dim), dtype=np.float32)
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2-D batch of vectors, got shape {matrix.shape}")
+    return matrix
+
+
+def embed_documents_array(embeddings: Any, texts: List[str]) -> np.ndarray:
+    """Embed texts into an (n, dim) float32 matrix, using the array path when the model has one."""
+    if hasattr(embeddings, "embed_documents_array"):
+        return embeddings.embed_documents_array(texts)
+    return as_matrix(embeddings.embed_documents(texts))
+
+
+def embed_query_array(embeddings: Any, text: str) -> np.ndarray:
+    """Embed one text into a (dim,) float32 vector."""
+    if hasattr(embeddings, "embed_query_array"):
+        return embeddings.embed_query_array(text)
+    return as_vector(embeddings.embed_query(text))
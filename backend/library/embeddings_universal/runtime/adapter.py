@@ -25,6 +25,8 @@ def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         override_config["provider"] = node_config["provider"]
     if "model" in node_config:
         override_config["model"] = node_config["model"]
+    if "dimensions" in node_config:
+        override_config["dimensions"] = node_config["dimensions"]
 
     
     try:
@@ -36,8 +38,9 @@ def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
             vector = embed_text(text, override_config)
             
             return {
+                # float32 ndarray; encoded to JSON only at the API boundary
                 "vector": vector,
-                "dimension": len(vector),
+                "dimension": int(vector.shape[0]),
                 "success": True,
                 "provider": override_config.get("provider", "default")
             }
@@ -50,9 +53,10 @@ def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
             vectors = embed_documents(texts, override_config)
             
             return {
+                # (count, dimension) float32 ndarray
                 "vectors": vectors,
-                "count": len(vectors),
-                "dimension": len(vectors[0]) if vectors else 0,
+                "count": int(vectors.shape[0]),
+                "dimension": int(vectors.shape[1]),
                 "success": True,
                 "provider": override_config.get("provider", "default")
             }
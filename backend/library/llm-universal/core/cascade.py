@@ -0,0 +1,173 @@
+"""
+Model cascade: cheap model first, escalate on demand.
+
+Requests are classified by declared difficulty, node type and prompt size.
+Easy ones go to a small, fast model (LLM_CASCADE_SMALL_MODEL); the answer is
+then checked and the request escalates to the configured (large) model if
+- the small model failed,
+- the answer breaks the expected format (ReAct TOOL:/ANSWER: protocol), or
+- the answer is empty or signals low confidence.
+"""
+
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import LLMConfig
+from .utils import count_tokens
+from .errors import LLMError
+
+SMALL = "small"
+LARGE = "large"
+
+# Phrases that suggest the small model was out of its depth
+UNCERTAIN_PATTERNS = re.compile(
+    r"\b(i\s*(?:am|'m)\s*not\s*(?:sure|certain)|i\s*(?:do\s*not|don't)\s*know|"
+    r"i\s*cannot\s*(?:determine|answer)|i\s*can't\s*(?:determine|answer)|unable\s*to\s*(?:determine|answer))\b",
+    re.IGNORECASE
+)
+
+REACT_FORMAT = re.compile(r"^\s*(TOOL:|ANSWER:)", re.IGNORECASE)
+
+_stats = {"small": 0, "large": 0, "escalated": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def get_cascade_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    served_small = stats["small"] - stats["escalated"]
+    total = stats["small"] + stats["large"]
+    stats["small_ratio"] = round(served_small / total, 4) if total else 0.0
+    return stats
+
+
+def expects_react_format(messages: List[Dict[str, Any]]) -> bool:
+    """ReAct agents instruct the model to answer with TOOL: or ANSWER:."""
+    return any(m.get("role") == "system" and "ANSWER:" in m.get("content", "") for m in messages)
+
+
+def check_response(content: str, messages: List[Dict[str, Any]], escalate_on_uncertain: bool = True) -> Optional[str]:
+    """Reason to escalate, or None if the small model's answer is acceptable."""
+    if not content or not content.strip():
+        return "empty response"
+
+    if expects_react_format(messages) and not REACT_FORMAT.search(content):
+        return "format check failed (no TOOL:/ANSWER:)"
+
+    if escalate_on_uncertain and UNCERTAIN_PATTERNS.search(content[:500]):
+        return "low confidence"
+
+    return None
+
+
+class CascadeRouter:
+    """Chooses between the small and the large model for one request."""
+
+    def __init__(self, large_config: Dict[str, Any], cascade_conf: Optional[Dict[str, Any]] = None):
+        cascade_conf = cascade_conf or LLMConfig.get_cascade_config()
+
+        self.large_config = large_config
+        self.conf = cascade_conf
+        self.small_config = self._build_small_config(large_config, cascade_conf)
+
+    @staticmethod
+    def _build_small_config(large_config: Dict[str, Any], conf: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not conf["small_model"]:
+            return None
+
+        provider = conf["small_provider"] or large_config["provider"]
+
+        if provider == large_config["provider"]:
+            config = dict(large_config)
+        else:
+            try:
+                config = LLMConfig.get_provider_config(provider, conf["small_model"])
+            except ValueError as e:
+                print(f" [Cascade] Small model disabled: {str(e)}")
+                return None
+            for key in ("temperature", "max_tokens", "timeout", "context_strategy"):
+                if key in large_config:
+                    config[key] = large_config[key]
+
+        if provider == "azure":
+            config["deployment_name"] = conf["small_model"]
+            config.pop("deployments", None)  # A named deployment, not the AZURE_DEPLOYMENTS pool
+        else:
+            config["model"] = conf["small_model"]
+
+        if config.get("model") == large_config.get("model") and config.get("deployment_name") == large_config.get("deployment_name") \
+                and config["provider"] == large_config["provider"]:
+            return None  # Small model is the large model - nothing to cascade
+
+        return config
+
+    @property
+    def active(self) -> bool:
+        return bool(self.conf["enabled"] and self.small_config)
+
+    def classify(self, messages: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Returns (tier, reason) from declared difficulty, node type and prompt size."""
+        difficulty = str(self.large_config.get("difficulty") or "").lower()
+        node_type = self.large_config.get("node_type") or ""
+
+        if difficulty == "hard":
+            return LARGE, "declared hard"
+        if difficulty == "easy":
+            return SMALL, "declared easy"
+
+        if node_type and node_type in self.conf["large_node_types"]:
+            return LARGE, f"node type '{node_type}'"
+
+        tokens = count_tokens(messages, self.small_config.get("model") or "gpt-4")
+        if tokens > self.conf["max_small_tokens"]:
+            return LARGE, f"{tokens} prompt tokens > {self.conf['max_small_tokens']}"
+
+        return SMALL, f"{tokens} prompt tokens"
+
+    def select(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pick a config without answer checks (used for streaming)."""
+        if not self.active:
+            return self.large_config
+
+        tier, reason = self.classify(messages)
+        _count(tier)
+        print(f" [Cascade] {tier} model ({reason}), no escalation for streams")
+        return self.small_config if tier == SMALL else self.large_config
+
+    def run(self, messages: List[Dict[str, Any]], execute: Callable[[Dict[str, Any], List[Dict[str, Any]]], str]) -> str:
+        """
+        Execute with `execute(config, messages)`, escalating from the small to the
+        large model when the answer check fails.
+        """
+        if not self.active:
+            return execute(self.large_config, messages)
+
+        tier, reason = self.classify(messages)
+        _count(tier)
+
+        if tier == LARGE:
+            print(f" [Cascade] large model ({reason})")
+            return execute(self.large_config, messages)
+
+        small_model = self.small_config.get("model") or self.small_config.get("deployment_name")
+        print(f" [Cascade] small model {small_model} ({reason})")
+
+        try:
+            content = execute(self.small_config, messages)
+            escalate_reason = check_response(content, messages, self.conf["escalate_on_uncertain"])
+        except LLMError as e:
+            escalate_reason = f"small model failed ({type(e).__name__})"
+
+        if escalate_reason is None:
+            return content
+
+        _count("escalated")
+        large_model = self.large_config.get("model") or self.large_config.get("deployment_name")
+        print(f" [Cascade] Escalating to {large_model}: {escalate_reason}")
+        return execute(self.large_config, messages)
@@ -0,0 +1,157 @@
+"""
+Record / replay of LLM exchanges.
+
+LLM_CASSETTE_MODE=record wraps the real provider and appends every exchange
+(messages, response, token usage, timings) to LLM_CASSETTE_PATH as JSONL.
+LLM_CASSETTE_MODE=replay lets the `mock` provider answer from that file
+offline, with the recorded latency.
+
+Exchanges are keyed by the conversation only (role + content), so a cassette
+recorded against OpenAI replays regardless of the provider/model configured.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from .providers.base import BaseLLMProvider, LLMResponse
+
+
+def cassette_mode() -> str:
+    return os.getenv("LLM_CASSETTE_MODE", "off").lower()
+
+
+def cassette_path() -> str:
+    return os.getenv("LLM_CASSETTE_PATH", os.path.join("cassettes", "llm.jsonl"))
+
+
+def exchange_key(messages: List[Dict[str, Any]]) -> str:
+    normalized = [{"role": m.get("role", "user"), "content": m.get("content", "")} for m in messages]
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Append-only JSONL file of recorded exchanges."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._replay_position: Dict[str, int] = {}
+        self._loaded_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """(Re)load the file if it changed on disk."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+
+        if mtime == self._loaded_mtime:
+            return
+
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                entries.setdefault(entry["key"], []).append(entry)
+
+        self._entries = entries
+        self._replay_position = {}
+        self._loaded_mtime = mtime
+
+    def find(self, messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Recorded exchange for this conversation (repeated calls cycle through recordings)."""
+        key = exchange_key(messages)
+        with self._lock:
+            self._load()
+            recordings = self._entries.get(key)
+            if not recordings:
+                return None
+
+            position = self._replay_position.get(key, 0)
+            self._replay_position[key] = position + 1
+            return recordings[position % len(recordings)]
+
+    def record(self, messages: List[Dict[str, Any]], entry: Dict[str, Any]):
+        entry = {
+            "key": exchange_key(messages),
+            "messages": [{"role": m.get("role", "user"), "content": m.get("content", "")} for m in messages],
+            **entry
+        }
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: Optional[str] = None) -> Cassette:
+    path = path or cassette_path()
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path]
+
+
+class RecordingProvider(BaseLLMProvider):
+    """Wraps a real provider and records its exchanges into a cassette."""
+
+    def __init__(self, inner: BaseLLMProvider, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        super().__init__(inner.config)
+
+    def validate_config(self):
+        pass  # The wrapped provider already validated its config
+
+    def _model(self) -> Optional[str]:
+        return self.config.get("model") or self.config.get("deployment_name")
+
+    def chat(self, messages: List[Dict[str, str]]) -> LLMResponse:
+        start = time.time()
+        response = self.inner.chat(messages)
+
+        self.cassette.record(messages, {
+            "provider": self.config.get("provider"),
+            "model": self._model(),
+            "response": response.content,
+            "token_usage": response.token_usage,
+            "latency": round(time.time() - start, 4)
+        })
+        return response
+
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        start = time.time()
+        first_token_latency = None
+        chunks = []
+
+        for chunk in self.inner.stream(messages):
+            if first_token_latency is None:
+                first_token_latency = time.time() - start
+            chunks.append(chunk)
+            yield chunk
+
+        # Only complete streams are recorded
+        self.cassette.record(messages, {
+            "provider": self.config.get("provider"),
+            "model": self._model(),
+            "response": "".join(chunks),
+            "token_usage": {},
+            "latency": round(time.time() - start, 4),
+            "first_token_latency": round(first_token_latency or 0.0, 4)
+        })
+
+    def estimate_cost(self, input_tokens: int, output_tokens: int) -> float:
+        return self.inner.estimate_cost(input_tokens, output_tokens)
@@ -1,5 +1,6 @@
 import os
-from typing import Dict, Any
+import json
+from typing import Dict, Any, List, Optional
 
 class LLMConfig:
     """
@@ -8,16 +9,24 @@ class LLMConfig:
     """
     
     @staticmethod
-    def get_provider_config() -> Dict[str, Any]:
+    def get_provider_config(provider: Optional[str] = None, model: Optional[str] = None) -> Dict[str, Any]:
         """
         Returns a clean dictionary of config values based on the active provider.
         Validates that required fields are present.
+        
+        Passing `provider` builds the config for that provider instead of LLM_PROVIDER
+        (used for fallback/hedge targets). LLM_MODEL is then not inherited, since it
+        names a model of the primary provider.
         """
-        provider = os.getenv("LLM_PROVIDER", "openai").lower()
+        if provider:
+            provider = provider.lower()
+        else:
+            provider = os.getenv("LLM_PROVIDER", "openai").lower()
+            model = model or os.getenv("LLM_MODEL")
         
         base_config = {
             "provider": provider,
-            "model": os.getenv("LLM_MODEL"),
+            "model": model,
             "temperature": float(os.getenv("LLM_TEMPERATURE", "0.7")),
             "max_tokens": int(os.getenv("LLM_MAX_TOKENS", "2000")),
             "timeout": int(os.getenv("LLM_TIMEOUT", "60"))
@@ -35,6 +44,15 @@ class LLMConfig:
             base_config["deployment_name"] = os.getenv("AZURE_DEPLOYMENT_NAME")
             base_config["api_version"] = os.getenv("AZURE_API_VERSION", "2023-05-15")
             
+            # Optional pool of endpoint/deployment pairs (load balanced by the provider)
+            deployments = LLMConfig.get_azure_deployments()
+            if deployments:
+                base_config["deployments"] = deployments
+                base_config["deployment_cooldown"] = float(os.getenv("AZURE_DEPLOYMENT_COOLDOWN_SECONDS", "30"))
+                base_config["endpoint"] = base_config["endpoint"] or deployments[0]["endpoint"]
+                base_config["deployment_name"] = base_config["deployment_name"] or deployments[0]["deployment"]
+                base_config["api_key"] = base_config["api_key"] or deployments[0].get("api_key")
+            
         elif provider == "gemini":
             base_config["api_key"] = os.getenv("GOOGLE_API_KEY")
             if not base_config["model"]:
@@ -45,6 +63,12 @@ class LLMConfig:
             if not base_config["model"]:
                 base_config["model"] = "claude-3-sonnet-20240229"
         
+        elif provider == "mock":
+            # Offline provider, no credentials needed
+            base_config["api_key"] = "mock"
+            if not base_config["model"]:
+                base_config["model"] = "mock-1"
+        
         # Validate configuration
         LLMConfig._validate_config(base_config, provider)
         
@@ -110,4 +134,116 @@ class LLMConfig:
             "max_attempts": int(os.getenv("LLM_MAX_RETRIES", "3")),
             "min_seconds": int(os.getenv("LLM_RETRY_MIN_SECONDS", "1")),
             "max_seconds": int(os.getenv("LLM_RETRY_MAX_SECONDS", "10"))
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def get_rate_limit_config(provider: str, model: str) -> Dict[str, Any]:
+        """
+        Get client-side rate limit budgets for a provider/model.
+        LLM_RATE_LIMITS may hold per-model overrides as JSON, e.g.
+        {"openai:gpt-4o": {"rpm": 500, "tpm": 30000}, "gemini": {"rpm": 15}}
+        """
+        conf = {
+            "rpm": int(os.getenv("LLM_RPM_LIMIT", "0")),
+            "tpm": int(os.getenv("LLM_TPM_LIMIT", "0")),
+            "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            "min_concurrency": int(os.getenv("LLM_MIN_CONCURRENCY", "1")),
+            "target_latency": float(os.getenv("LLM_TARGET_LATENCY_SECONDS", "0")),
+            "max_wait": float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", "60")),
+            "backend": os.getenv("LLM_RATE_LIMIT_BACKEND", "memory").lower(),
+            "directory": os.getenv(
+                "LLM_RATE_LIMIT_DIR",
+                os.path.join(os.path.expanduser("~"), ".ai-builder", "rate_limits")
+            ),
+            "redis_url": os.getenv("LLM_RATE_LIMIT_REDIS_URL")
+        }
+
+        overrides = os.getenv("LLM_RATE_LIMITS")
+        if overrides:
+            try:
+                per_model = json.loads(overrides)
+            except ValueError:
+                raise ValueError(f"LLM_RATE_LIMITS must be valid JSON, got: {overrides}")
+
+            # Provider-wide settings first, then the more specific provider:model
+            conf.update(per_model.get(provider, {}))
+            conf.update(per_model.get(f"{provider}:{model}", {}))
+
+        return conf
+
+
+    @staticmethod
+    def get_routing_config() -> Dict[str, Any]:
+        """
+        Get fallback / hedging configuration.
+        LLM_FALLBACK_PROVIDERS is a comma separated list of 'provider' or
+        'provider:model' entries (for azure the model is the deployment name).
+        """
+        fallbacks: List[Dict[str, Optional[str]]] = []
+        for entry in os.getenv("LLM_FALLBACK_PROVIDERS", "").split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            provider, _, model = entry.partition(":")
+            fallbacks.append({"provider": provider.strip().lower(), "model": model.strip() or None})
+
+        return {
+            "fallbacks": fallbacks,
+            "hedge_enabled": os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true",
+            "hedge_percentile": float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")),
+            "hedge_min_delay": float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "0.5")),
+            "hedge_default_delay": float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "3.0")),
+            "hedge_min_samples": int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        }
+
+
+    @staticmethod
+    def get_cascade_config() -> Dict[str, Any]:
+        """
+        Get model cascade configuration.
+        LLM_CASCADE_SMALL_MODEL is 'model' (same provider as the primary)
+        or 'provider:model' (for azure the model is the deployment name).
+        Only the first ':' separates the provider, so model names may
+        contain colons (e.g. 'ollama:llama3:8b').
+        """
+        small_provider, separator, small_model = os.getenv("LLM_CASCADE_SMALL_MODEL", "").strip().partition(":")
+        if not separator:
+            small_provider, small_model = "", small_provider
+
+        return {
+            "enabled": os.getenv("LLM_CASCADE_ENABLED", "false").lower() == "true",
+            "small_provider": small_provider.strip().lower() or None,
+            "small_model": small_model.strip() or None,
+            "max_small_tokens": int(os.getenv("LLM_CASCADE_MAX_SMALL_TOKENS", "4000")),
+            "large_node_types": [
+                t.strip() for t in os.getenv("LLM_CASCADE_LARGE_NODE_TYPES", "").split(",") if t.strip()
+            ],
+            "escalate_on_uncertain": os.getenv("LLM_CASCADE_ESCALATE_ON_UNCERTAIN", "true").lower() == "true"
+        }
+
+
+    @staticmethod
+    def get_azure_deployments() -> List[Dict[str, Any]]:
+        """
+        Parse AZURE_DEPLOYMENTS, a JSON list of endpoint/deployment pairs, e.g.
+        [{"endpoint": "https://eu.openai.azure.com", "deployment": "gpt4", "weight": 2},
+         {"endpoint": "https://us.openai.azure.com", "deployment": "gpt4", "api_key": "..."}]
+        api_key / api_version default to AZURE_OPENAI_API_KEY / AZURE_API_VERSION.
+        """
+        raw = os.getenv("AZURE_DEPLOYMENTS")
+        if not raw:
+            return []
+
+        try:
+            entries = json.loads(raw)
+        except ValueError:
+            raise ValueError(f"AZURE_DEPLOYMENTS must be valid JSON, got: {raw}")
+
+        if not isinstance(entries, list):
+            raise ValueError("AZURE_DEPLOYMENTS must be a JSON list of {endpoint, deployment, weight} objects")
+
+        for entry in entries:
+            if not entry.get("endpoint") or not entry.get("deployment"):
+                raise ValueError(f"AZURE_DEPLOYMENTS entry needs 'endpoint' and 'deployment': {entry}")
+
+        return entries
@@ -0,0 +1,235 @@
+"""
+Context window management.
+
+Instead of rejecting prompts that do not fit the model, compact them with a
+configurable strategy:
+- drop_oldest:      drop the oldest conversation turns
+- truncate_context: drop the least relevant RAG context sections
+- summarize:        replace older history with a summary from a cheap model
+
+Messages carrying RAG context mark it with a "rag_context" key holding the
+raw context string (providers only read "role" and "content").
+"""
+
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from .utils import count_tokens
+from .errors import ContextWindowError
+
+# Context window sizes in tokens. Matched by substring, longest key first,
+# so versioned names such as gpt-4o-2024-08-06 resolve correctly.
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-4-1106": 128_000,
+    "gpt-4-0125": 128_000,
+    "gpt-4-32k": 32_768,
+    "gpt-4": 8_192,
+    "gpt-35-turbo-16k": 16_384,
+    "gpt-35-turbo": 16_385,
+    "gpt-3.5-turbo": 16_385,
+    "gemini-1.5-pro": 2_097_152,
+    "gemini-1.5-flash": 1_048_576,
+    "gemini-2.0-flash": 1_048_576,
+    "gemini-2.5": 1_048_576,
+    "gemini-pro": 32_760,
+    "claude-3": 200_000,
+    "mock": 128_000,
+}
+
+DEFAULT_CONTEXT_WINDOW = 8_192
+
+STRATEGIES = ("drop_oldest", "truncate_context", "summarize")
+
+# Separator used by vector_store_chroma when joining retrieved chunks
+CONTEXT_SECTION_SEPARATOR = "\n\n---\n\n"
+
+SUMMARY_PROMPT = (
+    "Summarize the following conversation so it can replace the original in a "
+    "chat history. Keep facts, decisions, tool results and open questions. "
+    "Be concise.\n\n{history}"
+)
+
+# Cheap models used for summarization when LLM_SUMMARY_MODEL is not set
+DEFAULT_SUMMARY_MODELS = {
+    "openai": "gpt-4o-mini",
+    "gemini": "gemini-1.5-flash",
+}
+
+
+def get_context_window(model: Optional[str]) -> int:
+    """Context window for a model (LLM_CONTEXT_WINDOW overrides the table)."""
+    override = os.getenv("LLM_CONTEXT_WINDOW")
+    if override:
+        return int(override)
+
+    model = (model or "").lower()
+    for key in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if key in model:
+            return MODEL_CONTEXT_WINDOWS[key]
+
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def _section_relevance(section: str, position: int) -> Tuple[float, int]:
+    """Sort key: relevance score from '(Relevance: 0.83)' labels, else retrieval order."""
+    match = re.search(r"\(Relevance:\s*([0-9.]+)\)", section)
+    score = float(match.group(1)) if match else 0.0
+    return score, -position
+
+
+class ContextWindowManager:
+    """Fits a message list into a model's context window."""
+
+    def __init__(
+        self,
+        model: Optional[str],
+        max_output_tokens: int = 2000,
+        strategy: Optional[str] = None,
+        summarizer: Optional[Callable[[str], str]] = None,
+        keep_recent: int = 4
+    ):
+        self.model = model or "gpt-4"
+        self.strategy = (strategy or os.getenv("LLM_CONTEXT_STRATEGY", "drop_oldest")).lower()
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unsupported LLM_CONTEXT_STRATEGY: {self.strategy}. Use one of {', '.join(STRATEGIES)}")
+
+        self.window = get_context_window(model)
+        # count_tokens is an estimate - keep a small safety margin
+        margin = 64 + self.window // 50
+        self.budget = max(256, self.window - max_output_tokens - margin)
+        self.summarizer = summarizer
+        self.keep_recent = keep_recent
+
+    def _tokens(self, messages: List[Dict[str, Any]]) -> int:
+        return count_tokens(messages, self.model)
+
+    def fit(self, messages: List[Dict[str, Any]], provider: str = "unknown") -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Returns (messages, report). Messages are returned unchanged if they fit.
+        Raises ContextWindowError only if nothing can make the prompt fit.
+        """
+        original_tokens = self._tokens(messages)
+        report = {
+            "strategy": None,
+            "context_window": self.window,
+            "budget": self.budget,
+            "original_tokens": original_tokens,
+            "final_tokens": original_tokens,
+            "tokens_saved": 0
+        }
+
+        if original_tokens <= self.budget:
+            return messages, report
+
+        # Requested strategy first, then the cheaper ones as fallbacks
+        order = [self.strategy] + [s for s in ("truncate_context", "drop_oldest") if s != self.strategy]
+        compacted = [dict(m) for m in messages]
+
+        for strategy in order:
+            compacted = getattr(self, f"_{strategy}")(compacted)
+            report["strategy"] = strategy
+            if self._tokens(compacted) <= self.budget:
+                break
+
+        final_tokens = self._tokens(compacted)
+        if final_tokens > self.budget:
+            raise ContextWindowError(
+                f"Prompt too long: {final_tokens} tokens after compaction exceeds the "
+                f"{self.budget} token budget of {self.model} ({self.window} context window)",
+                provider
+            )
+
+        report["final_tokens"] = final_tokens
+        report["tokens_saved"] = original_tokens - final_tokens
+        print(f" [Context] {report['strategy']}: {original_tokens} -> {final_tokens} tokens (saved {report['tokens_saved']})")
+
+        return compacted, report
+
+    # ------------------------------------------------------------------
+    # Strategies
+    # ------------------------------------------------------------------
+
+    def _history_bounds(self, messages: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Index range of droppable history: after leading system messages, before the last message."""
+        start = 0
+        while start < len(messages) and messages[start].get("role") == "system":
+            start += 1
+        return start, max(start, len(messages) - 1)
+
+    def _drop_oldest(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        messages = list(messages)
+        start, end = self._history_bounds(messages)
+
+        while end > start and self._tokens(messages) > self.budget:
+            # Drop user/assistant pairs together so roles keep alternating
+            drop = 2 if end - start >= 2 else 1
+            del messages[start:start + drop]
+            end -= drop
+
+        return messages
+
+    def _truncate_context(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for message in messages:
+            rag_context = message.get("rag_context")
+            if not rag_context or rag_context not in message.get("content", ""):
+                continue
+
+            prefix, _, suffix = message["content"].partition(rag_context)
+
+            def set_context(new_context: str):
+                message["content"] = prefix + new_context + suffix
+                message["rag_context"] = new_context
+
+            sections = rag_context.split(CONTEXT_SECTION_SEPARATOR)
+            ranked = sorted(range(len(sections)), key=lambda i: _section_relevance(sections[i], i), reverse=True)
+            kept = list(ranked)
+
+            # Drop the least relevant sections until the prompt fits
+            while kept and self._tokens(messages) > self.budget:
+                kept.pop()
+                set_context(CONTEXT_SECTION_SEPARATOR.join(sections[i] for i in sorted(kept)))
+
+            # Even the best section alone was too big: keep as much of it as fits (~4 chars/token)
+            if not kept:
+                room = self.budget - self._tokens(messages)
+                if room > 0:
+                    set_context(sections[ranked[0]][:room * 4])
+
+        return messages
+
+    def _summarize(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        start, end = self._history_bounds(messages)
+        cut = max(start, end - self.keep_recent)
+
+        if cut <= start:
+            return messages
+
+        history = "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages[start:cut])
+
+        try:
+            summary = (self.summarizer or default_summarizer)(SUMMARY_PROMPT.format(history=history))
+        except Exception as e:
+            print(f" [Context] Summarization failed ({str(e)}), dropping oldest turns instead")
+            return self._drop_oldest(messages)
+
+        summary_message = {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}", "summary": True}
+        return messages[:start] + [summary_message] + messages[cut:]
+
+
+def default_summarizer(prompt: str) -> str:
+    """Summarize with a small model (LLM_SUMMARY_PROVIDER / LLM_SUMMARY_MODEL)."""
+    from .config import LLMConfig
+    from .factory import get_llm_provider
+
+    provider = os.getenv("LLM_SUMMARY_PROVIDER") or os.getenv("LLM_PROVIDER", "openai")
+    model = os.getenv("LLM_SUMMARY_MODEL") or DEFAULT_SUMMARY_MODELS.get(provider.lower())
+
+    config = LLMConfig.get_provider_config(provider, model)
+    config["temperature"] = 0.0
+    config["max_tokens"] = 500
+
+    return get_llm_provider(config).chat([{"role": "user", "content": prompt}]).content
@@ -0,0 +1,196 @@
+"""
+Load balancing across Azure OpenAI deployments.
+
+AZURE_DEPLOYMENTS lists endpoint/deployment pairs (e.g. one per region) with
+weights. Each request goes to the least-loaded deployment:
+
+    score = (in_flight + 1) / weight * (1 + recent_429s)
+
+A deployment that returns 429 cools down (is skipped) for
+AZURE_DEPLOYMENT_COOLDOWN_SECONDS (or the provider's retry-after hint) and
+the request moves on to the next deployment immediately.
+"""
+
+import re
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .errors import RateLimitError, ProviderUnavailableError
+
+# 429s older than this no longer count against a deployment
+RATE_LIMIT_WINDOW_SECONDS = 60
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Retry-after hint from an Azure 429 message ('retry after 12 seconds')."""
+    match = re.search(r"retry after (\d+(?:\.\d+)?)\s*second", str(error), re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+
+class Deployment:
+    """One endpoint/deployment pair and its live load."""
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.endpoint = entry["endpoint"]
+        self.deployment = entry["deployment"]
+        self.api_key = entry.get("api_key")
+        self.api_version = entry.get("api_version")
+        self.weight = max(float(entry.get("weight", 1)), 0.01)
+
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.recent_429s = deque()
+        self.requests = 0
+        self.rate_limited = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.endpoint.rstrip('/')}/{self.deployment}"
+
+    def _prune(self, now: float):
+        while self.recent_429s and now - self.recent_429s[0] > RATE_LIMIT_WINDOW_SECONDS:
+            self.recent_429s.popleft()
+
+    def score(self, now: float) -> float:
+        self._prune(now)
+        return (self.in_flight + 1) / self.weight * (1 + len(self.recent_429s))
+
+    def as_config(self) -> Dict[str, Any]:
+        """Client settings for this deployment (None values fall back to the provider config)."""
+        return {
+            "endpoint": self.endpoint,
+            "deployment_name": self.deployment,
+            "api_key": self.api_key,
+            "api_version": self.api_version
+        }
+
+
+class DeploymentBalancer:
+    """Picks deployments by load and routes around rate-limited ones."""
+
+    def __init__(self, entries: List[Dict[str, Any]], cooldown_seconds: float = 30):
+        self.deployments = [Deployment(entry) for entry in entries]
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+
+    def _ordered(self, exclude: List[Deployment]) -> List[Deployment]:
+        """Available deployments, least loaded first; cooling-down ones last (soonest ready first)."""
+        now = time.time()
+        candidates = [d for d in self.deployments if d not in exclude]
+        ready = sorted((d for d in candidates if d.cooldown_until <= now), key=lambda d: d.score(now))
+        cooling = sorted((d for d in candidates if d.cooldown_until > now), key=lambda d: d.cooldown_until)
+        return ready + cooling
+
+    @contextmanager
+    def _lease(self, exclude: List[Deployment]):
+        with self._lock:
+            ordered = self._ordered(exclude)
+            if not ordered:
+                yield None
+                return
+            deployment = ordered[0]
+            deployment.in_flight += 1
+            deployment.requests += 1
+
+        try:
+            yield deployment
+        finally:
+            with self._lock:
+                deployment.in_flight -= 1
+
+    def mark_rate_limited(self, deployment: Deployment, error: Exception):
+        cooldown = _retry_after(error) or self.cooldown_seconds
+        now = time.time()
+        with self._lock:
+            deployment.recent_429s.append(now)
+            deployment.rate_limited += 1
+            deployment.cooldown_until = max(deployment.cooldown_until, now + cooldown)
+        print(f" [Azure Balancer] {deployment.name} rate limited, cooling down {cooldown:.0f}s")
+
+    def run(self, call: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Run `call(deployment_config)`, moving to the next deployment on 429s and outages."""
+        tried: List[Deployment] = []
+        last_error: Optional[Exception] = None
+
+        while True:
+            with self._lease(tried) as deployment:
+                if deployment is None:
+                    raise last_error
+
+                try:
+                    return call(deployment.as_config())
+                except RateLimitError as e:
+                    self.mark_rate_limited(deployment, e)
+                    last_error = e
+                except ProviderUnavailableError as e:
+                    print(f" [Azure Balancer] {deployment.name} unavailable, trying next deployment")
+                    last_error = e
+
+                tried.append(deployment)
+
+    def stream(self, open_stream: Callable[[Dict[str, Any]], Iterator[str]]) -> Iterator[str]:
+        """Like run() for streams; switching deployments is only possible before the first chunk."""
+        tried: List[Deployment] = []
+        last_error: Optional[Exception] = None
+
+        while True:
+            with self._lease(tried) as deployment:
+                if deployment is None:
+                    raise last_error
+
+                started = False
+                try:
+                    for chunk in open_stream(deployment.as_config()):
+                        started = True
+                        yield chunk
+                    return
+                except RateLimitError as e:
+                    self.mark_rate_limited(deployment, e)
+                    if started:
+                        raise
+                    last_error = e
+                except ProviderUnavailableError as e:
+                    if started:
+                        raise
+                    last_error = e
+
+                tried.append(deployment)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "deployment": d.name,
+                    "weight": d.weight,
+                    "in_flight": d.in_flight,
+                    "requests": d.requests,
+                    "rate_limited": d.rate_limited,
+                    "recent_429s": len(d.recent_429s),
+                    "cooldown_remaining": round(max(0.0, d.cooldown_until - now), 2)
+                }
+                for d in self.deployments
+            ]
+
+
+_balancers: Dict[str, DeploymentBalancer] = {}
+_balancers_lock = threading.Lock()
+
+
+def get_deployment_balancer(entries: List[Dict[str, Any]], cooldown_seconds: float = 30) -> DeploymentBalancer:
+    """Process-wide balancer per deployment list, so load is tracked across provider instances."""
+    key = json.dumps(entries, sort_keys=True)
+    with _balancers_lock:
+        if key not in _balancers:
+            _balancers[key] = DeploymentBalancer(entries, cooldown_seconds)
+        return _balancers[key]
+
+
+def get_deployment_stats() -> Dict[str, List[Dict[str, Any]]]:
+    with _balancers_lock:
+        balancers = list(_balancers.values())
+    return {f"pool-{index}": balancer.stats() for index, balancer in enumerate(balancers)}
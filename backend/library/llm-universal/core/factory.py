@@ -4,6 +4,8 @@ from .providers.base import BaseLLMProvider
 from .providers.openai_provider import OpenAIProvider
 from .providers.azure_provider import AzureProvider
 from .providers.gemini_provider import GeminiProvider
+from .providers.mock_provider import MockProvider
+from .cassette import cassette_mode, get_cassette, RecordingProvider
 
 def get_llm_provider(override_config: Dict[str, str] = None) -> BaseLLMProvider:
     """
@@ -15,14 +17,24 @@ def get_llm_provider(override_config: Dict[str, str] = None) -> BaseLLMProvider:
     provider_name = config.get("provider") or os.getenv("LLM_PROVIDER", "openai").lower()
     
     # 2. Instantiate
+    if provider_name == "mock":
+        # Offline provider (scripts / cassette replay) - never recorded
+        return MockProvider(config)
+    
     if provider_name == "openai":
-        return OpenAIProvider(config)
+        provider = OpenAIProvider(config)
     
     elif provider_name == "azure":
-        return AzureProvider(config)
+        provider = AzureProvider(config)
     
     elif provider_name == "gemini":
-        return GeminiProvider(config)
+        provider = GeminiProvider(config)
     
     else:
-        raise ValueError(f"Unsupported LLM_PROVIDER: {provider_name}")
\ No newline at end of file
+        raise ValueError(f"Unsupported LLM_PROVIDER: {provider_name}")
+    
+    # 3. Capture real exchanges for offline replay (LLM_CASSETTE_MODE=record)
+    if cassette_mode() == "record":
+        return RecordingProvider(provider, get_cassette(config.get("cassette")))
+    
+    return provider
\ No newline at end of file
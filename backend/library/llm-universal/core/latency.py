@@ -0,0 +1,93 @@
+"""
+Latency histograms.
+
+Fixed buckets give a cheap cumulative distribution (Prometheus-style),
+while a small ring buffer of recent samples gives responsive percentiles
+for routing decisions.
+"""
+
+import bisect
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+# Bucket upper bounds in seconds (10ms .. 2min)
+DEFAULT_BUCKETS = (
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0,
+    5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 120.0
+)
+
+
+class LatencyHistogram:
+    """Thread-safe latency histogram with a recent-sample window."""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS, window: int = 256):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            self._recent.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Percentile (0-1) over the recent window.
+        Returns None when there are no samples yet.
+        """
+        with self._lock:
+            samples = sorted(self._recent)
+
+        if not samples:
+            return None
+
+        index = min(len(samples) - 1, max(0, int(round(p * (len(samples) - 1)))))
+        return samples[index]
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._recent)
+
+    def cumulative_buckets(self) -> List[tuple]:
+        """[(upper_bound, cumulative_count), ...] ending with ('+Inf', count)."""
+        with self._lock:
+            counts = list(self.counts)
+
+        result = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+            running += bucket_count
+            result.append((bound, running))
+        return result
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99)
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_lock = threading.Lock()
+
+
+def get_latency_histogram(key: str) -> LatencyHistogram:
+    """Process-wide histogram for a key such as 'openai:gpt-4o'."""
+    histogram = _histograms.get(key)
+    if histogram is None:
+        with _lock:
+            histogram = _histograms.setdefault(key, LatencyHistogram())
+    return histogram
+
+
+def get_latency_summaries() -> Dict[str, Dict[str, Optional[float]]]:
+    return {key: histogram.summary() for key, histogram in list(_histograms.items())}
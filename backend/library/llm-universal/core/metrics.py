@@ -0,0 +1,222 @@
+"""
+In-process LLM usage accounting.
+
+Records per (provider, model, project, node):
+- prompt / completion / cached tokens
+- total latency and time-to-first-token histograms
+- retries, errors and estimated cost
+
+Project and node labels come from the caller via `usage_labels(...)`,
+which the runtime adapter sets for every graph node execution.
+"""
+
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from .latency import LatencyHistogram
+
+_current_labels: contextvars.ContextVar = contextvars.ContextVar("llm_usage_labels", default={})
+
+SeriesKey = Tuple[str, str, str, str]
+LABEL_NAMES = ("provider", "model", "project", "node")
+
+
+@contextmanager
+def usage_labels(project: Optional[Any] = None, node: Optional[Any] = None):
+    """Attribute every LLM call made inside this block to a project/node."""
+    token = _current_labels.set({
+        "project": str(project) if project is not None else "",
+        "node": str(node) if node is not None else ""
+    })
+    try:
+        yield
+    finally:
+        _current_labels.reset(token)
+
+
+def current_labels() -> Dict[str, str]:
+    return _current_labels.get()
+
+
+class _Series:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost_usd = 0.0
+        self.latency = LatencyHistogram()
+        self.ttft = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "latency": self.latency.summary(),
+            "time_to_first_token": self.ttft.summary()
+        }
+
+
+class UsageMetricsRegistry:
+    """Thread-safe registry of LLM usage series."""
+
+    def __init__(self):
+        self._series: Dict[SeriesKey, _Series] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, provider: str, model: str) -> _Series:
+        labels = current_labels()
+        key = (provider or "unknown", model or "default", labels.get("project", ""), labels.get("node", ""))
+
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, _Series())
+        return series
+
+    def record_call(
+        self,
+        provider: str,
+        model: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cached_tokens: int = 0,
+        latency: Optional[float] = None,
+        ttft: Optional[float] = None,
+        cost: float = 0.0
+    ):
+        series = self._get(provider, model)
+        with self._lock:
+            series.requests += 1
+            series.prompt_tokens += prompt_tokens or 0
+            series.completion_tokens += completion_tokens or 0
+            series.cached_tokens += cached_tokens or 0
+            series.cost_usd += cost or 0.0
+
+        if latency is not None:
+            series.latency.observe(latency)
+        if ttft is not None:
+            series.ttft.observe(ttft)
+
+    def record_retry(self, provider: str, model: str):
+        series = self._get(provider, model)
+        with self._lock:
+            series.retries += 1
+
+    def record_error(self, provider: str, model: str):
+        series = self._get(provider, model)
+        with self._lock:
+            series.errors += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self, project: Optional[str] = None, group_by: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        JSON-friendly view of all series.
+        group_by (subset of provider/model/project/node) aggregates counters;
+        histograms are only reported for ungrouped series.
+        """
+        with self._lock:
+            items = list(self._series.items())
+
+        if project is not None:
+            items = [(key, series) for key, series in items if key[2] == str(project)]
+
+        if not group_by:
+            return [
+                {**dict(zip(LABEL_NAMES, key)), **series.to_dict()}
+                for key, series in sorted(items)
+            ]
+
+        indices = [LABEL_NAMES.index(name) for name in group_by]
+        groups: Dict[tuple, Dict[str, Any]] = {}
+
+        for key, series in items:
+            group_key = tuple(key[i] for i in indices)
+            entry = groups.setdefault(group_key, {
+                **{LABEL_NAMES[i]: key[i] for i in indices},
+                "requests": 0, "errors": 0, "retries": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+                "cost_usd": 0.0, "latency_seconds_total": 0.0
+            })
+            entry["requests"] += series.requests
+            entry["errors"] += series.errors
+            entry["retries"] += series.retries
+            entry["prompt_tokens"] += series.prompt_tokens
+            entry["completion_tokens"] += series.completion_tokens
+            entry["cached_tokens"] += series.cached_tokens
+            entry["cost_usd"] = round(entry["cost_usd"] + series.cost_usd, 6)
+            entry["latency_seconds_total"] = round(entry["latency_seconds_total"] + series.latency.total, 4)
+
+        # Most expensive first - that is what people look for
+        return sorted(groups.values(), key=lambda e: e["cost_usd"], reverse=True)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            items = sorted(self._series.items())
+
+        lines: List[str] = []
+
+        counters = (
+            ("llm_requests_total", "LLM requests", "requests"),
+            ("llm_errors_total", "LLM requests that failed after retries", "errors"),
+            ("llm_retries_total", "LLM retry attempts", "retries"),
+            ("llm_prompt_tokens_total", "Prompt tokens sent", "prompt_tokens"),
+            ("llm_completion_tokens_total", "Completion tokens received", "completion_tokens"),
+            ("llm_cached_prompt_tokens_total", "Prompt tokens served from provider prefix cache", "cached_tokens"),
+            ("llm_cost_usd_total", "Estimated cost in USD", "cost_usd"),
+        )
+
+        for name, help_text, attribute in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, series in items:
+                lines.append(f"{name}{{{_format_labels(key)}}} {_format_value(getattr(series, attribute))}")
+
+        histograms = (
+            ("llm_request_latency_seconds", "End-to-end LLM request latency", "latency"),
+            ("llm_time_to_first_token_seconds", "Time to first streamed token", "ttft"),
+        )
+
+        for name, help_text, attribute in histograms:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, series in items:
+                histogram = getattr(series, attribute)
+                if not histogram.count:
+                    continue
+                labels = _format_labels(key)
+                for bound, cumulative in histogram.cumulative_buckets():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {_format_value(histogram.total)}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: SeriesKey) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(LABEL_NAMES, key))
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Process-wide registry
+usage_metrics = UsageMetricsRegistry()
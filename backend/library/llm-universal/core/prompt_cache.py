@@ -0,0 +1,143 @@
+"""
+Prompt-prefix caching support.
+
+Providers can only reuse work for an identical prompt *prefix*:
+- OpenAI/Azure cache prefixes of 1024+ tokens automatically
+- Gemini caches explicitly via the cached-content API
+
+So we keep the stable parts (instructions, tool catalog, RAG context) at the
+front in a deterministic order, and track how many prompt tokens were served
+from cache per provider/model.
+"""
+
+import os
+import time
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+
+def prefix_cache_enabled() -> bool:
+    return os.getenv("LLM_PREFIX_CACHE", "true").lower() == "true"
+
+
+def order_for_prefix_cache(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Stable-first ordering of the leading system messages:
+    1. Static system messages (instructions, tool catalogs)
+    2. System messages carrying RAG context
+    3. Volatile system messages (history summaries)
+    Everything from the first non-system message on keeps its position, so
+    system messages placed inside the conversation stay where they were put.
+    """
+    lead = 0
+    while lead < len(messages) and messages[lead].get("role") == "system":
+        lead += 1
+
+    static, rag, volatile = [], [], []
+    for message in messages[:lead]:
+        if message.get("summary"):
+            volatile.append(message)
+        elif message.get("rag_context"):
+            rag.append(message)
+        else:
+            static.append(message)
+
+    return static + rag + volatile + list(messages[lead:])
+
+
+def prefix_hash(*parts: Optional[str]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def extract_cached_tokens(token_usage: Dict[str, Any]) -> int:
+    """Cached prompt tokens from a normalized or OpenAI-style usage dict."""
+    if not token_usage:
+        return 0
+
+    if "cached_tokens" in token_usage:
+        return int(token_usage["cached_tokens"] or 0)
+
+    details = token_usage.get("prompt_tokens_details") or {}
+    return int(details.get("cached_tokens", 0) or 0)
+
+
+# ---------------------------------------------------------------------------
+# Cached-vs-uncached accounting
+# ---------------------------------------------------------------------------
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def record_prefix_cache_usage(provider: str, model: str, prompt_tokens: int, cached_tokens: int):
+    key = f"{provider}:{model}"
+    with _stats_lock:
+        entry = _stats.setdefault(key, {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "cache_hits": 0})
+        entry["requests"] += 1
+        entry["prompt_tokens"] += prompt_tokens or 0
+        entry["cached_tokens"] += cached_tokens or 0
+        entry["cache_hits"] += 1 if cached_tokens else 0
+
+
+def get_prefix_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _stats_lock:
+        result = {}
+        for key, entry in _stats.items():
+            prompt_tokens = entry["prompt_tokens"]
+            result[key] = {
+                **entry,
+                "uncached_tokens": prompt_tokens - entry["cached_tokens"],
+                "cached_ratio": round(entry["cached_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0
+            }
+        return result
+
+
+# ---------------------------------------------------------------------------
+# Explicit cache handles (Gemini cached content)
+# ---------------------------------------------------------------------------
+
+class CachedPrefixRegistry:
+    """
+    Maps prefix hash -> provider cache name with expiry.
+    Also remembers prefixes the provider refused to cache (e.g. too small)
+    so we do not retry creating them on every call.
+    """
+
+    def __init__(self, refuse_ttl: float = 600):
+        self._entries: Dict[str, tuple] = {}
+        self._refused: Dict[str, float] = {}
+        self._refuse_ttl = refuse_ttl
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.time():
+                return entry[0]
+            self._entries.pop(key, None)
+            return None
+
+    def put(self, key: str, name: str, ttl_seconds: float):
+        with self._lock:
+            # Expire a little early so we never reference a cache the provider already dropped
+            self._entries[key] = (name, time.time() + ttl_seconds * 0.9)
+
+    def refused(self, key: str) -> bool:
+        with self._lock:
+            until = self._refused.get(key)
+            return bool(until and until > time.time())
+
+    def refuse(self, key: str):
+        with self._lock:
+            self._refused[key] = time.time() + self._refuse_ttl
+
+    def invalidate(self, name: str):
+        """Forget a cache the provider no longer knows about."""
+        with self._lock:
+            for key in [k for k, (entry_name, _) in self._entries.items() if entry_name == name]:
+                del self._entries[key]
@@ -1,38 +1,62 @@
 import os
-from typing import List, Dict, Iterator
+from typing import List, Dict, Iterator, Any, Optional
 from langchain_openai import AzureChatOpenAI
 from ..utils import convert_to_langchain_messages
 from .base import BaseLLMProvider, LLMResponse
+from ..prompt_cache import extract_cached_tokens
 from ..errors import AuthenticationError, RateLimitError, ProviderUnavailableError, LLMError, ContextWindowError
+from ..deployment_balancer import get_deployment_balancer
 
 class AzureProvider(BaseLLMProvider):
     def validate_config(self):
         required = ["AZURE_OPENAI_API_KEY", "AZURE_OPENAI_ENDPOINT", "AZURE_DEPLOYMENT_NAME"]
+        if self.config.get("deployments"):
+            # Endpoints and deployments come from the AZURE_DEPLOYMENTS pool
+            required = [] if all(d.get("api_key") for d in self.config["deployments"]) else ["AZURE_OPENAI_API_KEY"]
         missing = [key for key in required if not os.getenv(key) and key.lower() not in self.config]
         if missing:
             raise ValueError(f"Missing config for Azure: {', '.join(missing)}")
 
-    def _get_client(self):
+    def _get_client(self, deployment: Optional[Dict[str, Any]] = None):
+        """Client for the configured deployment, or for one picked from the pool."""
+        deployment = deployment or {}
         return AzureChatOpenAI(
-            azure_deployment=self.config.get("deployment_name") or os.getenv("AZURE_DEPLOYMENT_NAME"),
-            openai_api_version=self.config.get("api_version") or os.getenv("AZURE_API_VERSION", "2023-05-15"),
-            azure_endpoint=self.config.get("endpoint") or os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_key=self.config.get("api_key") or os.getenv("AZURE_OPENAI_API_KEY"),
+            azure_deployment=deployment.get("deployment_name") or self.config.get("deployment_name") or os.getenv("AZURE_DEPLOYMENT_NAME"),
+            openai_api_version=deployment.get("api_version") or self.config.get("api_version") or os.getenv("AZURE_API_VERSION", "2023-05-15"),
+            azure_endpoint=deployment.get("endpoint") or self.config.get("endpoint") or os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_key=deployment.get("api_key") or self.config.get("api_key") or os.getenv("AZURE_OPENAI_API_KEY"),
             temperature=self.config.get("temperature", 0.7),
             max_tokens=self.config.get("max_tokens", 2000),
             request_timeout=self.config.get("timeout", 60)
         )
 
+    def _balancer(self):
+        """Shared balancer when AZURE_DEPLOYMENTS configures a pool, else None."""
+        if not self.config.get("deployments"):
+            return None
+        return get_deployment_balancer(self.config["deployments"], self.config.get("deployment_cooldown", 30))
+
     def chat(self, messages: List[Dict[str, str]]) -> LLMResponse:
-        client = self._get_client()
         lc_msgs = convert_to_langchain_messages(messages)
+        balancer = self._balancer()
+        
+        if balancer:
+            # Least-loaded deployment first; 429s cool a deployment down and move on
+            return balancer.run(lambda deployment: self._invoke(self._get_client(deployment), lc_msgs))
         
+        return self._invoke(self._get_client(), lc_msgs)
+
+    def _invoke(self, client, lc_msgs) -> LLMResponse:
         try:
             response = client.invoke(lc_msgs)
             
+            # Automatic prefix caching: report prompt tokens served from cache
+            token_usage = dict(response.response_metadata.get("token_usage") or {})
+            token_usage["cached_tokens"] = extract_cached_tokens(token_usage)
+            
             return LLMResponse(
                 content=str(response.content),
-                token_usage=response.response_metadata.get("token_usage", {}),
+                token_usage=token_usage,
                 raw_response=response
             )
         
@@ -70,9 +94,15 @@ class AzureProvider(BaseLLMProvider):
                 raise LLMError(f"Azure Error ({error_type}): {str(e)}", "azure")
 
     def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
-        client = self._get_client()
         lc_msgs = convert_to_langchain_messages(messages)
+        balancer = self._balancer()
         
+        if balancer:
+            return balancer.stream(lambda deployment: self._stream(self._get_client(deployment), lc_msgs))
+        
+        return self._stream(self._get_client(), lc_msgs)
+
+    def _stream(self, client, lc_msgs) -> Iterator[str]:
         try:
             for chunk in client.stream(lc_msgs):
                 if chunk.content:
@@ -87,7 +117,10 @@ class AzureProvider(BaseLLMProvider):
                 raise RateLimitError(str(e), "azure")
             elif "context length" in error_str or "maximum context" in error_str:
                 raise ContextWindowError(str(e), "azure")
-            elif "500" in error_str or "502" in error_str or "503" in error_str:
+            elif "500" in error_str or "502" in error_str or "503" in error_str or "504" in error_str:
+                raise ProviderUnavailableError(str(e), "azure")
+            # Dropped connections (mid-stream or on connect) are resumable
+            elif "timeout" in error_str or "timed out" in error_str or "connection" in error_str or "incomplete" in error_str:
                 raise ProviderUnavailableError(str(e), "azure")
             else:
                 raise LLMError(f"Azure Streaming Error: {str(e)}", "azure")
@@ -51,6 +51,14 @@ class BaseLLMProvider(ABC):
         """
         pass
 
+    def stream_with_resume(self, messages: List[Dict[str, str]], max_resumes: int = 2, metrics: Any = None) -> Iterator[str]:
+        """
+        Streaming chat that survives dropped connections.
+        Reconnects on transient errors and resumes from the already emitted text.
+        """
+        from ..streaming import resumable_stream
+        return resumable_stream(self.stream, messages, max_resumes=max_resumes, metrics=metrics)
+
     # Optional Capability Check
     def supports_embeddings(self) -> bool:
         return False
\ No newline at end of file
@@ -1,11 +1,15 @@
 import logging
 import os
-from typing import List, Dict, Iterator
+from typing import List, Dict, Iterator, Optional
 from google import genai
 from google.genai import types
 
 from .base import BaseLLMProvider, LLMResponse
 from ..errors import AuthenticationError, RateLimitError, ProviderUnavailableError, LLMError, ContextWindowError
+from ..prompt_cache import CachedPrefixRegistry, prefix_cache_enabled, prefix_hash
+
+# Process-wide map of system-prompt hash -> Gemini cached-content name
+_prefix_caches = CachedPrefixRegistry()
 
 class GeminiProvider(BaseLLMProvider):
     def validate_config(self):
@@ -28,9 +32,13 @@ class GeminiProvider(BaseLLMProvider):
         api_key = self.config.get("api_key") or os.getenv("GOOGLE_API_KEY")
         api_version = self.config.get("api_version") or os.getenv("GOOGLE_API_VERSION", "v1")
         
+        # Optional base URL (e.g. a local stub server for tests)
+        base_url = self.config.get("base_url") or os.getenv("GEMINI_BASE_URL")
+        
         # Create client with explicit API version
         client = genai.Client(
-            api_key=api_key
+            api_key=api_key,
+            http_options=types.HttpOptions(base_url=base_url) if base_url else None
             # http_options={'api_version': api_version}
         )
         
@@ -81,15 +89,68 @@ class GeminiProvider(BaseLLMProvider):
 
         return system_instruction, history, last_user_message
 
+    def _get_cached_prefix(self, client, model_name: str, system_instruction: Optional[str]) -> Optional[str]:
+        """
+        Return a cached-content name holding the system instruction, creating it if needed.
+        Only worth it (and only allowed by the API) for large, stable prefixes.
+        """
+        if not system_instruction or not prefix_cache_enabled():
+            return None
+
+        # ~4 characters per token; Gemini rejects caches below a minimum size
+        min_tokens = int(os.getenv("LLM_PREFIX_CACHE_MIN_TOKENS", "4096"))
+        if len(system_instruction) // 4 < min_tokens:
+            return None
+
+        key = prefix_hash(model_name, system_instruction)
+        cache_name = _prefix_caches.get(key)
+        if cache_name or _prefix_caches.refused(key):
+            return cache_name
+
+        ttl = int(os.getenv("LLM_PREFIX_CACHE_TTL_SECONDS", "600"))
+        try:
+            cache = client.caches.create(
+                model=model_name,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system_instruction,
+                    ttl=f"{ttl}s",
+                    display_name=f"prefix-{key[:16]}"
+                )
+            )
+            _prefix_caches.put(key, cache.name, ttl)
+            print(f" [Gemini] Cached prompt prefix as {cache.name} (ttl {ttl}s)")
+            return cache.name
+
+        except Exception as e:
+            print(f" [Gemini] Prefix caching unavailable, sending full prompt: {str(e)}")
+            _prefix_caches.refuse(key)
+            return None
+
+    def _token_usage(self, response) -> Dict[str, int]:
+        """Normalized token usage, including prompt tokens served from cache."""
+        if not hasattr(response, 'usage_metadata') or response.usage_metadata is None:
+            return {}
+
+        usage = response.usage_metadata
+        return {
+            'prompt_tokens': getattr(usage, 'prompt_token_count', 0) or 0,
+            'completion_tokens': getattr(usage, 'candidates_token_count', 0) or 0,
+            'total_tokens': getattr(usage, 'total_token_count', 0) or 0,
+            'cached_tokens': getattr(usage, 'cached_content_token_count', 0) or 0
+        }
+
     def chat(self, messages: List[Dict[str, str]]) -> LLMResponse:
+        cached_prefix = None
         try:
             system_instruction, chat_history, user_message = self._parse_messages(messages)
             
             client = self._get_client()
             model_name = self._clean_model_name(self.config.get("model", "gemini-3-flash-preview"))
+            cached_prefix = self._get_cached_prefix(client, model_name, system_instruction)
             
             # Build generation config WITHOUT system_instruction
             config = types.GenerateContentConfig(
+                cached_content=cached_prefix,
                 temperature=self.config.get("temperature", 0.7),
                 max_output_tokens=self.config.get("max_tokens", 2000),
                 safety_settings=[
@@ -115,7 +176,7 @@ class GeminiProvider(BaseLLMProvider):
             # NEW: If there's a system instruction, prepend it to the first user message
             contents = chat_history.copy() if chat_history else []
             
-            if system_instruction:
+            if system_instruction and not cached_prefix:
                 # Combine system instruction with user message
                 combined_message = f"{system_instruction}\n\n{user_message}"
                 contents.append(
@@ -139,24 +200,20 @@ class GeminiProvider(BaseLLMProvider):
                 config=config
             )
             
-            # Token usage handling
-            token_usage = {}
-            if hasattr(response, 'usage_metadata'):
-                usage = response.usage_metadata
-                token_usage = {
-                    'prompt_tokens': getattr(usage, 'prompt_token_count', 0),
-                    'completion_tokens': getattr(usage, 'candidates_token_count', 0),
-                    'total_tokens': getattr(usage, 'total_token_count', 0)
-                }
-            
             return LLMResponse(
                 content=response.text,
-                token_usage=token_usage,
+                token_usage=self._token_usage(response),
                 raw_response=response
             )
 
         except Exception as e:
             error_str = str(e).lower()
+            
+            # Cache expired or deleted server-side: forget it so the retry recreates it
+            if cached_prefix and "cache" in error_str:
+                _prefix_caches.invalidate(cached_prefix)
+                raise ProviderUnavailableError(str(e), "gemini")
+
             print("*"*100)
             print(str(e))
             print("*"*100)
@@ -183,17 +240,20 @@ class GeminiProvider(BaseLLMProvider):
                 raise LLMError(f"Gemini Error: {str(e)}", "gemini")
 
     def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        cached_prefix = None
         try:
             system_instruction, chat_history, user_message = self._parse_messages(messages)
             
             client = self._get_client()
             model_name = self._clean_model_name(self.config.get("model", "gemini-1.5-flash"))
+            cached_prefix = self._get_cached_prefix(client, model_name, system_instruction)
             
-            # Build generation config
+            # Build generation config (a cached prefix already holds the system instruction)
             config = types.GenerateContentConfig(
+                cached_content=cached_prefix,
                 temperature=self.config.get("temperature", 0.7),
                 max_output_tokens=self.config.get("max_tokens", 2000),
-                system_instruction=system_instruction if system_instruction else None,
+                system_instruction=system_instruction if (system_instruction and not cached_prefix) else None,
                 safety_settings=[
                     types.SafetySetting(
                         category="HARM_CATEGORY_HARASSMENT",
@@ -242,12 +302,19 @@ class GeminiProvider(BaseLLMProvider):
         except Exception as e:
             error_str = str(e).lower()
             
+            if cached_prefix and "cache" in error_str:
+                _prefix_caches.invalidate(cached_prefix)
+                raise ProviderUnavailableError(str(e), "gemini")
+            
             if "api key" in error_str or "401" in error_str:
                 raise AuthenticationError(str(e), "gemini")
             elif "429" in error_str or "quota" in error_str:
                 raise RateLimitError(str(e), "gemini")
             elif "503" in error_str or "unavailable" in error_str:
                 raise ProviderUnavailableError(str(e), "gemini")
+            # Dropped connections (mid-stream or on connect) are resumable
+            elif "timeout" in error_str or "timed out" in error_str or "connection" in error_str or "incomplete" in error_str:
+                raise ProviderUnavailableError(str(e), "gemini")
             elif "404" in error_str or "not found" in error_str:
                 model_name = self.config.get("model", "gemini-1.5-flash")
                 raise LLMError(
@@ -0,0 +1,228 @@
+import os
+import re
+import json
+import math
+import time
+import random
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .base import BaseLLMProvider, LLMResponse
+from ..errors import LLMError, ProviderUnavailableError
+
+# One generator for the process so LLM_MOCK_SEED gives a reproducible sequence
+# (providers are instantiated per call)
+_rng = random.Random(os.getenv("LLM_MOCK_SEED"))
+_rng_lock = threading.Lock()
+
+_scripts: Dict[str, tuple] = {}
+
+
+def parse_latency_distribution(spec: str) -> Callable[[], float]:
+    """
+    Latency sampler (seconds) from a spec string:
+        fixed:0.3
+        uniform:0.1,0.6
+        normal:0.4,0.1          (mean, stddev; clamped at 0)
+        lognormal:0.4,0.5       (median, sigma - long tail like real APIs)
+    """
+    kind, _, params = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in params.split(",") if v.strip()] or [0.0]
+    kind = kind.strip().lower()
+
+    def sample(draw):
+        with _rng_lock:
+            return max(0.0, draw())
+
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        low, high = values[0], values[1] if len(values) > 1 else values[0]
+        return lambda: sample(lambda: _rng.uniform(low, high))
+    if kind == "normal":
+        mean, stddev = values[0], values[1] if len(values) > 1 else 0.0
+        return lambda: sample(lambda: _rng.gauss(mean, stddev))
+    if kind == "lognormal":
+        median, sigma = values[0], values[1] if len(values) > 1 else 0.5
+        mu = math.log(median) if median > 0 else 0.0
+        return lambda: sample(lambda: _rng.lognormvariate(mu, sigma))
+
+    raise ValueError(f"Unsupported LLM_MOCK_LATENCY distribution: {kind}. Use fixed, uniform, normal or lognormal")
+
+
+def load_script(path: str) -> Dict[str, Any]:
+    """
+    Scripted responses (JSON), cached per file modification time:
+        {
+          "rules": [
+            {"match": "weather", "responses": ["TOOL: get_weather\\nARGS: {\\"city\\": \\"Paris\\"}",
+                                               "ANSWER: It is sunny in Paris."]}
+          ],
+          "default": "ANSWER: I don't know."
+        }
+    A plain list is shorthand for a single rule matching everything.
+    Within a rule, the N-th assistant turn of the conversation gets responses[N]
+    (the last one repeats), so ReAct loops replay deterministically.
+    """
+    mtime = os.path.getmtime(path)
+    cached = _scripts.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        script = json.load(f)
+
+    if isinstance(script, list):
+        script = {"rules": [{"match": ".*", "responses": script}]}
+
+    for rule in script.get("rules", []):
+        rule["_pattern"] = re.compile(rule.get("match", ".*"), re.IGNORECASE | re.DOTALL)
+
+    _scripts[path] = (mtime, script)
+    return script
+
+
+class MockProvider(BaseLLMProvider):
+    """
+    Offline provider for load tests and CI.
+    Answers from a replay cassette, a response script or a deterministic default,
+    with configurable latency and generation speed.
+    """
+
+    def validate_config(self):
+        script = self.config.get("script") or os.getenv("LLM_MOCK_SCRIPT")
+        if script and not os.path.isfile(script):
+            raise ValueError(f"LLM_MOCK_SCRIPT file not found: {script}")
+
+        # Fail fast on a bad spec
+        parse_latency_distribution(self._latency_spec())
+
+    def _latency_spec(self) -> str:
+        return self.config.get("latency") or os.getenv("LLM_MOCK_LATENCY", "fixed:0")
+
+    def _tokens_per_second(self) -> float:
+        return float(self.config.get("tokens_per_second") or os.getenv("LLM_MOCK_TOKENS_PER_SECOND", "0"))
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return max(1, len(text) // 4)
+
+    def _maybe_fail(self):
+        error_rate = float(self.config.get("error_rate") or os.getenv("LLM_MOCK_ERROR_RATE", "0"))
+        if error_rate > 0:
+            with _rng_lock:
+                failed = _rng.random() < error_rate
+            if failed:
+                raise ProviderUnavailableError("Injected mock failure (LLM_MOCK_ERROR_RATE)", "mock")
+
+    # ------------------------------------------------------------------
+    # Response selection
+    # ------------------------------------------------------------------
+
+    def _replayed(self, messages: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        from ..cassette import cassette_mode, get_cassette
+
+        if cassette_mode() != "replay":
+            return None
+
+        entry = get_cassette(self.config.get("cassette")).find(messages)
+        if entry is None:
+            if os.getenv("LLM_CASSETTE_STRICT", "false").lower() == "true":
+                raise LLMError("No recorded exchange for this conversation (LLM_CASSETTE_STRICT)", "mock")
+            print(" [Mock LLM] Cassette miss, using scripted/default response")
+        return entry
+
+    def _scripted(self, messages: List[Dict[str, str]]) -> str:
+        last_user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        turn = sum(1 for m in messages if m.get("role") == "assistant")
+
+        script_path = self.config.get("script") or os.getenv("LLM_MOCK_SCRIPT")
+        if script_path:
+            script = load_script(script_path)
+            # Match against the first user message so the whole ReAct loop stays on one rule
+            first_user = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+
+            for rule in script.get("rules", []):
+                if rule["_pattern"].search(first_user):
+                    responses = rule.get("responses") or [rule.get("response", "")]
+                    return responses[min(turn, len(responses) - 1)]
+
+            if "default" in script:
+                return script["default"]
+
+        response = f"Mock response to: {last_user[:200]}"
+
+        # ReAct agents expect the TOOL:/ANSWER: protocol
+        system_text = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        if "ANSWER:" in system_text:
+            response = f"ANSWER: {response}"
+        return response
+
+    def _respond(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """{'response', 'latency', 'first_token_latency'} for this conversation."""
+        self._maybe_fail()
+
+        replayed = self._replayed(messages)
+        if replayed:
+            return {
+                "response": replayed["response"],
+                "token_usage": replayed.get("token_usage") or {},
+                "latency": replayed.get("latency", 0.0),
+                "first_token_latency": replayed.get("first_token_latency", 0.0)
+            }
+
+        content = self._scripted(messages)
+        first_token_latency = parse_latency_distribution(self._latency_spec())()
+        tokens_per_second = self._tokens_per_second()
+        generation_time = self._estimate_tokens(content) / tokens_per_second if tokens_per_second > 0 else 0.0
+
+        return {
+            "response": content,
+            "token_usage": {},
+            "latency": first_token_latency + generation_time,
+            "first_token_latency": first_token_latency
+        }
+
+    def _token_usage(self, messages: List[Dict[str, str]], content: str, recorded: Dict[str, Any]) -> Dict[str, int]:
+        if recorded.get("total_tokens"):
+            return recorded
+
+        prompt_tokens = sum(self._estimate_tokens(m.get("content", "")) + 4 for m in messages)
+        completion_tokens = self._estimate_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+    # ------------------------------------------------------------------
+    # Provider contract
+    # ------------------------------------------------------------------
+
+    def chat(self, messages: List[Dict[str, str]]) -> LLMResponse:
+        result = self._respond(messages)
+        time.sleep(result["latency"])
+
+        return LLMResponse(
+            content=result["response"],
+            token_usage=self._token_usage(messages, result["response"], result["token_usage"]),
+            raw_response=result
+        )
+
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        result = self._respond(messages)
+        content = result["response"]
+
+        time.sleep(result["first_token_latency"])
+
+        # Word-sized chunks spread over the remaining generation time
+        chunks = re.findall(r"\S+\s*|\s+", content) or [content]
+        per_chunk = max(0.0, result["latency"] - result["first_token_latency"]) / len(chunks)
+
+        for index, chunk in enumerate(chunks):
+            if index and per_chunk:
+                time.sleep(per_chunk)
+            yield chunk
+
+    def estimate_cost(self, input_tokens: int, output_tokens: int) -> float:
+        return 0.0
@@ -3,6 +3,7 @@ from typing import List, Dict, Iterator
 from langchain_openai import ChatOpenAI
 from ..utils import convert_to_langchain_messages
 from .base import BaseLLMProvider, LLMResponse
+from ..prompt_cache import extract_cached_tokens
 from ..errors import AuthenticationError, RateLimitError, ProviderUnavailableError, LLMError, ContextWindowError
 
 class OpenAIProvider(BaseLLMProvider):
@@ -18,7 +19,9 @@ class OpenAIProvider(BaseLLMProvider):
             api_key=self.config.get("api_key") or os.getenv("OPENAI_API_KEY"),
             temperature=self.config.get("temperature", 0.7),
             max_tokens=self.config.get("max_tokens", 2000),
-            request_timeout=self.config.get("timeout", 60)
+            request_timeout=self.config.get("timeout", 60),
+            # Optional base URL (e.g. a local stub server for tests)
+            base_url=self.config.get("base_url") or os.getenv("OPENAI_BASE_URL")
         )
 
     def chat(self, messages: List[Dict[str, str]]) -> LLMResponse:
@@ -29,9 +32,13 @@ class OpenAIProvider(BaseLLMProvider):
             # Invoke LangChain
             response = client.invoke(lc_msgs)
             
+            # Automatic prefix caching: report prompt tokens served from cache
+            token_usage = dict(response.response_metadata.get("token_usage") or {})
+            token_usage["cached_tokens"] = extract_cached_tokens(token_usage)
+            
             return LLMResponse(
                 content=str(response.content),
-                token_usage=response.response_metadata.get("token_usage", {}),
+                token_usage=token_usage,
                 raw_response=response
             )
         
@@ -83,7 +90,10 @@ class OpenAIProvider(BaseLLMProvider):
                 raise RateLimitError(str(e), "openai")
             elif "context length" in error_str or "maximum context" in error_str:
                 raise ContextWindowError(str(e), "openai")
-            elif "500" in error_str or "502" in error_str or "503" in error_str:
+            elif "500" in error_str or "502" in error_str or "503" in error_str or "504" in error_str:
+                raise ProviderUnavailableError(str(e), "openai")
+            # Dropped connections (mid-stream or on connect) are resumable
+            elif "timeout" in error_str or "timed out" in error_str or "connection" in error_str or "incomplete" in error_str:
                 raise ProviderUnavailableError(str(e), "openai")
             else:
                 raise LLMError(f"OpenAI Streaming Error: {str(e)}", "openai")
@@ -0,0 +1,417 @@
+"""
+Client-side rate limiting for LLM providers.
+
+Each (provider, model) pair gets one process-wide ProviderRateLimiter that:
+1. Enforces RPM and TPM budgets with token buckets (proactive, before the call)
+2. Adapts concurrency with AIMD based on observed 429s and latency
+3. Optionally shares bucket state across workers through a file or Redis backend
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+
+from .config import LLMConfig
+from .errors import RateLimitError
+
+
+# ---------------------------------------------------------------------------
+# Bucket backends (shared state)
+# ---------------------------------------------------------------------------
+
+class MemoryBucketBackend:
+    """Token buckets held in this process only."""
+
+    def __init__(self):
+        self._state: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, amount: float, capacity: float, refill_rate: float) -> float:
+        """
+        Try to take `amount` from the bucket.
+        Returns 0 if consumed, otherwise the seconds to wait before retrying.
+        A negative amount refunds tokens (clamped at capacity).
+        More than `capacity` is taken from a full bucket, leaving it in debt.
+        """
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._state.get(key, (capacity, now))
+            tokens, wait = _apply_bucket(tokens, updated, now, amount, capacity, refill_rate)
+            self._state[key] = (tokens, now)
+            return wait
+
+    def drain(self, key: str):
+        """Empty the bucket (used after a 429 so other workers back off too)."""
+        with self._lock:
+            self._state[key] = (0.0, time.monotonic())
+
+
+class FileBucketBackend:
+    """
+    Token buckets stored as small JSON files, shared by every worker on the host.
+    Uses an exclusive lock file per bucket so it works on any platform.
+    """
+
+    def __init__(self, directory: str, lock_timeout: float = 5.0):
+        self.directory = directory
+        self.lock_timeout = lock_timeout
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"bucket_{digest}.json")
+
+    @contextmanager
+    def _locked(self, path: str):
+        lock_path = path + ".lock"
+        deadline = time.time() + self.lock_timeout
+
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                # Break stale locks left behind by crashed workers
+                if time.time() > deadline:
+                    try:
+                        os.remove(lock_path)
+                    except OSError:
+                        pass
+                    deadline = time.time() + self.lock_timeout
+                time.sleep(0.005)
+
+        try:
+            yield
+        finally:
+            os.close(fd)
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+    def _read(self, path: str, capacity: float, now: float) -> Tuple[float, float]:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            return float(data["tokens"]), float(data["updated"])
+        except (OSError, ValueError, KeyError):
+            return capacity, now
+
+    def _write(self, path: str, tokens: float, updated: float):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"tokens": tokens, "updated": updated}, f)
+        os.replace(tmp_path, path)
+
+    def consume(self, key: str, amount: float, capacity: float, refill_rate: float) -> float:
+        path = self._path(key)
+        with self._locked(path):
+            # Wall clock: monotonic clocks are not comparable across processes
+            now = time.time()
+            tokens, updated = self._read(path, capacity, now)
+            tokens, wait = _apply_bucket(tokens, updated, now, amount, capacity, refill_rate)
+            self._write(path, tokens, now)
+            return wait
+
+    def drain(self, key: str):
+        path = self._path(key)
+        with self._locked(path):
+            self._write(path, 0.0, time.time())
+
+
+class RedisBucketBackend:
+    """Token buckets stored in Redis, shared by every worker that can reach it."""
+
+    # Atomic refill + consume. Returns the wait time in milliseconds (0 = consumed).
+    _SCRIPT = """
+    local key = KEYS[1]
+    local amount = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local rate = tonumber(ARGV[3])
+    local now = tonumber(ARGV[4])
+    local state = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local wait = 0
+    if amount <= tokens then
+        tokens = math.min(capacity, tokens - amount)
+    elseif amount > capacity and tokens >= capacity then
+        tokens = tokens - amount
+    else
+        wait = math.ceil((math.min(amount, capacity) - tokens) / rate * 1000)
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'updated', now)
+    -- Kept until the bucket (or its debt) has refilled
+    redis.call('EXPIRE', key, math.ceil((capacity - tokens) / rate) + 60)
+    return wait
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError(
+                "redis not installed. "
+                "Run: pip install redis (or set LLM_RATE_LIMIT_BACKEND=memory)"
+            )
+
+        self.client = redis.Redis.from_url(url)
+        self._consume = self.client.register_script(self._SCRIPT)
+
+    def consume(self, key: str, amount: float, capacity: float, refill_rate: float) -> float:
+        wait_ms = self._consume(
+            keys=[f"llm:ratelimit:{key}"],
+            args=[amount, capacity, refill_rate, time.time()]
+        )
+        return int(wait_ms) / 1000.0
+
+    def drain(self, key: str):
+        self.client.hset(f"llm:ratelimit:{key}", mapping={"tokens": 0, "updated": time.time()})
+
+
+def _apply_bucket(
+    tokens: float,
+    updated: float,
+    now: float,
+    amount: float,
+    capacity: float,
+    refill_rate: float
+) -> Tuple[float, float]:
+    """
+    Refill the bucket, then try to take `amount`. Returns (new_tokens, wait_seconds).
+    Tokens go negative when a request larger than the whole bucket is let through.
+    """
+    tokens = min(capacity, tokens + max(0.0, now - updated) * refill_rate)
+
+    if amount <= tokens:
+        return min(capacity, tokens - amount), 0.0
+
+    # Requests larger than the whole bucket wait for a full bucket, then take all of it
+    # and leave the rest as debt that later requests wait out
+    if amount > capacity and tokens >= capacity:
+        return tokens - amount, 0.0
+
+    needed = min(amount, capacity) - tokens
+    return tokens, needed / refill_rate
+
+
+def _create_backend(conf: Dict[str, Any]):
+    backend = conf["backend"]
+
+    if backend == "memory":
+        return MemoryBucketBackend()
+    elif backend == "file":
+        return FileBucketBackend(conf["directory"])
+    elif backend == "redis":
+        if not conf.get("redis_url"):
+            raise ValueError("LLM_RATE_LIMIT_REDIS_URL is required for the redis rate limit backend")
+        return RedisBucketBackend(conf["redis_url"])
+    else:
+        raise ValueError(f"Unsupported LLM_RATE_LIMIT_BACKEND: {backend}. Use 'memory', 'file' or 'redis'")
+
+
+# ---------------------------------------------------------------------------
+# Adaptive concurrency (AIMD)
+# ---------------------------------------------------------------------------
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Additive-increase / multiplicative-decrease limit on in-flight requests.
+    - Success under the target latency: limit grows by ~1 per full window
+    - 429 (or latency far above target): limit is cut
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        target_latency: float = 0.0,
+        decrease_factor: float = 0.5
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify()
+
+    def on_success(self, latency: float):
+        with self._cond:
+            if self.target_latency and latency > self.target_latency * 2:
+                # Provider is queueing us - back off gently
+                self.limit = max(self.min_limit, self.limit * 0.9)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def on_rate_limited(self):
+        with self._cond:
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+
+# ---------------------------------------------------------------------------
+# Per-provider limiter
+# ---------------------------------------------------------------------------
+
+class RateLimitPermit:
+    """Handle for one in-flight request. Lets the caller report actual token usage."""
+
+    def __init__(self, limiter: "ProviderRateLimiter", reserved_tokens: int):
+        self.limiter = limiter
+        self.reserved_tokens = reserved_tokens
+        self.start_time = time.time()
+
+    def reconcile(self, actual_tokens: int):
+        """Refund the part of the TPM reservation that was not used."""
+        if actual_tokens and actual_tokens < self.reserved_tokens:
+            self.limiter._refund_tokens(self.reserved_tokens - actual_tokens)
+            self.reserved_tokens = actual_tokens
+
+
+class ProviderRateLimiter:
+    """RPM/TPM budgets plus adaptive concurrency for one provider/model."""
+
+    def __init__(self, provider: str, model: str, limits: Dict[str, Any], backend):
+        self.provider = provider
+        self.model = model
+        self.key = f"{provider}:{model}"
+        self.rpm = limits.get("rpm", 0)
+        self.tpm = limits.get("tpm", 0)
+        self.max_wait = limits.get("max_wait", 60)
+        self.backend = backend
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial_limit=limits.get("max_concurrency", 8),
+            min_limit=limits.get("min_concurrency", 1),
+            max_limit=limits.get("max_concurrency", 8),
+            target_latency=limits.get("target_latency", 0.0)
+        )
+
+    def _wait_for(self, bucket: str, amount: float, per_minute: float, deadline: float):
+        if not per_minute:
+            return
+
+        key = f"{self.key}:{bucket}"
+        refill_rate = per_minute / 60.0
+
+        while True:
+            wait = self.backend.consume(key, amount, per_minute, refill_rate)
+            if wait <= 0:
+                return
+
+            if time.monotonic() + wait > deadline:
+                raise RateLimitError(
+                    f"Client-side {bucket.upper()} budget exhausted for {self.model} "
+                    f"(limit {per_minute}/min, would wait {wait:.1f}s)",
+                    self.provider
+                )
+            time.sleep(wait)
+
+    def _refund_tokens(self, amount: int):
+        if self.tpm:
+            self.backend.consume(f"{self.key}:tpm", -amount, self.tpm, self.tpm / 60.0)
+
+    @contextmanager
+    def limit(self, estimated_tokens: int = 0):
+        """
+        Block until the request fits the RPM, TPM and concurrency budgets.
+        Feeds the outcome back into the AIMD controller on exit.
+        """
+        deadline = time.monotonic() + self.max_wait
+
+        if not self.concurrency.acquire(timeout=self.max_wait):
+            raise RateLimitError(
+                f"Client-side concurrency limit ({int(self.concurrency.limit)}) saturated for {self.model}",
+                self.provider
+            )
+
+        try:
+            self._wait_for("rpm", 1, self.rpm, deadline)
+            self._wait_for("tpm", estimated_tokens, self.tpm, deadline)
+
+            permit = RateLimitPermit(self, estimated_tokens)
+            try:
+                yield permit
+            except RateLimitError:
+                # The provider disagrees with our budget: shrink and make everyone wait
+                self.concurrency.on_rate_limited()
+                if self.rpm:
+                    self.backend.drain(f"{self.key}:rpm")
+                print(f" [RateLimiter] 429 from {self.key}, concurrency -> {int(self.concurrency.limit)}")
+                raise
+            else:
+                self.concurrency.on_success(time.time() - permit.start_time)
+        finally:
+            self.concurrency.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight
+        }
+
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_backend = None
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: Optional[str]) -> ProviderRateLimiter:
+    """Return the process-wide limiter for this provider/model (created on first use)."""
+    global _backend
+
+    model = model or "default"
+    key = f"{provider}:{model}"
+
+    limiter = _limiters.get(key)
+    if limiter:
+        return limiter
+
+    with _registry_lock:
+        if key not in _limiters:
+            conf = LLMConfig.get_rate_limit_config(provider, model)
+            if _backend is None:
+                _backend = _create_backend(conf)
+            _limiters[key] = ProviderRateLimiter(provider, model, conf, _backend)
+        return _limiters[key]
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of all active limiters (for debugging / metrics)."""
+    return {key: limiter.stats() for key, limiter in list(_limiters.items())}
+
+
+def reset_rate_limiters():
+    """Drop all limiters so the next call re-reads configuration."""
+    global _backend
+    with _registry_lock:
+        _limiters.clear()
+        _backend = None
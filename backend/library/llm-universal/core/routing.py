@@ -0,0 +1,171 @@
+"""
+Latency-aware routing across LLM providers.
+
+- Failover: if the current provider raises ProviderUnavailableError (or a 429),
+  the next configured provider is tried immediately.
+- Hedging: if the primary has not answered within its recent p95 latency,
+  a second request is sent to an alternate and the first completion wins.
+
+Per-provider latency histograms (see latency.py) drive both the hedge delay
+and the order in which alternates are tried.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Tuple
+
+from .config import LLMConfig
+from .factory import get_llm_provider
+from .latency import get_latency_histogram
+from .rate_limiter import get_rate_limiter
+from .providers.base import BaseLLMProvider, LLMResponse
+from .errors import LLMError, ProviderUnavailableError, RateLimitError
+
+# Errors meaning "this provider cannot serve right now" - move on to the next one
+FAILOVER_ERRORS = (ProviderUnavailableError, RateLimitError)
+
+# Shared pool for hedged calls (threads mostly wait on network I/O)
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-route")
+
+
+def route_key(config: Dict[str, Any]) -> str:
+    """Stable 'provider:model' key used for histograms and limiters."""
+    model = config.get("model") or config.get("deployment_name") or "default"
+    return f"{config['provider']}:{model}"
+
+
+def _build_fallback_configs(primary_config: Dict[str, Any], fallbacks: List[Dict]) -> List[Dict[str, Any]]:
+    """Resolve LLM_FALLBACK_PROVIDERS entries into full provider configs (skipping unconfigured ones)."""
+    configs = []
+    primary_key = route_key(primary_config)
+
+    for entry in fallbacks:
+        try:
+            config = LLMConfig.get_provider_config(entry["provider"], entry["model"])
+        except ValueError as e:
+            print(f" [LLM Router] Skipping fallback '{entry['provider']}': {str(e)}")
+            continue
+
+        if entry["provider"] == "azure" and entry["model"]:
+            # A named deployment, not the AZURE_DEPLOYMENTS pool
+            config["deployment_name"] = entry["model"]
+            config.pop("deployments", None)
+
+        # Keep generation settings consistent with the primary request
+        for key in ("temperature", "max_tokens", "timeout"):
+            if key in primary_config:
+                config[key] = primary_config[key]
+
+        if route_key(config) != primary_key:
+            configs.append(config)
+
+    return configs
+
+
+class ProviderRouter:
+    """Routes one chat request across the primary provider and its alternates."""
+
+    def __init__(self, primary_config: Dict[str, Any], routing_conf: Optional[Dict[str, Any]] = None):
+        routing_conf = routing_conf or LLMConfig.get_routing_config()
+
+        self.primary_config = primary_config
+        self.fallback_configs = _build_fallback_configs(primary_config, routing_conf["fallbacks"])
+        self.hedge_enabled = routing_conf["hedge_enabled"]
+        self.hedge_percentile = routing_conf["hedge_percentile"]
+        self.hedge_min_delay = routing_conf["hedge_min_delay"]
+        self.hedge_default_delay = routing_conf["hedge_default_delay"]
+        self.hedge_min_samples = routing_conf["hedge_min_samples"]
+
+    def _candidates(self) -> List[Dict[str, Any]]:
+        """Primary first, then alternates ordered by observed tail latency (unknown last)."""
+        def tail_latency(config):
+            value = get_latency_histogram(route_key(config)).percentile(self.hedge_percentile)
+            return value if value is not None else float("inf")
+
+        return [self.primary_config] + sorted(self.fallback_configs, key=tail_latency)
+
+    def _hedge_delay(self, config: Dict[str, Any]) -> float:
+        """How long to wait for `config` before racing an alternate."""
+        histogram = get_latency_histogram(route_key(config))
+
+        if histogram.sample_count < self.hedge_min_samples:
+            return self.hedge_default_delay
+
+        return max(self.hedge_min_delay, histogram.percentile(self.hedge_percentile))
+
+    def _call(
+        self,
+        config: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        reserved_tokens: int
+    ) -> Tuple[LLMResponse, BaseLLMProvider, Dict[str, Any]]:
+        """One provider call under its rate limiter, recording latency."""
+        key = route_key(config)
+        llm = get_llm_provider(config)
+        limiter = get_rate_limiter(config["provider"], key.split(":", 1)[1])
+
+        start = time.time()
+        with limiter.limit(reserved_tokens) as permit:
+            response = llm.chat(messages)
+            permit.reconcile(response.token_usage.get("total_tokens", 0))
+
+        get_latency_histogram(key).observe(time.time() - start)
+        return response, llm, config
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        reserved_tokens: int = 0
+    ) -> Tuple[LLMResponse, BaseLLMProvider, Dict[str, Any]]:
+        """
+        Returns (response, provider instance, config actually used).
+        Raises the last error if every candidate failed.
+        """
+        candidates = self._candidates()
+
+        if len(candidates) == 1:
+            return self._call(candidates[0], messages, reserved_tokens)
+
+        pending = {}
+        next_index = 0
+        last_error: Optional[Exception] = None
+
+        def launch():
+            nonlocal next_index
+            config = candidates[next_index]
+            next_index += 1
+            pending[_executor.submit(self._call, config, messages, reserved_tokens)] = config
+
+        launch()
+
+        while pending:
+            can_hedge = self.hedge_enabled and next_index < len(candidates)
+            timeout = self._hedge_delay(candidates[next_index - 1]) if can_hedge else None
+
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Slower than its p95: race the next alternate, keep the original running
+                print(f" [LLM Router] Hedging to {route_key(candidates[next_index])} after {timeout:.2f}s")
+                launch()
+                continue
+
+            for future in done:
+                config = pending.pop(future)
+                try:
+                    response, llm, used_config = future.result()
+                    if used_config is not self.primary_config:
+                        print(f" [LLM Router] Served by {route_key(used_config)}")
+                    return response, llm, used_config
+
+                except FAILOVER_ERRORS as e:
+                    last_error = e
+                    if next_index < len(candidates):
+                        print(f" [LLM Router] {route_key(config)} failed ({type(e).__name__}), failing over to {route_key(candidates[next_index])}")
+                        launch()
+
+                except LLMError as e:
+                    # Not a transient error; only an already in-flight hedge can still save the request
+                    last_error = e
+
+        raise last_error
@@ -1,17 +1,37 @@
-from typing import Dict, Any, Optional, Iterator
+from typing import Dict, Any, List, Optional, Iterator
+import os
 import time
 from .factory import get_llm_provider
 from .config import LLMConfig
-from .utils import with_retries, with_stream_retry, count_tokens
+from .utils import with_retries, count_tokens
 from .errors import LLMError, ContextWindowError
+from .rate_limiter import get_rate_limiter
+from .routing import ProviderRouter, route_key
+from .streaming import StreamMetrics
+from .latency import get_latency_histogram
+from .context_manager import ContextWindowManager, get_context_window
+from .prompt_cache import order_for_prefix_cache, record_prefix_cache_usage, extract_cached_tokens
+from .metrics import usage_metrics
+from .cascade import CascadeRouter
 
 # Get config once
 RETRY_CONF = LLMConfig.get_retry_config()
 
+def _get_limiter(provider_config: Dict[str, Any]):
+    """Shared rate limiter for the configured provider/model."""
+    model = provider_config.get("model") or provider_config.get("deployment_name")
+    return get_rate_limiter(provider_config["provider"], model)
+
+
+def _record_retry(error: Exception, provider_config: Dict[str, Any], *args, **kwargs):
+    usage_metrics.record_retry(provider_config["provider"], route_key(provider_config).split(":", 1)[1])
+
+
 @with_retries(
     max_attempts=RETRY_CONF["max_attempts"],
     min_seconds=RETRY_CONF["min_seconds"],
-    max_seconds=RETRY_CONF["max_seconds"]
+    max_seconds=RETRY_CONF["max_seconds"],
+    on_retry=_record_retry
 )
 def _execute_chat(provider_config: Dict[str, Any], messages: list) -> tuple:
     """
@@ -20,46 +40,135 @@ def _execute_chat(provider_config: Dict[str, Any], messages: list) -> tuple:
     """
     start_time = time.time()
     
-    # 1. Validate token limits BEFORE calling provider
+    # 1. Validate token limits BEFORE calling provider (callers compact via _fit_context first)
     token_count = count_tokens(messages, provider_config.get("model", "gpt-4"))
-    max_context = provider_config.get("max_tokens", 4096) * 2  # Rough context window estimate
+    max_context = get_context_window(provider_config.get("model"))
     
     if token_count > max_context:
         raise ContextWindowError(
-            f"Prompt too long: {token_count} tokens exceeds estimated limit of {max_context}",
+            f"Prompt too long: {token_count} tokens exceeds the {max_context} token context window",
             provider_config["provider"]
         )
     
-    # 2. Initialize Provider
-    llm = get_llm_provider(provider_config)
+    # 2. Execute through the router (rate limiting, failover and hedging per provider)
+    #    Reserve prompt + max completion tokens against the TPM budget
+    router = ProviderRouter(provider_config)
+    reserved_tokens = token_count + provider_config.get("max_tokens", 2000)
     
-    # 3. Execute
-    response = llm.chat(messages)
+    response, llm, used_config = router.chat(messages, reserved_tokens)
     
-    # 4. Calculate metrics
+    # 3. Calculate metrics
     elapsed = time.time() - start_time
     
-    # 5. Log metrics
+    # 4. Log metrics
     print(f"   [LLM Metrics]")
-    print(f"   Provider: {provider_config['provider']}")
-    print(f"   Model: {provider_config.get('model', 'default')}")
+    print(f"   Provider: {used_config['provider']}")
+    print(f"   Model: {used_config.get('model', 'default')}")
     print(f"   Input Tokens: ~{token_count}")
+    print(f"   Cached Input Tokens: {response.token_usage.get('cached_tokens', 0)}")
     print(f"   Output Tokens: {response.token_usage.get('completion_tokens', 'N/A')}")
     print(f"   Total Tokens: {response.token_usage.get('total_tokens', 'N/A')}")
     print(f"   Latency: {elapsed:.2f}s")
     
+    used_model = route_key(used_config).split(":", 1)[1]
+    input_tokens = response.token_usage.get('prompt_tokens', token_count)
+    output_tokens = response.token_usage.get('completion_tokens', 0)
+    cached_tokens = extract_cached_tokens(response.token_usage)
+    
+    record_prefix_cache_usage(used_config["provider"], used_model, input_tokens, cached_tokens)
+    
     # Estimate cost if provider supports it
+    cost = 0.0
     try:
-        input_tokens = response.token_usage.get('prompt_tokens', token_count)
-        output_tokens = response.token_usage.get('completion_tokens', 0)
         cost = llm.estimate_cost(input_tokens, output_tokens)
         print(f"   Estimated Cost: ${cost:.6f}")
     except:
         pass  # Cost estimation not available for this provider
     
+    # 5. Usage accounting (per provider/model/project/node)
+    usage_metrics.record_call(
+        used_config["provider"],
+        used_model,
+        prompt_tokens=input_tokens,
+        completion_tokens=output_tokens,
+        cached_tokens=cached_tokens,
+        latency=elapsed,
+        cost=cost
+    )
+    
     return response.content, response.token_usage, elapsed
 
 
+def _load_config(override_config: Optional[Dict] = None) -> Dict[str, Any]:
+    """
+    Env > Defaults > Overrides.
+    Raises ValueError if the provider is not configured (e.g. missing API key).
+    """
+    override_provider = (override_config or {}).get("provider")
+    
+    if override_provider and override_provider.lower() != os.getenv("LLM_PROVIDER", "openai").lower():
+        # Node picked a different provider - do not require credentials of the env provider
+        config = LLMConfig.get_provider_config(override_provider, override_config.get("model"))
+    else:
+        config = LLMConfig.get_provider_config()
+    
+    if override_config:
+        config.update(override_config)
+    return config
+
+
+def is_configured(override_config: Optional[Dict] = None) -> bool:
+    """
+    Whether the provider a call with these overrides would use is configured
+    (API key etc. present). No request is made.
+    """
+    try:
+        _load_config(override_config)
+        return True
+    except ValueError:
+        return False
+
+
+def _record_error(override_config: Optional[Dict] = None):
+    """Count a request that failed for good (after retries and failover)."""
+    try:
+        config = _load_config(override_config)
+        usage_metrics.record_error(config["provider"], route_key(config).split(":", 1)[1])
+    except Exception:
+        pass  # Misconfigured provider - nothing meaningful to attribute it to
+
+
+def _build_messages(prompt: str, context: str, system_prompt: str, rag_instructions: str) -> List[Dict[str, Any]]:
+    """
+    Build the message list. RAG context goes into the system message and is
+    also kept under "rag_context" so the context manager can trim it by relevance.
+    """
+    if context:
+        system_message = {"role": "system", "content": f"{rag_instructions}{context}", "rag_context": context}
+    else:
+        system_message = {"role": "system", "content": system_prompt}
+    
+    return [system_message, {"role": "user", "content": prompt}]
+
+
+def _fit_context(config: Dict[str, Any], messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Compact messages that do not fit the model's context window (raises ContextWindowError if impossible)."""
+    manager = ContextWindowManager(
+        model=config.get("model"),
+        max_output_tokens=config.get("max_tokens", 2000),
+        strategy=config.get("context_strategy")
+    )
+    messages, report = manager.fit(messages, config["provider"])
+    return messages
+
+
+def _complete(config: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+    """Fit the model's context window (stable prefix first for provider prompt caching) and execute."""
+    messages = order_for_prefix_cache(_fit_context(config, messages))
+    content, token_usage, elapsed = _execute_chat(config, messages)
+    return content
+
+
 def chat(prompt: str, context: str = "", override_config: Optional[Dict] = None) -> str:
     """
     Universal Chat Function with Retries, Validation, and Metrics.
@@ -69,39 +178,43 @@ def chat(prompt: str, context: str = "", override_config: Optional[Dict] = None)
         context: Optional context for RAG (if from retriever/PDF)
         override_config: Optional config overrides (e.g., from UI)
     
+    Returns:
+        AI response as string
+    """
+    # Build Messages (RAG Logic)
+    messages = _build_messages(
+        prompt,
+        context,
+        system_prompt="You are a helpful AI assistant.",
+        rag_instructions=(
+            "You are a helpful AI assistant. "
+            "Use the following context to answer the user's question accurately. "
+            "If the answer is not in the context, say so.\n\n"
+            "Context:\n"
+        )
+    )
+    
+    return chat_messages(messages, override_config)
+
+
+def chat_messages(messages: List[Dict[str, Any]], override_config: Optional[Dict] = None) -> str:
+    """
+    Chat with a full conversation (e.g. the ReAct agent loop).
+    Long conversations are compacted to fit the model's context window.
+    
     Returns:
         AI response as string
     """
     try:
         # 1. Load Config (Env > Defaults > Overrides)
-        config = LLMConfig.get_provider_config()
-        if override_config:
-            config.update(override_config)
+        config = _load_config(override_config)
 
-        # 2. Build Messages (RAG Logic)
-        messages = []
-        
-        if context:
-            # RAG MODE: Include context in system message
-            system_prompt = (
-                "You are a helpful AI assistant. "
-                "Use the following context to answer the user's question accurately. "
-                "If the answer is not in the context, say so.\n\n"
-                f"Context:\n{context}"
-            )
-            messages.append({"role": "system", "content": system_prompt})
-        else:
-            # STANDARD MODE
-            messages.append({"role": "system", "content": "You are a helpful AI assistant."})
-            
-        messages.append({"role": "user", "content": prompt})
-
-        # 3. Execute with Retries and Metrics
-        content, token_usage, elapsed = _execute_chat(config, messages)
-        return content
+        # 2. Small model first when the cascade is enabled, escalating if its answer fails the checks
+        return CascadeRouter(config).run(messages, _complete)
 
     except LLMError as e:
         # Known Provider Error with clear message
+        _record_error(override_config)
         return f" AI Provider Error: {str(e)}"
     
     except Exception as e:
@@ -112,39 +225,29 @@ def chat(prompt: str, context: str = "", override_config: Optional[Dict] = None)
         return f" System Error: {str(e)}"
 
 
-@with_stream_retry(max_attempts=3)
 def stream_chat(prompt: str, context: str = "", override_config: Optional[Dict] = None) -> Iterator[str]:
     """
     Generator function for Streaming Chat with connection retry.
     Yields chunks of text (tokens) as they are generated.
     
-    Note: Retries only the initial connection, not mid-stream errors.
+    Dropped streams are reconnected; if output had already started, the model
+    is asked to continue from the emitted prefix and the overlap is removed.
     """
     try:
         # 1. Load Config
-        config = LLMConfig.get_provider_config()
-        if override_config:
-            config.update(override_config)
-        
-        # 2. Validate token limits
-        messages = []
-        if context:
-            messages.append({
-                "role": "system", 
-                "content": f"Use this context to answer:\n\n{context}"
-            })
-        else:
-            messages.append({"role": "system", "content": "You are a helpful assistant."})
-        
-        messages.append({"role": "user", "content": prompt})
+        config = _load_config(override_config)
         
-        # Check token count
+        # 2. Build messages, pick the cascade tier (streams cannot be checked and escalated)
+        #    and fit the context window (compacts instead of failing)
+        messages = _build_messages(
+            prompt,
+            context,
+            system_prompt="You are a helpful assistant.",
+            rag_instructions="Use this context to answer:\n\n"
+        )
+        config = CascadeRouter(config).select(messages)
+        messages = order_for_prefix_cache(_fit_context(config, messages))
         token_count = count_tokens(messages, config.get("model", "gpt-4"))
-        max_context = config.get("max_tokens", 4096) * 2
-        
-        if token_count > max_context:
-            yield f"[ERROR: Prompt too long ({token_count} tokens)]"
-            return
         
         # 3. Initialize Provider
         llm = get_llm_provider(config)
@@ -152,10 +255,46 @@ def stream_chat(prompt: str, context: str = "", override_config: Optional[Dict]
         # 4. Stream Response
         print(f" [LLM Streaming] Provider: {config['provider']}, Model: {config.get('model')}")
         
-        for chunk in llm.stream(messages):
-            yield chunk
+        limiter = _get_limiter(config)
+        
+        with limiter.limit(token_count + config.get("max_tokens", 2000)):
+            # Started once the limiter admits the request: TTFT excludes client-side queueing
+            metrics = StreamMetrics()
+            for chunk in llm.stream_with_resume(messages, max_resumes=RETRY_CONF["max_attempts"], metrics=metrics):
+                yield chunk
+        
+        # 5. Record streaming latency (time to first token, inter-token)
+        key = route_key(config)
+        if metrics.first_token_latency is not None:
+            get_latency_histogram(f"{key}:ttft").observe(metrics.first_token_latency)
+        get_latency_histogram(key).observe(metrics.total_latency)
+        
+        # Streaming responses carry no usage block - estimate completion tokens from the text
+        completion_tokens = metrics.chars // 4
+        try:
+            cost = llm.estimate_cost(token_count, completion_tokens)
+        except Exception:
+            cost = 0.0
+        
+        usage_metrics.record_call(
+            config["provider"],
+            key.split(":", 1)[1],
+            prompt_tokens=token_count,
+            completion_tokens=completion_tokens,
+            latency=metrics.total_latency,
+            ttft=metrics.first_token_latency,
+            cost=cost
+        )
+        
+        summary = metrics.summary()
+        print(
+            f" [LLM Streaming] TTFT: {summary['first_token_latency']}s, "
+            f"ITL p50/p95: {summary['inter_token_p50']}/{summary['inter_token_p95']}s, "
+            f"Chunks: {summary['chunks']}, Resumes: {summary['resumes']}"
+        )
 
     except LLMError as e:
+        _record_error(override_config)
         yield f"[ERROR: {str(e)}]"
     
     except Exception as e:
@@ -0,0 +1,180 @@
+"""
+Resilient streaming.
+
+If a stream drops before the first token we simply reconnect. If it drops
+after partial output, we reconnect with a continuation prompt (original
+messages + the partial answer + "continue") and strip whatever the model
+repeats from the already emitted text, so the caller sees one seamless stream.
+"""
+
+import time
+import random
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .errors import ProviderUnavailableError, RateLimitError
+from .latency import LatencyHistogram
+
+# Transient failures worth reconnecting for
+RESUMABLE_ERRORS = (ProviderUnavailableError, RateLimitError)
+
+RESUME_INSTRUCTION = (
+    "Your previous response was cut off. Continue exactly where it stopped. "
+    "Do not repeat any text you already wrote and do not add any preamble."
+)
+
+# How much of the continuation we buffer before de-duplicating against the prefix
+OVERLAP_WINDOW = 200
+
+# Shorter repeats are only stripped if they are two or more whole words;
+# a single matching character or word is usually new text ("a" / "an apple")
+MIN_OVERLAP = 16
+
+
+class StreamMetrics:
+    """Time to first token and inter-token latency for one streamed response."""
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.first_token_latency: Optional[float] = None
+        self.inter_token = LatencyHistogram(window=1024)
+        self.chunks = 0
+        self.chars = 0
+        self.resumes = 0
+        self._last_token_time: Optional[float] = None
+
+    def on_chunk(self, chunk: str):
+        now = time.time()
+        if self.first_token_latency is None:
+            self.first_token_latency = now - self.start_time
+        else:
+            self.inter_token.observe(now - self._last_token_time)
+        self._last_token_time = now
+        self.chunks += 1
+        self.chars += len(chunk)
+
+    @property
+    def total_latency(self) -> float:
+        end = self._last_token_time or time.time()
+        return end - self.start_time
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        def rounded(value):
+            return round(value, 4) if value is not None else None
+
+        return {
+            "first_token_latency": rounded(self.first_token_latency),
+            "inter_token_p50": rounded(self.inter_token.percentile(0.50)),
+            "inter_token_p95": rounded(self.inter_token.percentile(0.95)),
+            "total_latency": round(self.total_latency, 4),
+            "chunks": self.chunks,
+            "chars": self.chars,
+            "resumes": self.resumes
+        }
+
+
+def build_resume_messages(messages: List[Dict[str, str]], partial: str) -> List[Dict[str, str]]:
+    """Original conversation + the partial answer + an instruction to continue."""
+    return messages + [
+        {"role": "assistant", "content": partial},
+        {"role": "user", "content": RESUME_INSTRUCTION}
+    ]
+
+
+def strip_overlap(emitted: str, continuation: str, max_overlap: int = OVERLAP_WINDOW) -> str:
+    """
+    Remove the part of `continuation` that repeats the end of `emitted`.
+    Finds the longest prefix of the continuation that is a suffix of the emitted
+    text and is long enough to be a real repeat (see MIN_OVERLAP); otherwise
+    the continuation is kept as is.
+    """
+    tail = emitted[-max_overlap:]
+
+    for size in range(min(len(tail), len(continuation)), 0, -1):
+        overlap = continuation[:size]
+        if not tail.endswith(overlap):
+            continue
+        if size >= MIN_OVERLAP or _whole_words(emitted, continuation, size):
+            return continuation[size:]
+
+    return continuation
+
+
+def _whole_words(emitted: str, continuation: str, size: int) -> bool:
+    """Whether the repeated text is two or more words cut at word boundaries on both ends"""
+    overlap = continuation[:size]
+    if len(overlap.split()) < 2:
+        return False
+    start = len(emitted) - size
+    starts_word = start == 0 or not emitted[start - 1].isalnum() or not overlap[0].isalnum()
+    ends_word = size == len(continuation) or not continuation[size].isalnum() or not overlap[-1].isalnum()
+    return starts_word and ends_word
+
+
+def resumable_stream(
+    open_stream: Callable[[List[Dict[str, str]]], Iterator[str]],
+    messages: List[Dict[str, str]],
+    max_resumes: int = 2,
+    max_seconds: float = 10,
+    metrics: Optional[StreamMetrics] = None
+) -> Iterator[str]:
+    """
+    Stream from `open_stream(messages)`, reconnecting on transient errors.
+
+    Args:
+        open_stream: Callable returning a chunk iterator (e.g. provider.stream)
+        messages: Original conversation
+        max_resumes: Reconnect attempts (before or after partial output)
+        max_seconds: Cap on the backoff between attempts
+        metrics: Optional StreamMetrics to record token timings into
+    """
+    metrics = metrics or StreamMetrics()
+    emitted = ""
+    attempt = 0
+
+    while True:
+        resuming = bool(emitted)
+        request = build_resume_messages(messages, emitted) if resuming else messages
+        pending = ""  # continuation text held back until the overlap is resolved
+
+        try:
+            for chunk in open_stream(request):
+                if not chunk:
+                    continue
+
+                if resuming:
+                    pending += chunk
+                    if len(pending) < OVERLAP_WINDOW:
+                        continue
+                    chunk = strip_overlap(emitted, pending)
+                    pending = ""
+                    resuming = False
+                    if not chunk:
+                        continue
+
+                emitted += chunk
+                metrics.on_chunk(chunk)
+                yield chunk
+
+            # Stream ended cleanly - flush a short continuation
+            if resuming and pending:
+                chunk = strip_overlap(emitted, pending)
+                if chunk:
+                    emitted += chunk
+                    metrics.on_chunk(chunk)
+                    yield chunk
+            return
+
+        except RESUMABLE_ERRORS as e:
+            if attempt >= max_resumes:
+                raise
+
+            attempt += 1
+            if emitted:
+                metrics.resumes += 1
+            sleep_time = min(max_seconds, 2 ** (attempt - 1)) + random.uniform(0, 0.5)
+
+            if emitted:
+                print(f" [Stream Resume] Dropped after {len(emitted)} chars ({str(e)}). Resuming in {sleep_time:.2f}s...")
+            else:
+                print(f" [Stream Retry] Attempt {attempt}/{max_resumes} failed. Retrying in {sleep_time:.2f}s...")
+            time.sleep(sleep_time)
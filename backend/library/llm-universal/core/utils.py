@@ -28,10 +28,11 @@ def convert_to_langchain_messages(messages: List[Dict[str, str]]):
     return lc_messages
 
 
-def with_retries(max_attempts: int = 3, min_seconds: int = 1, max_seconds: int = 10):
+def with_retries(max_attempts: int = 3, min_seconds: int = 1, max_seconds: int = 10, on_retry: Callable = None):
     """
     Decorator to retry functions on transient errors (Rate Limits, 503s).
     Uses 'Exponential Backoff with Jitter'.
+    on_retry(error, *args, **kwargs) is called before each retry (e.g. for metrics).
     """
     def decorator(func: Callable):
         @functools.wraps(func)
@@ -55,6 +56,8 @@ def with_retries(max_attempts: int = 3, min_seconds: int = 1, max_seconds: int =
                     sleep_time += random.uniform(0, 1)
                     
                     print(f" [LLM Retry] Attempt {attempt}/{max_attempts} failed: {str(e)}. Retrying in {sleep_time:.2f}s...")
+                    if on_retry:
+                        on_retry(e, *args, **kwargs)
                     time.sleep(sleep_time)
                     attempt += 1
                 
@@ -71,36 +74,34 @@ def with_retries(max_attempts: int = 3, min_seconds: int = 1, max_seconds: int =
 
 def with_stream_retry(max_attempts: int = 3):
     """
-    Retry only the stream connection, not mid-stream chunks.
-    Once streaming starts, we don't retry (too complex).
+    Retry a generator function until it yields its first chunk.
+    
+    The wrapper is itself a generator, so connection errors raised when the
+    stream is actually opened (on first iteration) are caught here.
+    Errors after output has started are re-raised; use
+    streaming.resumable_stream to continue a partially emitted answer.
     """
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             attempt = 1
-            last_error = None
             
-            while attempt <= max_attempts:
+            while True:
+                started = False
                 try:
-                    # Return the generator directly - don't iterate here
-                    # This only retries the initial connection
-                    return func(*args, **kwargs)
+                    for chunk in func(*args, **kwargs):
+                        started = True
+                        yield chunk
+                    return
                     
                 except (RateLimitError, ProviderUnavailableError) as e:
-                    last_error = e
-                    if attempt == max_attempts:
+                    if started or attempt == max_attempts:
                         raise e
                     
                     sleep_time = min(10, 2 ** (attempt - 1))
                     print(f" [Stream Retry] Attempt {attempt}/{max_attempts} failed. Retrying in {sleep_time:.2f}s...")
                     time.sleep(sleep_time)
                     attempt += 1
-                
-                except Exception as e:
-                    # Don't retry auth errors or unknown errors
-                    raise e
-            
-            raise last_error
                     
         return wrapper
     return decorator
@@ -1,14 +1,15 @@
 from typing import Dict, Any
 import os
 import traceback
-from ..core.service import chat
+from ..core.service import chat, chat_messages, is_configured
 from ..core.errors import AuthenticationError, LLMError
+from ..core.metrics import usage_labels
 
 def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
     """
     Runtime Adapter for the Visual Builder.
     Attempts to call the real LLM if keys are present.
-    Otherwise, returns a simulation mock.
+    Otherwise, answers through the offline mock provider (simulation mode).
     """
     print(f"--- [Runtime] Executing Universal LLM ---")
     
@@ -16,6 +17,9 @@ def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
     prompt = inputs.get("prompt", "Hello World")
     rag_context = inputs.get("context", "")
     
+    # Agents pass the whole conversation instead of a single prompt
+    conversation = inputs.get("messages")
+    
     # 2. Extract Config from the Node's Settings (if passed by Executor)
     node_config = context.get("node_config", {})
     
@@ -34,16 +38,34 @@ def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         override_config["model"] = node_config["model"]
     if "temperature" in node_config:
         override_config["temperature"] = float(node_config["temperature"])
+    if "context_strategy" in node_config:
+        override_config["context_strategy"] = node_config["context_strategy"]
+    
+    # Hints for the model cascade (small model first, escalate on demand)
+    if "difficulty" in node_config:
+        override_config["difficulty"] = node_config["difficulty"]
+    override_config["node_type"] = "agent" if conversation else (upstream_node_type or "llm")
     
     # Log execution details
+    if conversation:
+        print(f"   Conversation: {len(conversation)} messages")
     print(f"   Prompt: {prompt[:100]}..." if len(prompt) > 100 else f"   Prompt: {prompt}")
     print(f"   Context Length: {len(actual_context)} chars")
     print(f"   RAG Mode: {is_rag_context}")
     print(f"   Override Config: {override_config}")
 
     try:
-        # Attempt Real Execution
-        response_text = chat(prompt, actual_context, override_config)
+        # Missing credentials -> simulation mode (the service itself would only return an error string)
+        if not is_configured(override_config):
+            provider = override_config.get("provider", os.getenv("LLM_PROVIDER", "openai"))
+            raise ValueError(f"provider '{provider}' is not configured")
+        
+        # Attempt Real Execution (usage is attributed to this project/node)
+        with usage_labels(context.get("project_id"), context.get("node_id")):
+            if conversation:
+                response_text = chat_messages(conversation, override_config)
+            else:
+                response_text = chat(prompt, actual_context, override_config)
         
         return {
             "response": response_text,
@@ -53,29 +75,31 @@ def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         }
         
     except (ValueError, AuthenticationError) as e:
-        # Fallback to Simulation Mode
+        # Fallback to Simulation Mode: answer through the offline mock provider
+        # (honours LLM_MOCK_SCRIPT / cassette replay, so agents still get TOOL:/ANSWER: turns)
         print(f"   [Runtime] Falling back to Simulation: {str(e)}")
         
         provider = override_config.get("provider", os.getenv("LLM_PROVIDER", "openai"))
+        simulation_config = {**override_config, "provider": "mock", "model": "mock-1"}
+        
+        with usage_labels(context.get("project_id"), context.get("node_id")):
+            if conversation:
+                simulated_response = chat_messages(conversation, simulation_config)
+            else:
+                simulated_response = chat(prompt, actual_context, simulation_config)
         
-        simulated_response = (
-            f" **SIMULATION MODE**\n\n"
-            f"Your prompt: \"{prompt}\"\n\n"
-            f"**Configuration:**\n"
-            f"- Provider: {provider}\n"
-            f"- Model: {override_config.get('model', 'default')}\n"
-            f"- RAG Mode: {' Active' if is_rag_context else ' Disabled'}\n"
-            f"- Context: {len(actual_context)} characters\n\n"
-            f"**To enable real AI:**\n"
-            f"Set the appropriate API key in your backend .env file:\n"
+        # The notice comes first; agents still find the TOOL:/ANSWER: turn after it
+        notice = (
+            f" **SIMULATION MODE** ({str(e)})\n\n"
+            f"To enable real AI, set the API key in your backend .env file:\n"
             f"- OpenAI: OPENAI_API_KEY\n"
             f"- Azure: AZURE_OPENAI_API_KEY + AZURE_OPENAI_ENDPOINT + AZURE_DEPLOYMENT_NAME\n"
-            f"- Gemini: GOOGLE_API_KEY\n\n"
-            f"This simulation allows you to test your workflow logic without API keys."
+            f"- Gemini: GOOGLE_API_KEY\n"
+            f"Set LLM_PROVIDER=mock to run offline on purpose.\n\n"
         )
         
         return {
-            "response": simulated_response,
+            "response": notice + simulated_response,
             "success": False,
             "simulation": True,
             "provider": provider
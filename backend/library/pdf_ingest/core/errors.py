@@ -0,0 +1,3 @@
+class PdfIngestError(Exception):
+    """Base error for PDF ingestion"""
+    pass
@@ -0,0 +1,144 @@
+"""
+Minimal threaded pipeline: stages connected by bounded queues.
+
+Each stage runs on its own thread, reading from an inbox and writing to an
+outbox. Queues hold at most `queue_size` items, so a slow stage makes the ones
+before it block (backpressure) instead of buffering the whole document. The
+first failure in any stage stops every stage and is re-raised by join().
+"""
+
+import time
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# How often blocked puts/gets check whether the pipeline was stopped
+POLL_SECONDS = 0.1
+
+
+class PipelineStopped(Exception):
+    """Raised inside a stage when another stage has failed"""
+    pass
+
+
+class Pipeline:
+    """Bounded channels, stage threads, shared stop/error state and per-stage timings."""
+
+    END = object()
+
+    def __init__(self, queue_size: int):
+        self.queue_size = max(1, queue_size)
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def channel(self) -> "queue.Queue":
+        return queue.Queue(maxsize=self.queue_size)
+
+    def _record(self, stage: str, name: str, value: float):
+        # Several workers may share a stage name
+        with self._lock:
+            timing = self.timings.setdefault(stage, {"busy_seconds": 0.0, "blocked_seconds": 0.0, "waiting_seconds": 0.0, "items": 0})
+            timing[name] += value
+
+    def put(self, stage: str, channel: "queue.Queue", item: Any):
+        """Send downstream; blocks while the channel is full (time counted as 'blocked')."""
+        started = time.time()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                channel.put(item, timeout=POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        self._record(stage, "blocked_seconds", time.time() - started)
+
+    def get(self, channel: "queue.Queue", stage: Optional[str] = None) -> Any:
+        """Receive from upstream; time spent on an empty channel is counted as 'waiting'."""
+        started = time.time()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                item = channel.get(timeout=POLL_SECONDS)
+                break
+            except queue.Empty:
+                continue
+        if stage:
+            self._record(stage, "waiting_seconds", time.time() - started)
+        return item
+
+    def fail(self, error: BaseException):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def spawn(self, stage: str, fn: Callable, *args):
+        """Run `fn(*args)` on a stage thread; its exceptions stop the pipeline."""
+        def target():
+            try:
+                fn(*args)
+            except PipelineStopped:
+                pass
+            except BaseException as e:
+                self.fail(e)
+
+        thread = threading.Thread(target=target, name=f"pdf-ingest-{stage}", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def produce(self, stage: str, items: Iterable, outbox: "queue.Queue", consumers: int = 1):
+        """Send every item downstream, then one END per consumer."""
+        items = iter(items)
+        while True:
+            waited = self.timings.get(stage, {}).get("waiting_seconds", 0.0)
+            started = time.time()
+            try:
+                item = next(items)
+            except StopIteration:
+                break
+            finally:
+                # Time blocked on an upstream channel inside `items` is not work
+                waiting = self.timings.get(stage, {}).get("waiting_seconds", 0.0) - waited
+                self._record(stage, "busy_seconds", time.time() - started - waiting)
+            self._record(stage, "items", 1)
+            self.put(stage, outbox, item)
+
+        for _ in range(consumers):
+            self.put(stage, outbox, self.END)
+
+    def consume(self, stage: str, inbox: "queue.Queue", producers: int, fn: Callable[[Any], Any], outbox: Optional["queue.Queue"] = None):
+        """Apply `fn` to every item until all `producers` have sent END; results go to `outbox` if given."""
+        remaining = producers
+        while remaining:
+            item = self.get(inbox, stage)
+            if item is self.END:
+                remaining -= 1
+                continue
+            started = time.time()
+            result = fn(item)
+            self._record(stage, "busy_seconds", time.time() - started)
+            self._record(stage, "items", 1)
+            if outbox is not None:
+                self.put(stage, outbox, result)
+
+        if outbox is not None:
+            self.put(stage, outbox, self.END)
+
+    def join(self):
+        """Wait for every stage; re-raises the first failure."""
+        for thread in self._threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                stage: {name: round(value, 3) if isinstance(value, float) else value for name, value in timing.items()}
+                for stage, timing in self.timings.items()
+            }
@@ -0,0 +1,255 @@
+import io
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from pypdf import PdfReader
+
+from .errors import PdfIngestError
+from .pipeline import Pipeline, PipelineStopped
+
+
+def _get_vector_store():
+    """
+    Dynamically import the vector store service.
+    Tries multiple import paths to support different execution contexts.
+    """
+    try:
+        # Try backend library context
+        from library.vector_store_chroma.core import service
+        return service
+    except ImportError:
+        try:
+            # Try generated app context
+            from features.vector_store_chroma import service
+            return service
+        except ImportError:
+            try:
+                # Try relative import
+                from ...vector_store_chroma.core import service
+                return service
+            except ImportError:
+                raise ImportError(
+                    " vector_store_chroma feature not found. "
+                    "Make sure it's included in your workflow and properly configured."
+                )
+
+
+def get_pipeline_config(
+    batch_size: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    embed_workers: Optional[int] = None
+) -> Dict[str, int]:
+    return {
+        "batch_size": max(1, int(batch_size or os.getenv("PDF_INGEST_BATCH_SIZE", "64"))),
+        "queue_size": max(1, int(queue_size or os.getenv("PDF_INGEST_QUEUE_SIZE", "4"))),
+        "embed_workers": max(1, int(embed_workers or os.getenv("PDF_INGEST_EMBED_WORKERS", "2")))
+    }
+
+
+def _open_pdf(file: Union[str, bytes, Any]) -> PdfReader:
+    """PdfReader over a path, raw bytes or a binary file object."""
+    if isinstance(file, (bytes, bytearray)):
+        return PdfReader(io.BytesIO(file))
+    return PdfReader(file)
+
+
+def iter_pdf_pages(reader: PdfReader) -> Iterator[Tuple[int, str]]:
+    """(1-based page number, text) per page, extracted lazily."""
+    for number, page in enumerate(reader.pages, start=1):
+        yield number, page.extract_text() or ""
+
+
+def iter_page_chunks(pages: Iterator[Tuple[int, str]], splitter: Any) -> Iterator[Tuple[str, int]]:
+    """
+    Split a stream of pages into (chunk, page number) without loading the document.
+
+    The last chunk of each split is carried into the next page's text, so
+    chunks still flow across page breaks. A chunk is tagged with the page it
+    starts on.
+    """
+    carry = ""
+    # (offset in the buffer, page number) where each page's text begins
+    boundaries: List[Tuple[int, int]] = []
+
+    def page_at(offset: int) -> int:
+        page = boundaries[0][1]
+        for start, number in boundaries:
+            if start > offset:
+                break
+            page = number
+        return page
+
+    def split(buffer: str) -> List[Tuple[str, int]]:
+        chunks = []
+        position = 0
+        for chunk in splitter.split_text(buffer):
+            found = buffer.find(chunk, position)
+            if found >= 0:
+                position = found
+            chunks.append((chunk, page_at(position)))
+        return chunks
+
+    for number, text in pages:
+        if not text.strip():
+            continue
+        boundaries.append((len(carry) + 1 if carry else 0, number))
+        buffer = f"{carry}\n{text}" if carry else text
+
+        chunks = split(buffer)
+        if not chunks:
+            continue
+        yield from chunks[:-1]
+
+        carry = chunks[-1][0]
+        carry_offset = buffer.rfind(carry)
+        carry_page = page_at(carry_offset if carry_offset >= 0 else 0)
+        boundaries = [(0, carry_page)]
+
+    if carry:
+        yield from split(carry)
+
+
+def ingest_pdf(
+    file: Union[str, bytes, Any],
+    collection_name: str = "default",
+    metadata: Optional[Dict] = None,
+    chunking_strategy: str = "recursive",
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    quantization: Optional[str] = None,
+    backend: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    embed_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Index a PDF into a vector store collection as a pipeline:
+
+        pages -> splitter -> batched embedding (embed_workers) -> upsert
+
+    Stages run concurrently and are connected by queues of `queue_size`
+    items, so text extraction of later pages overlaps embedding and storage of
+    earlier ones, and memory stays bounded however large the PDF is. Chunks
+    already stored (same source and content) are not re-embedded, and chunks
+    that disappeared from the document are removed.
+
+    Args:
+        file: PDF path, bytes or binary file object
+        collection_name: Target collection
+        metadata: Metadata for every chunk; 'source' (or 'filename') names the document
+        chunking_strategy, chunk_size, chunk_overlap, quantization, backend: as in vector_store_chroma
+        batch_size: Chunks per embedding call/upsert (default PDF_INGEST_BATCH_SIZE)
+        queue_size: Items buffered between stages (default PDF_INGEST_QUEUE_SIZE)
+        embed_workers: Concurrent embedding calls (default PDF_INGEST_EMBED_WORKERS)
+
+    Returns:
+        Dict with counts, per-stage timings and throughput
+    """
+    vector_store = _get_vector_store()
+    conf = get_pipeline_config(batch_size, queue_size, embed_workers)
+
+    metadata = dict(metadata or {})
+    if isinstance(file, str):
+        metadata.setdefault("filename", os.path.basename(file))
+        metadata.setdefault("source", file)
+    source = metadata.get("source") or metadata.get("filename") or ""
+
+    try:
+        reader = _open_pdf(file)
+        page_count = len(reader.pages)
+    except Exception as e:
+        raise PdfIngestError(f"Failed to read PDF: {str(e)}")
+
+    print(f"📥 [PdfIngest] Ingesting {page_count} pages into collection: {collection_name}")
+
+    try:
+        session = vector_store.IngestSession(
+            collection_name, metadata, chunking_strategy, chunk_size, chunk_overlap, quantization, backend
+        )
+
+        pipeline = Pipeline(conf["queue_size"])
+        pages = pipeline.channel()
+        batches = pipeline.channel()
+        embedded = pipeline.channel()
+
+        progress = vector_store.IngestProgress(f"PDF '{source or collection_name}'")
+        source_ids: List[str] = []
+
+        def page_stream():
+            while True:
+                page = pipeline.get(pages, "split")
+                if page is Pipeline.END:
+                    return
+                yield page
+
+        def chunk_batches():
+            id_generator = session.id_generator(source)
+            batch = []
+            for chunk, page in iter_page_chunks(page_stream(), session.splitter):
+                chunk_id = id_generator.next_id(chunk)
+                chunk_metadata = session.chunk_metadata({"page": page}, len(source_ids), chunk)
+                batch.append((chunk_id, chunk, chunk_metadata))
+                source_ids.append(chunk_id)
+
+                if len(batch) >= conf["batch_size"]:
+                    yield batch
+                    batch = []
+
+            if batch:
+                yield batch
+
+        def store(result: Dict[str, Any]):
+            session.write_batch(result)
+            progress.add(result["chunks"], len(result["new_ids"]), result["chars"])
+
+        pipeline.spawn("read", pipeline.produce, "read", iter_pdf_pages(reader), pages)
+        pipeline.spawn("split", pipeline.produce, "split", chunk_batches(), batches, conf["embed_workers"])
+        for _ in range(conf["embed_workers"]):
+            pipeline.spawn("embed", pipeline.consume, "embed", batches, 1, session.embed_batch, embedded)
+
+        # Single writer: Chroma upserts and quantized appends stay on this thread
+        try:
+            pipeline.consume("store", embedded, conf["embed_workers"], store)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            pipeline.fail(e)
+        try:
+            pipeline.join()
+
+            removed = session.finish_source(source, source_ids)
+            if removed:
+                session.remove(removed)
+        finally:
+            # Also after a failure: whatever was written is reflected in stats
+            session.finish()
+
+        summary = progress.summary()
+        result = {
+            "status": "success",
+            "pages": page_count,
+            "chunks_indexed": summary["chunks"],
+            "chunks_added": summary["embedded"],
+            "chunks_unchanged": summary["chunks"] - summary["embedded"],
+            "chunks_removed": len(removed),
+            "collection": collection_name,
+            "source": source,
+            "provider": session.provider,
+            "backend": session.backend,
+            "throughput": summary,
+            "stages": pipeline.stats()
+        }
+
+        print(
+            f" [PdfIngest] Indexed {page_count} pages, {summary['chunks']} chunks "
+            f"({summary['embedded']} new, {len(removed)} removed) in {summary['seconds']}s - "
+            f"{summary['chunks_per_second']} chunks/s"
+        )
+
+        return result
+
+    except PdfIngestError:
+        raise
+    except Exception as e:
+        print(f" [PdfIngest] Ingestion error: {str(e)}")
+        raise PdfIngestError(f"Failed to ingest PDF: {str(e)}")
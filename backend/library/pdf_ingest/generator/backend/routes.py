@@ -0,0 +1,39 @@
+import os
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from typing import Optional
+
+# Relative import: when generated, this file sits next to 'service.py'
+from . import service
+
+router = APIRouter()
+
+MAX_UPLOAD_SIZE_MB = float(os.getenv("MAX_UPLOAD_SIZE_MB", "100"))
+
+
+@router.post("/upload")
+async def upload_pdf(file: UploadFile = File(...), collection_name: Optional[str] = Form("default")):
+    """
+    Production Endpoint: Receives a PDF and streams it into the collection.
+    """
+    content = await file.read()
+    if len(content) > MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_SIZE_MB:g} MB")
+    
+    try:
+        # The filename names the document, so re-uploads only embed changed chunks
+        result = service.ingest_pdf(
+            content,
+            collection_name=collection_name or "default",
+            metadata={"filename": file.filename, "source": file.filename}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "status": "success",
+        "filename": file.filename,
+        "pages": result["pages"],
+        "chunks_indexed": result["chunks_indexed"],
+        "chunks_added": result["chunks_added"],
+        "chunks_removed": result["chunks_removed"]
+    }
@@ -0,0 +1,49 @@
+import React, { useState } from "react";
+import { api } from "../../client/api";
+
+export default function PdfIngestWidget() {
+  const [status, setStatus] = useState<string>("");
+
+  const handleUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
+    const file = e.target.files?.[0];
+    if (!file) return;
+
+    setStatus("Extracting, embedding and indexing...");
+
+    try {
+      const res = await (api as any)["pdf_ingest"].upload(file);
+      setStatus(
+        ` Indexed ${res.pages} pages (${res.chunks_indexed} chunks, ${res.chunks_added} new)`
+      );
+    } catch (err) {
+      setStatus(" Ingestion failed");
+      console.error(err);
+    }
+  };
+
+  return (
+    <div className="p-6 bg-white rounded-lg border border-gray-200 shadow-sm">
+      <h3 className="text-lg font-semibold text-gray-800 mb-4">
+        Ingest PDF
+      </h3>
+
+      <div className="border-2 border-dashed border-orange-200 rounded-lg p-6 bg-orange-50 text-center hover:bg-orange-100 transition-colors">
+        <input
+          type="file"
+          accept=".pdf"
+          onChange={handleUpload}
+          className="block w-full text-sm text-gray-500
+            file:mr-4 file:py-2 file:px-4
+            file:rounded-full file:border-0
+            file:text-sm file:font-semibold
+            file:bg-orange-600 file:text-white
+            hover:file:bg-orange-700"
+        />
+      </div>
+
+      {status && (
+        <p className="mt-3 text-sm font-medium text-gray-600">{status}</p>
+      )}
+    </div>
+  );
+}
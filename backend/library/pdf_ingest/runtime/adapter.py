@@ -0,0 +1,74 @@
+from typing import Dict, Any
+from ..core.service import ingest_pdf
+
+# Optional parameters, taken from inputs or node config
+INGEST_PARAMS = ("chunking_strategy", "chunk_size", "chunk_overlap", "quantization", "backend", "batch_size", "queue_size", "embed_workers")
+
+# Node config values arrive as strings
+PARAM_TYPES = {
+    "chunk_size": int,
+    "chunk_overlap": int,
+    "batch_size": int,
+    "queue_size": int,
+    "embed_workers": int
+}
+
+
+def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runtime adapter for PDF ingestion.
+    
+    Streams the PDF at `file_path` into `collection_name` and reports
+    chunk counts and per-stage pipeline timings.
+    """
+    print(f"--- [Runtime] Executing PDF Ingest ---")
+    
+    file_path = inputs.get("file_path", "")
+    collection_name = inputs.get("collection_name", "default")
+    metadata = inputs.get("metadata", {})
+    
+    # Get node config
+    node_config = context.get("node_config", {})
+    
+    if "collection_name" in node_config:
+        collection_name = node_config["collection_name"]
+    
+    options = {}
+    for name in INGEST_PARAMS:
+        value = node_config.get(name, inputs.get(name))
+        if value is not None and value != "":
+            options[name] = PARAM_TYPES[name](value) if name in PARAM_TYPES else value
+    
+    print(f"   File: {file_path}")
+    print(f"   Collection: {collection_name}")
+    
+    if not file_path:
+        return {
+            "result": " No PDF provided (file_path is empty)",
+            "metadata": {"error": "file_path is required"},
+            "success": False
+        }
+    
+    try:
+        result = ingest_pdf(file_path, collection_name=collection_name, metadata=metadata, **options)
+        
+        return {
+            "result": (
+                f" Ingested {result['pages']} pages ({result['chunks_indexed']} chunks, "
+                f"{result['chunks_added']} new, {result['chunks_removed']} removed) into '{collection_name}' "
+                f"at {result['throughput']['chunks_per_second']} chunks/s"
+            ),
+            "metadata": result,
+            "success": True
+        }
+    
+    except Exception as e:
+        import traceback
+        print(f" [Runtime] Error:")
+        print(traceback.format_exc())
+        
+        return {
+            "result": f" Runtime Error: {str(e)}",
+            "metadata": {"error": str(e)},
+            "success": False
+        }
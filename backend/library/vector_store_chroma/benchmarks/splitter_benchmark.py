@@ -0,0 +1,128 @@
+"""
+Splitter benchmark: the 'token' strategy versus the current LangChain splitters.
+
+Splits a generated document (default 10 MB) with
+- recursive:         RecursiveCharacterTextSplitter, chunk_size in characters (4 per token)
+- recursive-tiktoken: RecursiveCharacterTextSplitter.from_tiktoken_encoder (token-aware baseline)
+- token:             TokenTextSplitter, one process
+- token-parallel:    TokenTextSplitter, --workers processes
+
+and reports throughput and how well chunk sizes match the token limit.
+
+Run from backend/:
+
+    python -m library.vector_store_chroma.benchmarks.splitter_benchmark --size-mb 10 --workers 4
+"""
+
+import time
+import random
+import argparse
+from typing import Any, Callable, Dict, List
+
+from ..core.service import _get_text_splitter
+from ..core.splitter import TokenTextSplitter, get_encoder, token_counter
+
+WORDS = (
+    "vector store index query embedding chunk token model retrieval context document "
+    "collection metadata filter score cache batch latency throughput memory process "
+    "the a of and to in is for on with as by at from that this it be are was"
+).split()
+
+
+def generate_text(size_mb: float, seed: int = 0) -> str:
+    """Paragraphs of prose, with some code blocks, long lines and identifiers mixed in"""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    paragraphs = []
+    size = 0
+
+    while size < target:
+        kind = rng.random()
+        if kind < 0.1:
+            lines = [f"    result_{rng.randint(0, 999)} = compute(x={rng.random():.4f}, mode='{rng.choice(WORDS)}')" for _ in range(rng.randint(3, 15))]
+            paragraph = "\n".join(lines)
+        elif kind < 0.15:
+            # A long line without sentence breaks
+            paragraph = " ".join(rng.choice(WORDS) for _ in range(rng.randint(400, 1200)))
+        else:
+            sentences = []
+            for _ in range(rng.randint(2, 12)):
+                words = [rng.choice(WORDS) for _ in range(rng.randint(6, 25))]
+                if rng.random() < 0.2:
+                    words.append(f"ERR-{rng.randint(100, 999)}")
+                sentences.append(" ".join(words).capitalize() + ".")
+            paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+
+    return "\n\n".join(paragraphs)
+
+
+def measure(name: str, split: Callable[[str], List[str]], text: str, limit: int, count: Callable, repeat: int) -> Dict[str, Any]:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = split(text)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+
+    sizes = count(chunks)
+    return {
+        "splitter": name,
+        "seconds": round(best, 3),
+        "mb_per_second": round(len(text) / (1024 * 1024) / best, 2),
+        "chunks": len(chunks),
+        "mean_tokens": round(sum(sizes) / len(sizes), 1) if sizes else 0,
+        "max_tokens": max(sizes) if sizes else 0,
+        "over_limit": sum(1 for size in sizes if size > limit)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=10.0, help="Generated document size")
+    parser.add_argument("--chunk-tokens", type=int, default=256, help="Chunk size in tokens")
+    parser.add_argument("--overlap-tokens", type=int, default=32, help="Chunk overlap in tokens")
+    parser.add_argument("--workers", type=int, default=4, help="Processes for token-parallel")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per splitter (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    text = generate_text(args.size_mb, args.seed)
+    encoder = get_encoder()
+    count = token_counter()
+    print(f"Document: {len(text) / (1024 * 1024):.1f} MB, tokens {'by ' + encoder.name if encoder else 'estimated (no tiktoken encoding)'}")
+
+    splitters = {
+        "recursive": _get_text_splitter("recursive", chunk_size=args.chunk_tokens * 4, chunk_overlap=args.overlap_tokens * 4).split_text
+    }
+    if encoder is not None:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        splitters["recursive-tiktoken"] = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+            encoding_name=encoder.name,
+            chunk_size=args.chunk_tokens,
+            chunk_overlap=args.overlap_tokens,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        ).split_text
+    splitters["token"] = TokenTextSplitter(args.chunk_tokens, args.overlap_tokens, workers=1).split_text
+    parallel = TokenTextSplitter(args.chunk_tokens, args.overlap_tokens, workers=args.workers, parallel_chars=1)
+    # Start the worker processes outside the timed runs
+    parallel.split_text(text[:100_000])
+    splitters[f"token-parallel ({args.workers})"] = parallel.split_text
+
+    results = [measure(name, split, text, args.chunk_tokens, count, args.repeat) for name, split in splitters.items()]
+
+    columns = ("splitter", "seconds", "mb_per_second", "chunks", "mean_tokens", "max_tokens", "over_limit")
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print("  ".join(str(result[column]).ljust(width) for column, width in zip(columns, widths)))
+
+    baselines = [result for result in results if result["splitter"].startswith("recursive")]
+    for result in results[len(baselines):]:
+        speedups = ", ".join(f"{baseline['seconds'] / result['seconds']:.2f}x {baseline['splitter']}" for baseline in baselines)
+        print(f"{result['splitter']}: {speedups}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Process-wide pool of open Chroma handles.
+
+Opening a collection means starting a PersistentClient (SQLite + segment
+files) and loading its HNSW index; doing that per call made warm retrievals
+dominated by file opens. Handles are kept open per (persist dir, collection),
+sharing one client per persist dir. The least recently used collections are
+dropped beyond VECTOR_POOL_MAX_COLLECTIONS, and everything is closed at exit.
+
+Operations hold a lease on the persist dir while they use its handles. A
+client whose handles were all evicted is closed once its last lease is
+released, never while an operation may still be using it. Handles are not
+bound to an embeddings model: the service embeds texts itself and passes
+vectors to every call.
+"""
+
+import os
+import atexit
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import chromadb
+from langchain_chroma import Chroma
+
+DEFAULT_MAX_COLLECTIONS = 32
+
+
+class ChromaHandlePool:
+    """LRU pool of langchain Chroma handles over shared PersistentClients."""
+
+    def __init__(self, max_collections: Optional[int] = None):
+        self.max_collections = max_collections or int(os.getenv("VECTOR_POOL_MAX_COLLECTIONS", str(DEFAULT_MAX_COLLECTIONS)))
+        self._clients: Dict[str, Any] = {}
+        self._handles: "OrderedDict[Tuple[str, str], Chroma]" = OrderedDict()
+        # persist dir -> operations currently using its client
+        self._leases: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.opens = 0
+        self.evictions = 0
+
+    def get(self, persist_dir: str, collection_name: str) -> Chroma:
+        """Open (or reuse) the handle for a collection; use it under a lease() on persist_dir."""
+        key = (persist_dir, collection_name)
+
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                self._handles.move_to_end(key)
+                self.hits += 1
+            else:
+                client = self._clients.get(persist_dir)
+                if client is None:
+                    client = self._clients[persist_dir] = chromadb.PersistentClient(path=persist_dir)
+
+                handle = self._handles[key] = Chroma(collection_name=collection_name, client=client)
+                self.opens += 1
+                self._evict()
+
+            return handle
+
+    def acquire(self, persist_dir: str):
+        """Keep persist_dir's client open until release(), even if its handles are evicted meanwhile."""
+        with self._lock:
+            self._leases[persist_dir] = self._leases.get(persist_dir, 0) + 1
+
+    def release(self, persist_dir: str):
+        with self._lock:
+            remaining = self._leases.get(persist_dir, 0) - 1
+            if remaining > 0:
+                self._leases[persist_dir] = remaining
+                return
+            self._leases.pop(persist_dir, None)
+            # Evicted while leased: close now that nothing uses it
+            if not self._has_handles(persist_dir):
+                self._close_client(persist_dir)
+
+    @contextmanager
+    def lease(self, persist_dir: str) -> Iterator[None]:
+        self.acquire(persist_dir)
+        try:
+            yield
+        finally:
+            self.release(persist_dir)
+
+    def _has_handles(self, persist_dir: str) -> bool:
+        return any(key[0] == persist_dir for key in self._handles)
+
+    def _evict(self):
+        while len(self._handles) > self.max_collections:
+            (persist_dir, _), _ = self._handles.popitem(last=False)
+            self.evictions += 1
+            if not self._has_handles(persist_dir) and persist_dir not in self._leases:
+                self._close_client(persist_dir)
+
+    def _close_client(self, persist_dir: str):
+        client = self._clients.pop(persist_dir, None)
+        if client is not None and hasattr(client, "close"):
+            try:
+                client.close()
+            except Exception as e:
+                print(f" [VectorStore] Error closing client for {persist_dir}: {str(e)}")
+
+    def close(self, persist_dir: str):
+        """Close every handle under a persist dir, leased or not (e.g. before deleting it)."""
+        with self._lock:
+            for key in [key for key in self._handles if key[0] == persist_dir]:
+                del self._handles[key]
+            self._close_client(persist_dir)
+
+    def close_all(self):
+        with self._lock:
+            self._handles.clear()
+            for persist_dir in list(self._clients):
+                self._close_client(persist_dir)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open_collections": len(self._handles),
+                "open_clients": len(self._clients),
+                "leased_clients": len(self._leases),
+                "max_collections": self.max_collections,
+                "hits": self.hits,
+                "opens": self.opens,
+                "evictions": self.evictions
+            }
+
+
+# Process-wide pool
+chroma_pool = ChromaHandlePool()
+atexit.register(chroma_pool.close_all)
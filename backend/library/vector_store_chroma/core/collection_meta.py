@@ -0,0 +1,100 @@
+"""
+Per-collection metadata record (<collection>/collection.json).
+
+Holds what stats and list report: document and chunk counts, bytes on disk,
+embedding provider/model, backend, quantization and when the collection was
+created and last indexed. Every index and delete rewrites it (atomic
+replace) once its writes are done, so reading stats costs one small file
+read instead of loading an embeddings model, opening the store and walking
+the directory. Updates read, change and write the record under
+<collection>/collection.lock, so concurrent writers (threads or processes)
+never both build on the same generation.
+
+Collections created before the record existed get one the first time their
+stats are read.
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .file_lock import file_lock
+
+RECORD_FILE = "collection.json"
+LOCK_FILE = "collection.lock"
+
+_lock = threading.Lock()
+
+# persist_dir -> (mtime_ns, record); re-parsed only when the file changes
+_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+
+def record_path(persist_dir: str) -> str:
+    return os.path.join(persist_dir, RECORD_FILE)
+
+
+def directory_size(persist_dir: str) -> int:
+    """Bytes of every file under the collection directory"""
+    total = 0
+    for dirpath, _, filenames in os.walk(persist_dir):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                # Temp files replaced while walking
+                continue
+    return total
+
+
+def read_record(persist_dir: str) -> Optional[Dict[str, Any]]:
+    """The collection's record, or None if it has none yet"""
+    path = record_path(persist_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        _cache.pop(persist_dir, None)
+        return None
+
+    cached = _cache.get(persist_dir)
+    if cached and cached[0] == mtime:
+        return dict(cached[1])
+
+    try:
+        with open(path, "r") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    _cache[persist_dir] = (mtime, record)
+    return dict(record)
+
+
+def update_record(persist_dir: str, update: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge update(current record) into the record and write it atomically;
+    returns the new record. The record is read, updated and written under the
+    collection's lock file, so update() sees every earlier writer's changes.
+    """
+    path = record_path(persist_dir)
+    with _lock, file_lock(os.path.join(persist_dir, LOCK_FILE)):
+        # Read directly: the mtime cache could miss a write made within the same mtime tick
+        record: Dict[str, Any] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                record = json.load(f)
+        record.update(update(dict(record)))
+        record["updated_at"] = str(datetime.now())
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_path, path)
+
+        _cache[persist_dir] = (os.stat(path).st_mtime_ns, record)
+        return dict(record)
+
+
+def drop_record(persist_dir: str):
+    _cache.pop(persist_dir, None)
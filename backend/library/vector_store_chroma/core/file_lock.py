@@ -0,0 +1,58 @@
+"""
+Cross-process coordination for the sidecar index files.
+
+Indexes are loaded once per process and kept in memory, while another
+process (a second API worker, a bulk ingestion script) may append to or
+rewrite the same files. Writers hold the collection's lock file while they
+refresh their in-memory state and write; readers compare file signatures
+(size, mtime, inode) and reload when they change.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock on `path` (created if missing), held for the block"""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10 seconds
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def file_signature(*paths: str) -> Tuple[Optional[Tuple[int, int, int]], ...]:
+    """(size, mtime_ns, inode) per path, None for missing files; atomic replaces change the inode"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_size, stat.st_mtime_ns, stat.st_ino))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
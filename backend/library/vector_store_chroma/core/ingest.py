@@ -0,0 +1,174 @@
+"""
+Streaming building blocks for bulk ingestion.
+
+Memory stays bounded by the batch size: sources are read in paragraph-aligned
+segments, split lazily, embedded a batch at a time, and handed to a single
+background writer through a bounded queue (write-behind). When the writer
+falls behind, the producer blocks instead of buffering.
+"""
+
+import os
+import time
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# Characters read per segment before splitting
+SEGMENT_CHARS = 1_000_000
+
+# Seconds between progress lines
+PROGRESS_INTERVAL_SECONDS = 5.0
+
+
+def get_ingest_config(batch_size: Optional[int] = None, queue_size: Optional[int] = None) -> Dict[str, int]:
+    return {
+        "batch_size": max(1, int(batch_size or os.getenv("VECTOR_INGEST_BATCH_SIZE", "256"))),
+        "queue_size": max(1, int(queue_size or os.getenv("VECTOR_INGEST_QUEUE_SIZE", "4")))
+    }
+
+
+def _cut_point(buffer: str, limit: int) -> int:
+    """Where to end a segment: last paragraph break, else last line break, else the limit."""
+    for separator in ("\n\n", "\n"):
+        cut = buffer.rfind(separator, 0, limit)
+        if cut > 0:
+            return cut + len(separator)
+    return limit
+
+
+def iter_text_segments(text: str, segment_chars: int = SEGMENT_CHARS) -> Iterator[str]:
+    """Paragraph-aligned slices of a (large) string."""
+    start = 0
+    while len(text) - start > segment_chars:
+        end = start + _cut_point(text[start:start + segment_chars], segment_chars)
+        yield text[start:end]
+        start = end
+    if start < len(text):
+        yield text[start:]
+
+
+def iter_file_segments(path: str, segment_chars: int = SEGMENT_CHARS) -> Iterator[str]:
+    """Paragraph-aligned segments of a text file, read incrementally."""
+    buffer = ""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(segment_chars)
+            if not block:
+                break
+            buffer += block
+            while len(buffer) > segment_chars:
+                cut = _cut_point(buffer, segment_chars)
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+    if buffer:
+        yield buffer
+
+
+def iter_sources(sources: Iterable[Any]) -> Iterator[Tuple[str, Dict[str, Any], Iterator[str]]]:
+    """
+    Normalise ingestion sources to (source name, metadata, segments).
+
+    Each item may be:
+    - a string of text
+    - {"text": ..., "metadata": {...}}    (metadata 'source'/'filename' names it)
+    - {"path": ..., "metadata": {...}}    (a text file, named by its path)
+    """
+    for item in sources:
+        if isinstance(item, str):
+            yield "", {}, iter_text_segments(item)
+            continue
+
+        metadata = dict(item.get("metadata") or {})
+
+        if item.get("path"):
+            path = item["path"]
+            metadata.setdefault("filename", os.path.basename(path))
+            metadata.setdefault("source", path)
+            yield metadata["source"], metadata, iter_file_segments(path)
+        else:
+            source = metadata.get("source") or metadata.get("filename") or ""
+            yield source, metadata, iter_text_segments(item.get("text") or "")
+
+
+class WriteBehindWriter:
+    """Runs submitted writes in order on one background thread, behind a bounded queue."""
+
+    _STOP = object()
+
+    def __init__(self, max_pending: int):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="vector-ingest-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is self._STOP:
+                return
+            if self._error is not None:
+                # Drain without writing after a failure so the producer never blocks forever
+                continue
+            fn, args = task
+            try:
+                fn(*args)
+            except BaseException as e:
+                self._error = e
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, fn: Callable, *args):
+        """Queue a write; blocks while the queue is full (backpressure)."""
+        self._raise_if_failed()
+        self._queue.put((fn, args))
+
+    def close(self):
+        """Wait for pending writes; re-raises the first write failure."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._raise_if_failed()
+
+
+class IngestProgress:
+    """Counts ingested chunks and characters and prints throughput periodically."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.time()
+        self._last_report = self.started
+        self.sources = 0
+        self.chunks = 0
+        self.embedded = 0
+        self.chars = 0
+
+    def add(self, chunks: int, embedded: int, chars: int):
+        self.chunks += chunks
+        self.embedded += embedded
+        self.chars += chars
+
+        now = time.time()
+        if now - self._last_report >= PROGRESS_INTERVAL_SECONDS:
+            self._last_report = now
+            print(f" [VectorStore] {self.label}: {self._summary_line()}")
+
+    def _summary_line(self) -> str:
+        stats = self.summary()
+        return (
+            f"{stats['chunks']} chunks ({stats['embedded']} embedded, {stats['megabytes']} MB) in {stats['seconds']}s - "
+            f"{stats['chunks_per_second']} chunks/s, {stats['megabytes_per_second']} MB/s"
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = max(time.time() - self.started, 1e-9)
+        megabytes = self.chars / (1024 * 1024)
+        return {
+            "sources": self.sources,
+            "chunks": self.chunks,
+            "embedded": self.embedded,
+            "megabytes": round(megabytes, 2),
+            "seconds": round(elapsed, 2),
+            "chunks_per_second": round(self.chunks / elapsed, 1),
+            "megabytes_per_second": round(megabytes / elapsed, 3)
+        }
@@ -0,0 +1,410 @@
+"""
+BM25 inverted index kept alongside each collection.
+
+Vector search is weak on exact tokens such as error codes, identifiers and
+file names. This index maps each term to postings (chunk, term frequency) and
+scores with Okapi BM25, so hybrid retrieval can fuse keyword and vector
+rankings (reciprocal rank fusion, see service._search).
+
+Tokens are lowercased word characters; compound identifiers are indexed both
+whole and by their parts ("config.yaml" -> config.yaml, config, yaml;
+"ERR-404" -> err-404, err, 404).
+
+Files in the collection directory (<g> is the generation named in keywords.json):
+- keywords.json     generation
+- keywords.<g>.log  JSON lines: add {id, tf} / delete {id}, replayed on load
+- keywords.lock     held by writers
+
+Deleted chunks are tombstoned and compacted away once they outnumber live ones.
+Compaction writes the next generation's log and replaces keywords.json last.
+Writers hold the lock file and work on freshly loaded state; other processes
+replay what was appended since they last read, or reload after a compaction.
+"""
+
+import os
+import re
+import json
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .file_lock import file_lock, file_signature
+
+SEARCH_MODES = ("vector", "hybrid")
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Reciprocal rank fusion constant: score = sum of 1 / (RRF_K + rank)
+DEFAULT_RRF_K = 60
+
+# Candidates taken from each ranking per requested result before fusion
+HYBRID_CANDIDATES = 4
+
+# Dead chunks tolerated (beyond live ones) before compaction
+COMPACT_MIN_DEAD = 1000
+
+# Indexes written before keywords.json existed: a single keywords.log
+LEGACY_GENERATION = -1
+
+_COMPOUND = re.compile(r"\w+(?:[.\-/:]\w+)*")
+_WORD = re.compile(r"\w+")
+
+
+def get_search_mode(requested: Optional[str] = None) -> str:
+    """Requested mode, else VECTOR_SEARCH_MODE (default 'vector')."""
+    mode = (requested or os.getenv("VECTOR_SEARCH_MODE", "vector")).lower()
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}'. Use one of: {', '.join(SEARCH_MODES)}")
+    return mode
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int, rrf_k: Optional[int] = None) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists into the top-k (id, score). Scores are scaled so an
+    id ranked first in every list scores 1.0.
+    """
+    rrf_k = rrf_k or int(os.getenv("VECTOR_RRF_K", str(DEFAULT_RRF_K)))
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank + 1)
+
+    best = sorted(fused.items(), key=lambda item: -item[1])[:k]
+    scale = len(rankings) / (rrf_k + 1) if rankings else 1.0
+    return [(chunk_id, score / scale) for chunk_id, score in best]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms; compound identifiers also yield their parts."""
+    terms = []
+    for match in _COMPOUND.finditer(text.lower()):
+        token = match.group()
+        terms.append(token)
+        parts = _WORD.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+class KeywordIndex:
+    """Term -> postings (chunk number, tf), with BM25 search."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "keywords.json")
+        self.lock_path = os.path.join(directory, "keywords.lock")
+
+        self._lock = threading.RLock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.generation: Optional[int] = None
+        self._clear()
+        # Log bytes replayed so far; a line past them is torn (crash) or still being written
+        self._log_bytes = 0
+        self._torn = False
+        self._signature: Tuple = ()
+
+    def _clear(self):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.lengths: List[int] = []
+        self.alive: List[bool] = []
+        self.postings: Dict[str, Tuple[List[int], List[int]]] = {}
+
+        # Postings as arrays, built on first query per term
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # Live mask and BM25 length normalisation, rebuilt after writes
+        self._dense: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._live = 0
+        self._total_length = 0
+
+    @property
+    def exists(self) -> bool:
+        with self._lock:
+            self._refresh()
+            return self.generation is not None
+
+    # ---------------------------------------------------------------- storage
+
+    def _log_path(self, generation: Optional[int] = None) -> str:
+        generation = self.generation if generation is None else generation
+        if generation is None or generation == LEGACY_GENERATION:
+            return os.path.join(self.directory, "keywords.log")
+        return os.path.join(self.directory, f"keywords.{generation}.log")
+
+    def _current_signature(self) -> Tuple:
+        return file_signature(self.meta_path, self._log_path())
+
+    def _load(self):
+        # Another process may compact (and remove this generation's log) while we read
+        for _ in range(3):
+            self._reset()
+            try:
+                self._read()
+                return
+            except FileNotFoundError:
+                continue
+        raise RuntimeError(f"Keyword index in {self.directory} kept changing while loading")
+
+    def _read(self):
+        # Taken before the files are read, so writes made meanwhile trigger another refresh
+        meta_signature = file_signature(self.meta_path)
+        if meta_signature[0] is not None:
+            with open(self.meta_path, "r") as f:
+                self.generation = int(json.load(f)["generation"])
+        elif os.path.exists(self._log_path(LEGACY_GENERATION)):
+            self.generation = LEGACY_GENERATION
+        self._signature = meta_signature + file_signature(self._log_path())
+
+        if self.generation is not None:
+            self._replay()
+
+    def _replay(self):
+        """Apply the log records past the bytes already replayed"""
+        with open(self._log_path(), "rb") as f:
+            f.seek(self._log_bytes)
+            for line in f:
+                try:
+                    record = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    record = None
+                if record is None:
+                    self._torn = True
+                    return
+                self._log_bytes += len(line)
+
+                if record["op"] == "add":
+                    self._add(record["id"], record["tf"])
+                elif record["op"] == "delete":
+                    self._remove(record["id"])
+        self._torn = False
+
+    def _refresh(self):
+        """Catch up with other processes: replay their appends, or reload after a compaction"""
+        signature = self._current_signature()
+        if signature == self._signature:
+            return
+
+        log, known_log = signature[1], self._signature[1] if len(self._signature) > 1 else None
+        appended = (
+            self.generation is not None and signature[0] == self._signature[0]
+            and log is not None and known_log is not None
+            and log[2] == known_log[2] and log[0] >= self._log_bytes
+        )
+        if not appended:
+            self._load()
+            return
+
+        self._signature = signature
+        try:
+            self._replay()
+        except FileNotFoundError:
+            self._load()
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """In-process and cross-process write lock, on freshly loaded state"""
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            if self.generation == LEGACY_GENERATION:
+                # Move to a generation-named log once
+                self._compact()
+            elif self._torn:
+                # Torn last line after a crash: cut it so appends start on a fresh line
+                os.truncate(self._log_path(), self._log_bytes)
+                self._torn = False
+            yield
+            self._signature = self._current_signature()
+
+    def _save_meta(self):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"generation": self.generation}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _append(self, records: List[Dict]):
+        data = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+
+        if self.generation is None:
+            # New index: the log (replacing any left by a crash) is written before keywords.json names it
+            self.generation = 0
+            with open(self._log_path(), "wb") as f:
+                f.write(data)
+            self._save_meta()
+        else:
+            with open(self._log_path(), "ab") as f:
+                f.write(data)
+        self._log_bytes += len(data)
+
+    # ---------------------------------------------------------------- postings
+
+    def _add(self, chunk_id: str, tf: Dict[str, int]):
+        self._remove(chunk_id)
+
+        row = len(self.ids)
+        self.ids.append(chunk_id)
+        self.rows[chunk_id] = row
+        length = sum(tf.values())
+        self.lengths.append(length)
+        self.alive.append(True)
+        self._live += 1
+        self._total_length += length
+        self._dense = None
+
+        for term, count in tf.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = ([], [])
+            postings[0].append(row)
+            postings[1].append(count)
+            self._arrays.pop(term, None)
+
+    def _remove(self, chunk_id: str) -> bool:
+        row = self.rows.pop(chunk_id, None)
+        if row is None:
+            return False
+        self.alive[row] = False
+        self._live -= 1
+        self._total_length -= self.lengths[row]
+        self._dense = None
+        return True
+
+    # ----------------------------------------------------------- write API
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]):
+        """Index (or re-index) chunks."""
+        with self._writing():
+            records = []
+            for chunk_id, text in zip(ids, texts):
+                tf = dict(Counter(tokenize(text or "")))
+                self._add(chunk_id, tf)
+                records.append({"op": "add", "id": chunk_id, "tf": tf})
+            if records:
+                self._append(records)
+
+    def remove(self, ids: Sequence[str]):
+        with self._writing():
+            removed = [chunk_id for chunk_id in ids if self._remove(chunk_id)]
+            if not removed:
+                return
+            self._append([{"op": "delete", "id": chunk_id} for chunk_id in removed])
+
+            if len(self.ids) - self._live > max(COMPACT_MIN_DEAD, self._live):
+                self._compact()
+
+    def _compact(self):
+        """
+        Write the live chunks as the next generation's log, switch
+        keywords.json to it, then remove the previous log.
+        """
+        tf_by_row: Dict[int, Dict[str, int]] = {}
+        for term, (rows, counts) in self.postings.items():
+            for row, count in zip(rows, counts):
+                if self.alive[row]:
+                    tf_by_row.setdefault(row, {})[term] = count
+
+        live = [(self.ids[row], tf_by_row.get(row, {})) for row in range(len(self.ids)) if self.alive[row]]
+        data = "".join(json.dumps({"op": "add", "id": chunk_id, "tf": tf}) + "\n" for chunk_id, tf in live).encode("utf-8")
+
+        previous = self._log_path()
+        generation = self.generation + 1
+        with open(self._log_path(generation), "wb") as f:
+            f.write(data)
+        self.generation = generation
+        self._save_meta()
+
+        self._clear()
+        for chunk_id, tf in live:
+            self._add(chunk_id, tf)
+        self._log_bytes = len(data)
+        self._torn = False
+        try:
+            os.remove(previous)
+        except OSError:
+            pass
+
+    # ----------------------------------------------------------------- search
+
+    def _term_arrays(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self.postings.get(term)
+            if postings is None:
+                return None
+            arrays = self._arrays[term] = (np.array(postings[0], dtype=np.int64), np.array(postings[1], dtype=np.float32))
+        return arrays
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top-k (chunk id, BM25 score), best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+
+        with self._lock:
+            self._refresh()
+            if not self._live or not terms:
+                return []
+
+            if self._dense is None:
+                lengths = np.array(self.lengths, dtype=np.float32)
+                average_length = self._total_length / self._live
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (average_length or 1.0))
+                self._dense = (np.array(self.alive, dtype=bool), norm)
+            alive, norm = self._dense
+
+            scores = np.zeros(len(self.ids), dtype=np.float32)
+            for term in terms:
+                arrays = self._term_arrays(term)
+                if arrays is None:
+                    continue
+                rows, tf = arrays
+                live_rows = alive[rows]
+                rows, tf = rows[live_rows], tf[live_rows]
+                if not len(rows):
+                    continue
+                df = len(rows)
+                idf = np.log(1.0 + (self._live - df + 0.5) / (df + 0.5))
+                scores[rows] += idf * tf * (BM25_K1 + 1) / (tf + norm[rows])
+
+            ids = self.ids
+
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return []
+
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(ids[row], float(scores[row])) for row in top]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._refresh()
+            return {
+                "chunks": self._live,
+                "terms": len(self.postings),
+                "postings": sum(len(rows) for rows, _ in self.postings.values())
+            }
+
+
+_indexes: Dict[str, KeywordIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_keyword_index(directory: str) -> KeywordIndex:
+    """Process-wide index per collection directory (postings stay loaded between queries)."""
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = _indexes[directory] = KeywordIndex(directory)
+        return index
+
+
+def drop_keyword_index(directory: str):
+    with _indexes_lock:
+        _indexes.pop(directory, None)
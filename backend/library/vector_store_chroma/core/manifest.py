@@ -0,0 +1,113 @@
+"""
+Deterministic chunk ids and the per-source manifest.
+
+A chunk's id is derived from its source and content, so re-indexing the same
+file maps unchanged chunks onto the ids already stored. The manifest
+(<collection>/sources.json) remembers which ids each source produced last
+time, so chunks that disappeared from a source can be deleted. Writers
+update it under <collection>/sources.lock.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .file_lock import file_lock, file_signature
+
+
+class ChunkIdGenerator:
+    """
+    Stable id per chunk: hash of (source, content hash, occurrence), so
+    identical chunks within one source still get distinct ids. Feed a
+    source's chunks in order (works on streams).
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._seen: Dict[str, int] = {}
+
+    def next_id(self, chunk: str) -> str:
+        content_hash = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+        occurrence = self._seen.get(content_hash, 0)
+        self._seen[content_hash] = occurrence + 1
+        return hashlib.sha256(f"{self.source}\0{content_hash}\0{occurrence}".encode("utf-8")).hexdigest()[:32]
+
+
+def chunk_ids(source: str, chunks: List[str]) -> List[str]:
+    generator = ChunkIdGenerator(source)
+    return [generator.next_id(chunk) for chunk in chunks]
+
+
+class SourceManifest:
+    """
+    Chunk ids per source for one collection. Several writers (API threads,
+    ingestion sessions, other processes) may share it: every change re-reads
+    sources.json under sources.lock and rewrites it before releasing the lock.
+    """
+
+    def __init__(self, persist_dir: str):
+        self.path = os.path.join(persist_dir, "sources.json")
+        self.lock_path = os.path.join(persist_dir, "sources.lock")
+        self._lock = threading.RLock()
+        self._sources: Dict[str, Dict] = {}
+        self._signature: Tuple = ()
+
+    def _refresh(self):
+        """Re-read sources.json if it changed since we last read or wrote it"""
+        signature = file_signature(self.path)
+        if signature == self._signature:
+            return
+        sources = {}
+        if signature[0] is not None:
+            with open(self.path, "r") as f:
+                sources = json.load(f)
+        self._sources = sources
+        self._signature = signature
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            yield
+
+    @property
+    def sources(self) -> Dict[str, Dict]:
+        with self._lock:
+            self._refresh()
+            return dict(self._sources)
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._sources)
+
+    def get_ids(self, source: str) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return self._sources.get(source, {}).get("ids", [])
+
+    def set_ids(self, source: str, ids: List[str]) -> List[str]:
+        """Record a source's ids; returns the ids it had before (read in the same locked section)"""
+        with self._writing():
+            previous = self._sources.get(source, {}).get("ids", [])
+            self._sources[source] = {"ids": ids, "indexed_at": str(datetime.now())}
+            self._save()
+            return previous
+
+    def remove(self, source: str) -> Optional[List[str]]:
+        with self._writing():
+            entry = self._sources.pop(source, None)
+            if entry is not None:
+                self._save()
+            return entry["ids"] if entry else None
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._sources, f)
+        os.replace(tmp_path, self.path)
+        self._signature = file_signature(self.path)
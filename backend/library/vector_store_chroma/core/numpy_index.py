@@ -0,0 +1,637 @@
+"""
+In-process NumPy vector backend.
+
+An alternative to Chroma for small and medium collections: no SQLite, no
+per-query serialization, no LangChain wrapping. Vectors are L2-normalised
+float32 rows in a memory-mapped file, searched by one matmul and an
+argpartition top-k (cosine similarity). Collections above VECTOR_IVF_MIN_ROWS
+also get an IVF partitioning (spherical k-means lists, VECTOR_IVF_NPROBE lists
+probed per query).
+
+Documents and metadata live in a sidecar record log; metadata filters are
+applied before scoring (pre-filtering), so filtered queries only score the
+matching rows.
+
+Files in the collection directory (<g> and <t> are the generation and IVF
+version named in numpy_index.json):
+- numpy_index.json        dimension, generation, IVF version and trained rows
+- numpy.<g>.vectors       float32 rows, append-only
+- numpy.<g>.records       JSON lines: add (one per row, same order) / update / delete
+- numpy.<g>.ivf<t>.npy    IVF centroids (when trained)
+- numpy.<g>.ivf<t>.assign int32 list per row, append-only (when trained)
+- numpy.lock              held by writers
+
+Deleted rows are tombstoned and compacted away once they outnumber live rows.
+Compaction and IVF training write new files and replace numpy_index.json
+last, so a crash leaves the previous files in use. Writers hold the lock
+file and work on freshly loaded state; every process reloads when another
+one has written (file sizes, mtimes or inodes changed).
+
+It exposes the subset of the chromadb Collection API the service uses
+(get/upsert/update/delete/count), plus search() and search_many(). Scores
+are cosine similarities; the service maps them to the relevance scale
+Chroma collections report (relevance_from_cosine).
+"""
+
+import os
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .file_lock import file_lock, file_signature
+
+BACKENDS = ("chroma", "numpy")
+
+# Live rows at which an IVF partitioning is trained
+DEFAULT_IVF_MIN_ROWS = 20000
+
+# IVF lists scored per query
+DEFAULT_IVF_NPROBE = 8
+
+# K-means training: rows sampled per list, iterations
+IVF_SAMPLE_PER_LIST = 64
+IVF_ITERATIONS = 8
+
+# Rows assigned to lists per step (bounds the scratch matrix)
+ASSIGN_BLOCK_ROWS = 16384
+
+# Dead rows tolerated (beyond live rows) before compaction
+COMPACT_MIN_DEAD = 1000
+
+# Generation of collections written before files were generation-named (numpy.vectors, ...)
+LEGACY_GENERATION = -1
+
+
+def get_backend_name(requested: Optional[str] = None) -> str:
+    """Requested backend, else VECTOR_BACKEND (default 'chroma')."""
+    backend = (requested or os.getenv("VECTOR_BACKEND", "chroma")).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vector backend '{backend}'. Use one of: {', '.join(BACKENDS)}")
+    return backend
+
+
+def detect_backend(directory: str) -> Optional[str]:
+    """Backend an existing collection directory was created with (None if it holds no vectors yet)."""
+    if os.path.exists(os.path.join(directory, "numpy_index.json")):
+        return "numpy"
+    if os.path.exists(os.path.join(directory, "chroma.sqlite3")):
+        return "chroma"
+    return None
+
+
+def relevance_from_cosine(similarity: float) -> float:
+    """
+    Cosine similarity on the scale Chroma collections report: langchain's
+    euclidean relevance (1 - d / sqrt(2)) of Chroma's squared L2 distance,
+    d = 2 - 2 * cos for unit vectors. The same score_threshold then means the
+    same on either backend.
+    """
+    return 1.0 - (2.0 - 2.0 * float(similarity)) / 2 ** 0.5
+
+
+def _remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            # Still mapped by a reader (Windows); left behind
+            pass
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _matches(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, dict):
+        return value == condition
+
+    for op, operand in condition.items():
+        if op == "$eq":
+            ok = value == operand
+        elif op == "$ne":
+            ok = value != operand
+        elif op == "$in":
+            ok = value in operand
+        elif op == "$nin":
+            ok = value not in operand
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            if value is None:
+                return False
+            ok = {
+                "$gt": lambda: value > operand,
+                "$gte": lambda: value >= operand,
+                "$lt": lambda: value < operand,
+                "$lte": lambda: value <= operand
+            }[op]()
+        else:
+            raise ValueError(f"Unsupported filter operator '{op}'")
+        if not ok:
+            return False
+    return True
+
+
+class NumpyVectorIndex:
+    """Memory-mapped float32 vectors with sidecar records, flat or IVF search."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "numpy_index.json")
+        self.lock_path = os.path.join(directory, "numpy.lock")
+
+        self.ivf_min_rows = int(os.getenv("VECTOR_IVF_MIN_ROWS", str(DEFAULT_IVF_MIN_ROWS)))
+        self.nprobe = int(os.getenv("VECTOR_IVF_NPROBE", str(DEFAULT_IVF_NPROBE)))
+
+        self._lock = threading.RLock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.dim: Optional[int] = None
+        self.generation = 0
+        self.vectors: Optional[np.ndarray] = None
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.alive = np.zeros(0, dtype=bool)
+        self.rows: Dict[str, int] = {}
+
+        self.ivf_version: Optional[int] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.assign: Optional[np.ndarray] = None
+        self.trained_rows = 0
+
+        # Metadata columns for pre-filtering, built on first use
+        self._columns: Dict[str, np.ndarray] = {}
+        # Files longer than the rows they agree on (a crash between appends)
+        self._torn = False
+        self._records_bytes = 0
+        self._signature: Tuple = file_signature(self.meta_path)
+
+    @property
+    def exists(self) -> bool:
+        return self.dim is not None
+
+    # ---------------------------------------------------------------- storage
+
+    def _path(self, kind: str, generation: Optional[int] = None, ivf_version: Optional[int] = None) -> str:
+        """File of a kind ('vectors', 'records', 'ivf.npy', 'ivf.assign') for a generation and IVF version"""
+        generation = self.generation if generation is None else generation
+        if generation == LEGACY_GENERATION:
+            return os.path.join(self.directory, f"numpy.{kind}")
+        if kind.startswith("ivf"):
+            kind = f"ivf{self.ivf_version if ivf_version is None else ivf_version}{kind[3:]}"
+        return os.path.join(self.directory, f"numpy.{generation}.{kind}")
+
+    def _current_signature(self) -> Tuple:
+        if not self.exists:
+            return file_signature(self.meta_path)
+        return file_signature(self.meta_path, self._path("records"))
+
+    def _load(self):
+        # Another process may compact (and remove this generation's files) while we read
+        for _ in range(3):
+            self._reset()
+            try:
+                self._read()
+                return
+            except FileNotFoundError:
+                continue
+        raise RuntimeError(f"NumPy index in {self.directory} kept changing while loading")
+
+    def _read(self):
+        if not os.path.exists(self.meta_path):
+            return
+
+        # Taken before the files are read, so writes made meanwhile trigger another reload
+        meta_signature = file_signature(self.meta_path)
+        with open(self.meta_path, "r") as f:
+            meta = json.load(f)
+        self.dim = int(meta["dim"])
+        self.trained_rows = int(meta.get("trained_rows", 0))
+        self.generation = int(meta.get("generation", LEGACY_GENERATION))
+        self.ivf_version = meta.get("ivf_version", 0 if self.generation == LEGACY_GENERATION else None)
+        self._signature = meta_signature + file_signature(self._path("records"))
+
+        vector_bytes = os.path.getsize(self._path("vectors")) if os.path.exists(self._path("vectors")) else 0
+        stored_rows = vector_bytes // (4 * self.dim)
+
+        deleted = set()
+        records_bytes = 0
+        valid_bytes = 0
+        if os.path.exists(self._path("records")):
+            with open(self._path("records"), "rb") as f:
+                for line in f:
+                    records_bytes += len(line)
+                    try:
+                        record = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        record = None
+                    # Torn last line after a crash, or rows whose vectors were never written
+                    if record is None or (record["op"] == "add" and len(self.ids) >= stored_rows):
+                        records_bytes += sum(len(rest) for rest in f)
+                        break
+                    valid_bytes += len(line)
+
+                    if record["op"] == "add":
+                        row = len(self.ids)
+                        if record["id"] in self.rows:
+                            deleted.add(self.rows[record["id"]])
+                        self.rows[record["id"]] = row
+                        self.ids.append(record["id"])
+                        self.documents.append(record.get("document") or "")
+                        self.metadatas.append(record.get("metadata") or {})
+                    elif record["op"] == "update" and record["id"] in self.rows:
+                        self.metadatas[self.rows[record["id"]]] = record.get("metadata") or {}
+                    elif record["op"] == "delete" and record["id"] in self.rows:
+                        deleted.add(self.rows.pop(record["id"]))
+
+        # A crash between appends can leave the files one batch apart; keep the common prefix
+        count = len(self.ids)
+        self._records_bytes = valid_bytes
+        self._torn = valid_bytes != records_bytes or vector_bytes != count * self.dim * 4
+
+        self.alive = np.ones(count, dtype=bool)
+        for row in deleted:
+            self.alive[row] = False
+
+        self._map_vectors()
+
+        if self.ivf_version is not None and os.path.exists(self._path("ivf.npy")) and os.path.exists(self._path("ivf.assign")):
+            self.centroids = np.load(self._path("ivf.npy"))
+            assign = np.fromfile(self._path("ivf.assign"), dtype=np.int32)
+            self._torn = self._torn or len(assign) != count
+            if len(assign) >= count:
+                self.assign = assign[:count]
+            else:
+                # Assignments lagging behind the rows: recompute them
+                self.assign = np.concatenate([assign, self._assign_rows(self.vectors[len(assign):count])])
+
+    def _map_vectors(self):
+        count = len(self.ids)
+        if count:
+            self.vectors = np.memmap(self._path("vectors"), dtype=np.float32, mode="r", shape=(count, self.dim))
+        else:
+            self.vectors = np.empty((0, self.dim or 0), dtype=np.float32)
+
+    def _refresh(self):
+        """Reload if another process has written since we last read"""
+        if self._current_signature() != self._signature:
+            self._load()
+
+    def _repair(self):
+        """Cut the files back to the rows they agree on, so appends stay aligned"""
+        for kind, size in (("vectors", len(self.ids) * self.dim * 4), ("records", self._records_bytes)):
+            if os.path.exists(self._path(kind)):
+                os.truncate(self._path(kind), size)
+        if self.assign is not None:
+            self._write_array(self._path("ivf.assign"), self.assign)
+        self._torn = False
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """In-process and cross-process write lock, on freshly loaded state"""
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            if self.exists and self.generation == LEGACY_GENERATION:
+                # Move to generation-named files once
+                self._compact()
+            elif self._torn:
+                self._repair()
+            yield
+            self._signature = self._current_signature()
+
+    def _save_meta(self):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "generation": self.generation,
+                "ivf_version": self.ivf_version,
+                "trained_rows": self.trained_rows
+            }, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _append_records(self, records: List[Dict[str, Any]]):
+        with open(self._path("records"), "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+
+    @staticmethod
+    def _write_array(path: str, data: np.ndarray):
+        tmp_path = path + ".tmp"
+        data.tofile(tmp_path)
+        os.replace(tmp_path, path)
+
+    # ----------------------------------------------------------- write API
+
+    def upsert(self, ids: Sequence[str], embeddings: Any, documents: Sequence[str], metadatas: Sequence[Dict]):
+        ids = list(ids)
+        if not ids:
+            return
+
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1))
+
+        with self._writing():
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self.generation = 0
+                self._save_meta()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match collection dimension {self.dim}")
+
+            with open(self._path("vectors"), "ab") as f:
+                f.write(vectors.tobytes())
+            self._append_records([
+                {"op": "add", "id": id_, "document": document, "metadata": metadata or {}}
+                for id_, document, metadata in zip(ids, documents, metadatas)
+            ])
+
+            start = len(self.ids)
+            self.ids.extend(ids)
+            self.documents.extend(documents)
+            self.metadatas.extend(metadata or {} for metadata in metadatas)
+            self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+            # Upserting an existing id replaces its row
+            for offset, id_ in enumerate(ids):
+                previous = self.rows.get(id_)
+                if previous is not None:
+                    self.alive[previous] = False
+                self.rows[id_] = start + offset
+
+            self._map_vectors()
+            self._columns = {}
+
+            if self.centroids is not None:
+                assign = self._assign_rows(vectors)
+                with open(self._path("ivf.assign"), "ab") as f:
+                    f.write(assign.tobytes())
+                self.assign = np.concatenate([self.assign, assign])
+
+            live = int(self.alive.sum())
+            if live >= self.ivf_min_rows and (self.centroids is None or live >= 2 * self.trained_rows):
+                self._train_ivf()
+
+    def update(self, ids: Sequence[str], metadatas: Sequence[Dict]):
+        with self._writing():
+            records = []
+            for id_, metadata in zip(ids, metadatas):
+                row = self.rows.get(id_)
+                if row is not None:
+                    self.metadatas[row] = metadata or {}
+                    records.append({"op": "update", "id": id_, "metadata": metadata or {}})
+            if records:
+                self._append_records(records)
+                self._columns = {}
+
+    def delete(self, ids: Sequence[str]):
+        with self._writing():
+            rows = [self.rows.pop(id_) for id_ in ids if id_ in self.rows]
+            if not rows:
+                return
+            self._append_records([{"op": "delete", "id": self.ids[row]} for row in rows])
+            self.alive[rows] = False
+
+            dead = len(self.alive) - int(self.alive.sum())
+            if dead > max(COMPACT_MIN_DEAD, int(self.alive.sum())):
+                self._compact()
+
+    def _compact(self):
+        """
+        Write the live rows as the next generation, switch numpy_index.json to
+        it, then remove the previous generation's files.
+        """
+        keep = np.flatnonzero(self.alive)
+        previous = [self._path(kind) for kind in ("vectors", "records")]
+        if self.centroids is not None:
+            previous += [self._path("ivf.npy"), self._path("ivf.assign")]
+        generation = self.generation + 1
+        ivf_version = 0 if self.centroids is not None else None
+
+        with open(self._path("vectors", generation), "wb") as f:
+            for start in range(0, len(keep), ASSIGN_BLOCK_ROWS):
+                f.write(np.asarray(self.vectors[keep[start:start + ASSIGN_BLOCK_ROWS]]).tobytes())
+
+        self.ids = [self.ids[row] for row in keep]
+        self.documents = [self.documents[row] for row in keep]
+        self.metadatas = [self.metadatas[row] for row in keep]
+        with open(self._path("records", generation), "w", encoding="utf-8") as f:
+            f.write("".join(
+                json.dumps({"op": "add", "id": id_, "document": document, "metadata": metadata}) + "\n"
+                for id_, document, metadata in zip(self.ids, self.documents, self.metadatas)
+            ))
+
+        if self.centroids is not None:
+            self.assign = self.assign[keep]
+            np.save(self._path("ivf.npy", generation, ivf_version), self.centroids)
+            self.assign.tofile(self._path("ivf.assign", generation, ivf_version))
+
+        self.generation = generation
+        self.ivf_version = ivf_version
+        self._save_meta()
+
+        self.alive = np.ones(len(keep), dtype=bool)
+        self.rows = {id_: row for row, id_ in enumerate(self.ids)}
+        self._map_vectors()
+        self._columns = {}
+        _remove_files(previous)
+
+        print(f"🧹 [VectorStore] Compacted NumPy index to {len(keep)} rows")
+
+    # ------------------------------------------------------------------ IVF
+
+    def _assign_rows(self, vectors: np.ndarray) -> np.ndarray:
+        assign = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + ASSIGN_BLOCK_ROWS], dtype=np.float32)
+            assign[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return assign
+
+    def _train_ivf(self):
+        """Spherical k-means on a sample of live rows; ~sqrt(n) lists."""
+        live = np.flatnonzero(self.alive)
+        nlist = max(1, int(np.sqrt(len(live))))
+
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(live, size=min(len(live), nlist * IVF_SAMPLE_PER_LIST), replace=False))
+        sample = np.asarray(self.vectors[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(IVF_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            # Empty lists keep their previous centroid
+            centroids = np.where(counts[:, None] > 0, _normalize(sums), centroids)
+
+        self.centroids = centroids.astype(np.float32)
+        self.assign = self._assign_rows(self.vectors)
+        self.trained_rows = len(live)
+
+        # New files under the next IVF version; numpy_index.json switches to them last
+        previous = [self._path("ivf.npy"), self._path("ivf.assign")] if self.ivf_version is not None else []
+        ivf_version = 0 if self.ivf_version is None else self.ivf_version + 1
+        np.save(self._path("ivf.npy", ivf_version=ivf_version), self.centroids)
+        self.assign.tofile(self._path("ivf.assign", ivf_version=ivf_version))
+        self.ivf_version = ivf_version
+        self._save_meta()
+        _remove_files(previous)
+
+        print(f"🧭 [VectorStore] Trained IVF index: {nlist} lists over {len(live)} vectors")
+
+    # ----------------------------------------------------------- read API
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return int(self.alive.sum())
+
+    def _column(self, key: str) -> np.ndarray:
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(len(self.metadatas), dtype=object)
+            column[:] = [metadata.get(key) for metadata in self.metadatas]
+            self._columns[key] = column
+        return column
+
+    def _filter_mask(self, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Rows matching a Chroma-style `where` filter ($and/$or, $eq/$ne/$in/$nin/$gt/$gte/$lt/$lte)."""
+        mask = self.alive.copy()
+        if not where:
+            return mask
+
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                masks = [self._filter_mask(clause) for clause in condition]
+                combined = np.logical_and.reduce(masks) if key == "$and" else np.logical_or.reduce(masks)
+                mask &= combined
+            elif not isinstance(condition, dict) or set(condition) == {"$eq"}:
+                value = condition["$eq"] if isinstance(condition, dict) else condition
+                mask &= self._column(key) == value
+            else:
+                column = self._column(key)
+                mask &= np.fromiter((_matches(value, condition) for value in column), dtype=bool, count=len(column))
+        return mask
+
+    def get(self, ids: Optional[Sequence[str]] = None, include: Optional[Sequence[str]] = None, where: Optional[Dict] = None) -> Dict[str, Any]:
+        """Chroma-style get; rows come back in the order of `ids` (missing ids are skipped)."""
+        include = ("documents", "metadatas") if include is None else include
+
+        with self._lock:
+            self._refresh()
+            if ids is not None:
+                rows = [self.rows[id_] for id_ in ids if id_ in self.rows]
+                if where:
+                    mask = self._filter_mask(where)
+                    rows = [row for row in rows if mask[row]]
+            else:
+                rows = np.flatnonzero(self._filter_mask(where)).tolist()
+
+            result: Dict[str, Any] = {"ids": [self.ids[row] for row in rows]}
+            if "embeddings" in include:
+                result["embeddings"] = np.asarray(self.vectors[rows]) if rows else np.empty((0, self.dim or 0), dtype=np.float32)
+            if "documents" in include:
+                result["documents"] = [self.documents[row] for row in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [self.metadatas[row] for row in rows]
+            return result
+
+    def search(self, query: Any, k: int, where: Optional[Dict[str, Any]] = None, nprobe: Optional[int] = None) -> List[Tuple[str, str, Dict[str, Any], float]]:
+        """Top-k (id, document, metadata, cosine similarity), best first (see relevance_from_cosine)."""
+        return self.search_many(np.asarray(query, dtype=np.float32).reshape(1, -1), k, where, nprobe)[0]
+
+    def search_many(self, queries: Any, k: int, where: Optional[Dict[str, Any]] = None, nprobe: Optional[int] = None) -> List[List[Tuple[str, str, Dict[str, Any], float]]]:
+        """
+        search() for a (m, dim) matrix of queries. Exact search scores all
+        queries in one matmul; IVF probes lists per query.
+        """
+        queries = _normalize(np.asarray(queries, dtype=np.float32).reshape(len(queries), -1))
+
+        with self._lock:
+            self._refresh()
+            if not self.ids:
+                return [[] for _ in range(len(queries))]
+            mask = self._filter_mask(where)
+            vectors, centroids, assign = self.vectors, self.centroids, self.assign
+            records = (self.ids, self.documents, self.metadatas)
+
+        candidates = int(mask.sum())
+        if not candidates:
+            return [[] for _ in range(len(queries))]
+
+        # IVF only pays off on large candidate sets; small filtered sets are scored exactly
+        if centroids is not None and candidates >= self.ivf_min_rows:
+            nprobe = min(nprobe or self.nprobe, len(centroids))
+            results = []
+            for query in queries:
+                probes = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+                results.extend(self._top_k(vectors, mask & np.isin(assign, probes), query[None, :], k, records))
+            return results
+
+        return self._top_k(vectors, mask, queries, k, records)
+
+    @staticmethod
+    def _top_k(vectors: np.ndarray, mask: np.ndarray, queries: np.ndarray, k: int, records: Tuple[List, List, List]) -> List[List[Tuple]]:
+        """Best `k` masked rows per query (one matmul, argpartition per column)."""
+        if mask.all():
+            rows = None
+            scores = vectors @ queries.T
+        else:
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                return [[] for _ in range(len(queries))]
+            scores = vectors[rows] @ queries.T
+
+        ids, documents, metadatas = records
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+
+        results = []
+        for column in range(len(queries)):
+            column_top = top[:, column]
+            column_top = column_top[np.argsort(-scores[column_top, column], kind="stable")]
+            hits = []
+            for position in column_top:
+                row = int(position if rows is None else rows[position])
+                hits.append((ids[row], documents[row], metadatas[row], float(scores[position, column])))
+            results.append(hits)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return {
+                "backend": "numpy",
+                "generation": self.generation,
+                "vectors": int(self.alive.sum()),
+                "dead_rows": int(len(self.alive) - self.alive.sum()),
+                "dimension": self.dim,
+                "ivf_lists": int(len(self.centroids)) if self.centroids is not None else 0,
+                "ivf_nprobe": self.nprobe if self.centroids is not None else None,
+                "size_mb": round(len(self.ids) * (self.dim or 0) * 4 / (1024 * 1024), 3)
+            }
+
+
+_indexes: Dict[str, NumpyVectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_numpy_index(directory: str) -> NumpyVectorIndex:
+    """Process-wide index per collection directory (stays mapped between queries)."""
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = _indexes[directory] = NumpyVectorIndex(directory)
+        return index
+
+
+def drop_numpy_index(directory: str):
+    with _indexes_lock:
+        index = _indexes.pop(directory, None)
+    if index is not None:
+        # Release the memory map before the files are removed
+        index.vectors = None
@@ -0,0 +1,542 @@
+"""
+Quantized vector index for a collection.
+
+Quantized collections keep their embeddings here rather than in Chroma
+(Chroma holds their documents and metadata, with 1-dimensional placeholder
+vectors). Search scores compact codes held in memory:
+
+- int8:   one signed byte per dimension plus a float32 scale per vector
+          (x ~= scale * code), scored with a blocked int8 dot product  -> ~4x less memory
+- binary: one bit per dimension (sign), scored by Hamming distance    -> ~32x less memory
+
+and re-ranks the top `k * oversample` candidates exactly against the
+L2-normalised float32 rows, which stay on disk in a memory-mapped file:
+only the candidate rows are read.
+
+Files in the collection directory (<g> is the generation named in quantized.json):
+- quantized.json          mode, dimension, generation
+- quantized.<g>.codes     packed codes, one fixed-size row per vector
+- quantized.<g>.scales    float32 scale per vector (int8 only)
+- quantized.<g>.vectors   float32 rows
+- quantized.<g>.ids       one id per line, same order as the rows
+- quantized.<g>.deleted   int64 numbers of removed rows
+- quantized.lock          held by writers
+
+All data files are append-only; the ids file is appended last, so a row
+exists once its id is written. Removed rows are tombstoned and compacted
+away once they outnumber live rows: the live rows are written under the
+next generation and quantized.json is replaced last, so a crash leaves
+either generation intact. Each process reloads when another one has
+written (file sizes, mtimes or inodes changed).
+"""
+
+import os
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .file_lock import file_lock, file_signature
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+# Candidates fetched per requested result before exact re-ranking
+DEFAULT_OVERSAMPLE = {"int8": 4, "binary": 10}
+
+# Rows scored per step (bounds the float32 scratch buffer)
+SEARCH_BLOCK_ROWS = 16384
+
+# Dead rows tolerated (beyond live rows) before compaction
+COMPACT_MIN_DEAD = 1000
+
+# Embedding width of the placeholder vectors Chroma stores for quantized collections
+PLACEHOLDER_DIM = 1
+
+DATA_FILES = ("codes", "scales", "vectors", "ids", "deleted")
+
+# Bits set per byte value, for NumPy builds without bitwise_count
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def get_quantization_mode(requested: Optional[str] = None) -> str:
+    """Requested mode, else VECTOR_QUANTIZATION (default 'none')."""
+    mode = (requested or os.getenv("VECTOR_QUANTIZATION", "none")).lower()
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization '{mode}'. Use one of: {', '.join(QUANTIZATION_MODES)}")
+    return mode
+
+
+def get_oversample(mode: str, requested: Optional[int] = None) -> int:
+    return max(1, int(requested or os.getenv("VECTOR_RERANK_OVERSAMPLE") or DEFAULT_OVERSAMPLE.get(mode, 4)))
+
+
+def placeholder_vectors(count: int) -> np.ndarray:
+    """What Chroma stores in place of the embeddings of a quantized collection"""
+    return np.ones((count, PLACEHOLDER_DIM), dtype=np.float32)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT[values]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 codes and scales."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """Sign bits, packed 8 dimensions per byte."""
+    return np.packbits(np.asarray(vectors) > 0, axis=1)
+
+
+class QuantizedIndex:
+    """Quantized codes in memory, float32 re-ranking rows on disk, for one collection."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "quantized.json")
+        self.lock_path = os.path.join(directory, "quantized.lock")
+
+        self._lock = threading.RLock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.mode = "none"
+        self.dim: Optional[int] = None
+        self.generation = 0
+        self.codes: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        self.vectors: Optional[np.ndarray] = None
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.alive = np.zeros(0, dtype=bool)
+        # Files longer than the rows they agree on (a crash between appends)
+        self._torn = False
+        self._signature: Tuple = file_signature(self.meta_path)
+
+    @property
+    def exists(self) -> bool:
+        return self.mode != "none"
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim if self.mode == "int8" else (self.dim + 7) // 8
+
+    @property
+    def _dtype(self):
+        return np.int8 if self.mode == "int8" else np.uint8
+
+    def _path(self, kind: str, generation: Optional[int] = None) -> str:
+        return os.path.join(self.directory, f"quantized.{self.generation if generation is None else generation}.{kind}")
+
+    def _current_signature(self) -> Tuple:
+        if not self.exists:
+            return file_signature(self.meta_path)
+        return file_signature(self.meta_path, self._path("ids"), self._path("deleted"))
+
+    # ---------------------------------------------------------------- storage
+
+    def _load(self):
+        # Another process may compact (and remove this generation's files) while we read
+        for _ in range(3):
+            self._reset()
+            try:
+                self._read()
+                return
+            except FileNotFoundError:
+                continue
+        raise RuntimeError(f"Quantized index in {self.directory} kept changing while loading")
+
+    def _read(self):
+        if not os.path.exists(self.meta_path):
+            return
+
+        # Taken before the files are read, so writes made meanwhile trigger another reload
+        meta_signature = file_signature(self.meta_path)
+        with open(self.meta_path, "r") as f:
+            meta = json.load(f)
+        if "generation" not in meta:
+            # Candidate-only index from before vectors moved out of Chroma (which still holds them);
+            # treated as unquantized until quantization is requested again
+            return
+        self.mode = meta["mode"]
+        self.dim = int(meta["dim"])
+        self.generation = int(meta.get("generation", 0))
+        self._signature = meta_signature + file_signature(self._path("ids"), self._path("deleted"))
+
+        with open(self._path("ids"), "r", encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        # The last element is empty, or a torn id
+        ids = lines[:-1]
+
+        codes = np.fromfile(self._path("codes"), dtype=self._dtype)
+        vector_bytes = os.path.getsize(self._path("vectors"))
+        counts = [len(ids), len(codes) // self._row_bytes, vector_bytes // (4 * self.dim)]
+        if self.mode == "int8":
+            scales = np.fromfile(self._path("scales"), dtype=np.float32)
+            counts.append(len(scales))
+
+        # A crash between appends can leave the files one batch apart; keep the common prefix
+        count = min(counts)
+        self._torn = (
+            lines[-1] != "" or len(ids) > count
+            or len(codes) != count * self._row_bytes
+            or vector_bytes != count * self.dim * 4
+            or (self.mode == "int8" and len(scales) != count)
+        )
+        self.codes = codes[:count * self._row_bytes].reshape(count, self._row_bytes)
+        self.scales = scales[:count] if self.mode == "int8" else None
+        self.ids = ids[:count]
+
+        # A re-added id supersedes its earlier row
+        self.alive = np.ones(count, dtype=bool)
+        for row, id_ in enumerate(self.ids):
+            previous = self.rows.get(id_)
+            if previous is not None:
+                self.alive[previous] = False
+            self.rows[id_] = row
+
+        deleted = np.fromfile(self._path("deleted"), dtype=np.int64)
+        self.alive[deleted[deleted < count]] = False
+        self.rows = {id_: row for id_, row in self.rows.items() if self.alive[row]}
+
+        self._map_vectors()
+
+    def _map_vectors(self):
+        count = len(self.ids)
+        if count:
+            self.vectors = np.memmap(self._path("vectors"), dtype=np.float32, mode="r", shape=(count, self.dim))
+        else:
+            self.vectors = np.empty((0, self.dim or 0), dtype=np.float32)
+
+    def _refresh(self):
+        """Reload if another process has written since we last read"""
+        if self._current_signature() != self._signature:
+            self._load()
+
+    def _truncate_torn(self):
+        """Cut every file back to the rows they agree on, so appends stay aligned"""
+        count = len(self.ids)
+        sizes = {"codes": count * self._row_bytes, "vectors": count * self.dim * 4}
+        if self.mode == "int8":
+            sizes["scales"] = count * 4
+        sizes["ids"] = sum(len(id_.encode("utf-8")) + 1 for id_ in self.ids)
+        for kind, size in sizes.items():
+            os.truncate(self._path(kind), size)
+        self._torn = False
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """In-process and cross-process write lock, on freshly loaded state"""
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            if self._torn:
+                self._truncate_torn()
+            yield
+            self._signature = self._current_signature()
+
+    def _save_meta(self):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"mode": self.mode, "dim": self.dim, "generation": self.generation}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _append(self, kind: str, data: bytes):
+        with open(self._path(kind), "ab") as f:
+            f.write(data)
+
+    # ----------------------------------------------------------- write API
+
+    def create(self, mode: str, dim: int):
+        with self._writing():
+            if self.exists:
+                # Created by another process meanwhile
+                return
+            self.mode = mode
+            self.dim = dim
+            self.generation = 0
+            self.codes = np.empty((0, self._row_bytes), dtype=self._dtype)
+            self.scales = np.empty(0, dtype=np.float32) if mode == "int8" else None
+            for kind in DATA_FILES:
+                open(self._path(kind), "wb").close()
+            self._map_vectors()
+            self._save_meta()
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.mode == "int8":
+            return quantize_int8(vectors)
+        return quantize_binary(vectors), None
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray):
+        """Add or replace vectors (float32, (n, dim)) for the given ids."""
+        ids = list(ids)
+        if not ids:
+            return
+
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1))
+
+        with self._writing():
+            if not self.exists:
+                return
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match quantized index dimension {self.dim}")
+
+            codes, scales = self._encode(vectors)
+
+            self._append("vectors", vectors.tobytes())
+            self._append("codes", codes.tobytes())
+            if scales is not None:
+                self._append("scales", scales.tobytes())
+            with open(self._path("ids"), "a", encoding="utf-8") as f:
+                f.write("".join(f"{id_}\n" for id_ in ids))
+
+            start = len(self.ids)
+            self.ids.extend(ids)
+            self.codes = np.concatenate([self.codes, codes])
+            if scales is not None:
+                self.scales = np.concatenate([self.scales, scales])
+            self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+            for offset, id_ in enumerate(ids):
+                previous = self.rows.get(id_)
+                if previous is not None:
+                    self.alive[previous] = False
+                self.rows[id_] = start + offset
+
+            self._map_vectors()
+            self._compact_if_needed()
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """Drop rows for the given ids; returns how many were removed."""
+        if not self.exists:
+            return 0
+
+        with self._writing():
+            rows = [self.rows.pop(id_) for id_ in ids if id_ in self.rows]
+            if rows:
+                self._append("deleted", np.asarray(rows, dtype=np.int64).tobytes())
+                self.alive[rows] = False
+                self._compact_if_needed()
+            return len(rows)
+
+    def _compact_if_needed(self):
+        live = int(self.alive.sum())
+        if len(self.alive) - live > max(COMPACT_MIN_DEAD, live):
+            self._compact()
+
+    def _compact(self):
+        """Write the live rows as the next generation, switch quantized.json to it, remove the old files."""
+        keep = np.flatnonzero(self.alive)
+        previous = self.generation
+        generation = previous + 1
+
+        with open(self._path("vectors", generation), "wb") as f:
+            for start in range(0, len(keep), SEARCH_BLOCK_ROWS):
+                f.write(np.asarray(self.vectors[keep[start:start + SEARCH_BLOCK_ROWS]]).tobytes())
+        self.codes = self.codes[keep]
+        self.codes.tofile(self._path("codes", generation))
+        if self.scales is not None:
+            self.scales = self.scales[keep]
+            self.scales.tofile(self._path("scales", generation))
+        else:
+            open(self._path("scales", generation), "wb").close()
+        self.ids = [self.ids[row] for row in keep]
+        with open(self._path("ids", generation), "w", encoding="utf-8") as f:
+            f.write("".join(f"{id_}\n" for id_ in self.ids))
+        open(self._path("deleted", generation), "wb").close()
+
+        self.generation = generation
+        self._save_meta()
+
+        self.alive = np.ones(len(keep), dtype=bool)
+        self.rows = {id_: row for row, id_ in enumerate(self.ids)}
+        self._map_vectors()
+
+        for kind in DATA_FILES:
+            try:
+                os.remove(self._path(kind, previous))
+            except OSError:
+                # Still mapped by a reader (Windows); left behind
+                pass
+
+        print(f"🧹 [VectorStore] Compacted quantized index to {len(keep)} rows")
+
+    # ----------------------------------------------------------- read API
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self.rows)
+
+    def _scores(self, codes: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        """Approximate similarity of every code row to the query (higher is closer)."""
+        scores = np.empty(len(codes), dtype=np.float32)
+
+        if self.mode == "int8":
+            query_codes, _ = quantize_int8(query[None, :])
+            query_codes = query_codes[0].astype(np.float32)
+            for start in range(0, len(codes), SEARCH_BLOCK_ROWS):
+                block = codes[start:start + SEARCH_BLOCK_ROWS]
+                scores[start:start + len(block)] = block.astype(np.float32) @ query_codes
+            # The query scale is the same for every row, so it does not change the ranking
+            scores *= scales
+        else:
+            query_bits = quantize_binary(query[None, :])[0]
+            for start in range(0, len(codes), SEARCH_BLOCK_ROWS):
+                block = codes[start:start + SEARCH_BLOCK_ROWS]
+                scores[start:start + len(block)] = -_popcount(block ^ query_bits).sum(axis=1, dtype=np.int32)
+
+        return scores
+
+    def _candidates(self, codes: np.ndarray, scales: Optional[np.ndarray], mask: np.ndarray, query: np.ndarray, top_n: int) -> np.ndarray:
+        """Rows of the `top_n` best masked candidates, best first."""
+        if mask.all():
+            rows = None
+            scores = self._scores(codes, scales, query)
+        else:
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                return rows
+            scores = self._scores(codes[rows], scales[rows] if scales is not None else None, query)
+
+        top_n = min(top_n, len(scores))
+        top = np.argpartition(-scores, top_n - 1)[:top_n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top if rows is None else rows[top]
+
+    def search_many(self, queries: Any, k: int, oversample: int, allowed_ids: Optional[Sequence[str]] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k (id, cosine similarity) per query, best first: `k * oversample`
+        candidates from the codes, re-ranked on their float32 rows. With
+        `allowed_ids` (a metadata filter's matches), only those rows are scored.
+        """
+        queries = _normalize(np.asarray(queries, dtype=np.float32).reshape(len(queries), -1))
+
+        with self._lock:
+            self._refresh()
+            if not self.exists or not self.ids:
+                return [[] for _ in range(len(queries))]
+            codes, scales, vectors, ids = self.codes, self.scales, self.vectors, self.ids
+            mask = self.alive.copy()
+            if allowed_ids is not None:
+                allowed = np.zeros(len(mask), dtype=bool)
+                allowed[[self.rows[id_] for id_ in allowed_ids if id_ in self.rows]] = True
+                mask &= allowed
+
+        results = []
+        for query in queries:
+            candidates = np.sort(self._candidates(codes, scales, mask, query, k * oversample))
+            if not len(candidates):
+                results.append([])
+                continue
+            similarity = np.asarray(vectors[candidates]) @ query
+            best = np.argsort(-similarity, kind="stable")[:k]
+            results.append([(ids[candidates[i]], float(similarity[i])) for i in best])
+        return results
+
+    def evaluate_recall(self, k: int, oversample: int, sample_size: int = 100) -> Dict[str, Any]:
+        """
+        Recall@k of quantized search against exact float32 search, using a
+        sample of the stored vectors as queries: for candidates alone and
+        after re-ranking.
+        """
+        with self._lock:
+            self._refresh()
+            codes, scales, vectors, ids = self.codes, self.scales, self.vectors, self.ids
+            mask = self.alive.copy()
+
+        live = np.flatnonzero(mask)
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(live, size=min(sample_size, len(live)), replace=False))
+        queries = np.asarray(vectors[sample])
+        k = min(k, len(live))
+
+        # Exact top-k of every sample query, merged block by block over the float32 rows
+        best_scores = np.full((len(sample), k), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(sample), k), dtype=np.int64)
+        for start in range(0, len(live), SEARCH_BLOCK_ROWS):
+            block_rows = live[start:start + SEARCH_BLOCK_ROWS]
+            scores = np.concatenate([best_scores, (np.asarray(vectors[block_rows]) @ queries.T).T], axis=1)
+            rows = np.concatenate([best_rows, np.broadcast_to(block_rows, (len(sample), len(block_rows)))], axis=1)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_rows = np.take_along_axis(rows, top, axis=1)
+
+        candidate_hits = 0
+        reranked_hits = 0
+
+        for query, truth_rows in zip(queries, best_rows):
+            truth = set(truth_rows.tolist())
+            candidates = self._candidates(codes, scales, mask, query, k * oversample)
+            candidate_hits += len(truth.intersection(candidates[:k].tolist()))
+
+            candidates = np.sort(candidates)
+            rerank = np.asarray(vectors[candidates]) @ query
+            best = candidates[np.argsort(-rerank, kind="stable")[:k]]
+            reranked_hits += len(truth.intersection(best.tolist()))
+
+        total = len(sample) * k
+        float_bytes = len(live) * (self.dim or 0) * 4
+        quantized_bytes = len(live) * (self._row_bytes + (4 if scales is not None else 0))
+
+        return {
+            "mode": self.mode,
+            "k": k,
+            "oversample": oversample,
+            "queries": int(len(sample)),
+            "recall_candidates": round(candidate_hits / total, 4) if total else 0.0,
+            "recall_reranked": round(reranked_hits / total, 4) if total else 0.0,
+            "float32_bytes": float_bytes,
+            "quantized_bytes": int(quantized_bytes),
+            "memory_compression": round(float_bytes / quantized_bytes, 1) if quantized_bytes else None,
+            "reranked_rows_per_query": k * oversample
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            if not self.exists:
+                return {"mode": "none"}
+            rows = len(self.ids)
+            return {
+                "mode": self.mode,
+                "vectors": len(self.rows),
+                "dead_rows": rows - len(self.rows),
+                "dimension": self.dim,
+                "memory_mb": round((self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)) / (1024 * 1024), 3),
+                "disk_float32_mb": round(rows * self.dim * 4 / (1024 * 1024), 3)
+            }
+
+
+_indexes: Dict[str, QuantizedIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_quantized_index(directory: str) -> QuantizedIndex:
+    """Process-wide index per collection directory (codes stay loaded between queries)."""
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = _indexes[directory] = QuantizedIndex(directory)
+        return index
+
+
+def drop_quantized_index(directory: str):
+    with _indexes_lock:
+        index = _indexes.pop(directory, None)
+    if index is not None:
+        # Release the memory map before the files are removed
+        index.vectors = None
@@ -0,0 +1,152 @@
+"""
+Two-level retrieval cache.
+
+- embeddings: query text -> query vector, per resolved embeddings configuration
+- results:    (collection, generation, query, k, filter, mode, oversample, hybrid
+              vector threshold) -> (Document, score) list
+
+Collections carry a generation that every index and delete bumps, so results
+cached before a write are never served after it. The generation is kept in
+process and in the collection's metadata record, so writes made by another
+process invalidate too.
+
+Queries are keyed with whitespace collapsed, so "How do I  reset?" and
+"How do I reset? " share entries. Both levels are LRU; a size of 0 turns a
+level off.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()[:32]
+
+
+class _LRU:
+    """Bounded mapping with hit/miss counts."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.size <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+class QueryCache:
+    """Query embedding and result caches with per-collection generations."""
+
+    def __init__(self, embedding_size: Optional[int] = None, result_size: Optional[int] = None):
+        self.embeddings = _LRU(int(os.getenv("VECTOR_EMBEDDING_CACHE_SIZE", "2048")) if embedding_size is None else embedding_size)
+        self.results = _LRU(int(os.getenv("VECTOR_RESULT_CACHE_SIZE", "1024")) if result_size is None else result_size)
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    # Generations
+
+    def invalidate(self, persist_dir: str):
+        """Bump the collection's in-process generation (after writes and deletes)"""
+        with self._lock:
+            self._generations[persist_dir] = self._generations.get(persist_dir, 0) + 1
+
+    def generation(self, persist_dir: str, record: Optional[Dict[str, Any]] = None) -> Tuple:
+        """
+        Current generation: the in-process counter plus the stored one
+        (record creation time and generation, changed by any process's writes).
+        """
+        with self._lock:
+            local = self._generations.get(persist_dir, 0)
+        if record is None:
+            return (local,)
+        return (local, record.get("created_at"), record.get("generation", 0))
+
+    # Query embeddings
+
+    def embedding_key(self, query: str, model_key: Tuple) -> Tuple:
+        """model_key: the embeddings registry key (provider and resolved settings)"""
+        return (model_key, normalize_query(query))
+
+    def get_embedding(self, query: str, model_key: Tuple) -> Optional[np.ndarray]:
+        with self._lock:
+            return self.embeddings.get(self.embedding_key(query, model_key))
+
+    def put_embedding(self, query: str, model_key: Tuple, vector: np.ndarray):
+        vector = np.array(vector, dtype=np.float32)
+        # Shared between callers
+        vector.setflags(write=False)
+        with self._lock:
+            self.embeddings.put(self.embedding_key(query, model_key), vector)
+
+    # Search results
+
+    def result_key(
+        self,
+        persist_dir: str,
+        generation: Tuple,
+        query: str,
+        k: int,
+        filter_metadata: Optional[Dict],
+        search_mode: str,
+        rerank_oversample: Optional[int],
+        vector_threshold: Optional[float] = None
+    ) -> Tuple:
+        filter_key = json.dumps(filter_metadata, sort_keys=True, default=str) if filter_metadata else ""
+        return (persist_dir, generation, query_hash(query), k, filter_key, search_mode, rerank_oversample, vector_threshold)
+
+    def get_results(self, key: Tuple) -> Optional[List[tuple]]:
+        with self._lock:
+            return self.results.get(key)
+
+    def put_results(self, key: Tuple, results: List[tuple]):
+        with self._lock:
+            self.results.put(key, list(results))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {"embeddings": self.embeddings.stats(), "results": self.results.stats()}
+
+    def clear(self):
+        with self._lock:
+            self.embeddings = _LRU(self.embeddings.size)
+            self.results = _LRU(self.results.size)
+
+
+# Process-wide cache
+query_cache = QueryCache()
@@ -1,13 +1,24 @@
 import os
 import shutil
 import json
+import threading
+import numpy as np
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from langchain_chroma import Chroma
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
 from .errors import VectorStoreError, CollectionNotFoundError, EmbeddingMismatchError, InvalidOperationError
+from .client_pool import chroma_pool
+from .manifest import SourceManifest, ChunkIdGenerator, chunk_ids
+from .ingest import get_ingest_config, iter_sources, WriteBehindWriter, IngestProgress
+from .quantization import get_quantization_mode, get_oversample, get_quantized_index, drop_quantized_index, placeholder_vectors
+from .numpy_index import get_backend_name, detect_backend, get_numpy_index, drop_numpy_index, relevance_from_cosine
+from .keyword_index import HYBRID_CANDIDATES, get_search_mode, reciprocal_rank_fusion, get_keyword_index, drop_keyword_index
+from .collection_meta import directory_size, read_record, update_record, drop_record
+from .query_cache import query_cache
+from .splitter import TokenTextSplitter
 
 
 def _get_embeddings():
@@ -36,9 +47,47 @@ def _get_embeddings():
                 )
 
 
-def _get_persist_dir(collection_name: str = "default") -> str:
+def _get_embeddings_key() -> tuple:
     """
-    Get persistent storage directory for vector DB.
+    Resolved configuration key of the embeddings model _get_embeddings() returns
+    (same import paths), for caching query vectors per model.
+    """
+    try:
+        from library.embeddings_universal.core.service import get_embeddings_key
+    except ImportError:
+        try:
+            from features.embeddings_universal.service import get_embeddings_key
+        except ImportError:
+            try:
+                from ...embeddings_universal.core.service import get_embeddings_key
+            except ImportError:
+                raise ImportError(
+                    " embeddings-universal feature not found. "
+                    "Make sure it's included in your workflow and properly configured."
+                )
+    return get_embeddings_key()
+
+
+def _embed_documents_array(embeddings, texts: List[str]) -> np.ndarray:
+    """Embed texts as a float32 matrix (array path when the embeddings model has one)"""
+    if hasattr(embeddings, "embed_documents_array"):
+        return embeddings.embed_documents_array(texts)
+    return np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+
+
+def _embed_query_array(embeddings, text: str) -> np.ndarray:
+    if hasattr(embeddings, "embed_query_array"):
+        return embeddings.embed_query_array(text)
+    return np.asarray(embeddings.embed_query(text), dtype=np.float32)
+
+
+# Collection directories already created by this process
+_created_dirs = set()
+
+
+def _get_base_dir() -> str:
+    """
+    Get the root storage directory for vector DBs.
     
     Priority:
     1. VECTOR_DB_PATH environment variable
@@ -54,18 +103,64 @@ def _get_persist_dir(collection_name: str = "default") -> str:
             "vector_dbs"
         )
     
-    # Create collection-specific subfolder
-    persist_dir = os.path.join(base_dir, collection_name)
-    os.makedirs(persist_dir, exist_ok=True)
+    return base_dir
+
+
+def _get_persist_dir(collection_name: str = "default", create: bool = False) -> str:
+    """
+    Get the collection-specific storage directory.
+    Only writers pass create=True; the directory is created once per process.
+    """
+    persist_dir = os.path.join(_get_base_dir(), collection_name)
+    
+    if create and persist_dir not in _created_dirs:
+        os.makedirs(persist_dir, exist_ok=True)
+        _created_dirs.add(persist_dir)
     
     return persist_dir
 
 
+def _open_collection(collection_name: str, persist_dir: str) -> Chroma:
+    """Pooled Chroma handle for a collection; callers hold a chroma_pool lease on persist_dir while using it"""
+    return chroma_pool.get(persist_dir, collection_name)
+
+
+def _resolve_backend(persist_dir: str, requested: Optional[str] = None) -> str:
+    """
+    Vector backend of a collection: fixed by whatever it was created with,
+    else the requested one (default VECTOR_BACKEND).
+    """
+    existing = detect_backend(persist_dir)
+    
+    if existing:
+        if requested and get_backend_name(requested) != existing:
+            print(f"  [VectorStore] Collection uses the '{existing}' backend, ignoring '{requested}'")
+        return existing
+    
+    return get_backend_name(requested)
+
+
+def _open_store(collection_name: str, persist_dir: str, backend: str):
+    """Collection-level store (chromadb Collection or NumpyVectorIndex) for reads and writes"""
+    if backend == "numpy":
+        return get_numpy_index(persist_dir)
+    return _open_collection(collection_name, persist_dir)._collection
+
+
 def _get_provider_file(collection_name: str) -> str:
     """Get path to provider metadata file"""
     return os.path.join(_get_persist_dir(collection_name), ".provider_info")
 
 
+def _read_provider_info(collection_name: str) -> Dict[str, Any]:
+    provider_file = _get_provider_file(collection_name)
+    
+    if os.path.exists(provider_file):
+        with open(provider_file, 'r') as f:
+            return json.load(f)
+    return {}
+
+
 def _check_embedding_compatibility(collection_name: str, current_provider: str):
     """
     Check if collection was created with the same embedding provider.
@@ -102,9 +197,15 @@ def _get_text_splitter(strategy: str = "recursive", **kwargs):
     Get appropriate text splitter based on content type.
     
     Args:
-        strategy: "recursive", "markdown", or "code"
+        strategy: "recursive", "markdown", "code", or "token" (sizes in tokens)
         **kwargs: chunk_size, chunk_overlap, etc.
     """
+    if strategy == "token":
+        return TokenTextSplitter(
+            chunk_size=kwargs.get("chunk_size") or int(os.getenv("DEFAULT_CHUNK_TOKENS", "256")),
+            chunk_overlap=kwargs.get("chunk_overlap") or int(os.getenv("DEFAULT_CHUNK_TOKEN_OVERLAP", "32"))
+        )
+    
     chunk_size = kwargs.get("chunk_size") or int(os.getenv("DEFAULT_CHUNK_SIZE", "1000"))
     chunk_overlap = kwargs.get("chunk_overlap") or int(os.getenv("DEFAULT_CHUNK_OVERLAP", "200"))
     
@@ -130,13 +231,174 @@ def _get_text_splitter(strategy: str = "recursive", **kwargs):
         )
 
 
+def _prepare_quantized_index(collection_name: str, collection, persist_dir: str, quantization: Optional[str], backend: str = "chroma"):
+    """
+    The collection's store, quantized index and effective mode. The first time
+    quantization is requested for a collection that already holds chunks,
+    their vectors move out of Chroma into a new quantized index (an empty
+    collection gets one once the first vectors are known).
+    """
+    index = get_quantized_index(persist_dir)
+    mode = get_quantization_mode(quantization)
+    
+    if backend == "numpy":
+        # Scored in float32 directly; the IVF lists are its approximate path
+        if mode != "none":
+            print(f"  [VectorStore] Quantization '{mode}' is not used by the numpy backend")
+        return collection, index, "none"
+    
+    if index.exists:
+        if mode not in ("none", index.mode):
+            print(f"  [VectorStore] Collection is quantized as '{index.mode}', ignoring '{mode}'")
+        return collection, index, index.mode
+    
+    if mode != "none":
+        collection = _quantize_collection(collection_name, persist_dir, collection, index, mode)
+    
+    return collection, index, mode
+
+
+def _quantize_collection(collection_name: str, persist_dir: str, collection, index, mode: str):
+    """
+    Move a collection's float32 vectors into a new quantized index, then
+    recreate its Chroma collection with the same ids, documents and metadata
+    over placeholder vectors. Returns the recreated collection.
+    """
+    existing = collection.get(include=["embeddings", "documents", "metadatas"])
+    if not len(existing["ids"]):
+        return collection
+    
+    vectors = np.asarray(existing["embeddings"], dtype=np.float32)
+    index.create(mode, vectors.shape[1])
+    index.add(existing["ids"], vectors)
+    
+    vectorstore = _open_collection(collection_name, persist_dir)
+    vectorstore.reset_collection()
+    collection = vectorstore._collection
+    
+    batch_size = 4096
+    for start in range(0, len(existing["ids"]), batch_size):
+        ids = existing["ids"][start:start + batch_size]
+        collection.upsert(
+            ids=ids,
+            embeddings=placeholder_vectors(len(ids)),
+            documents=existing["documents"][start:start + batch_size],
+            metadatas=existing["metadatas"][start:start + batch_size]
+        )
+    
+    print(f"🗜️  [VectorStore] Moved {len(existing['ids'])} existing chunks into a {mode} index")
+    return collection
+
+
+def _prepare_keyword_index(collection, persist_dir: str):
+    """The collection's BM25 index, built from the stored chunks the first time it is needed"""
+    index = get_keyword_index(persist_dir)
+    
+    if not index.exists:
+        existing = collection.get(include=["documents"])
+        if len(existing["ids"]):
+            index.add(existing["ids"], existing["documents"])
+            print(f"🔤 [VectorStore] Built keyword index for {len(existing['ids'])} existing chunks")
+    
+    return index
+
+
+def _partition_stored(collection, ids: List[str]):
+    """Positions of ids not yet stored, and of ids already stored"""
+    existing = set(collection.get(ids=ids, include=[])["ids"]) if ids else set()
+    new_positions = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+    kept_positions = [i for i, chunk_id in enumerate(ids) if chunk_id in existing]
+    return new_positions, kept_positions
+
+
+def _store_chunks(collection, quantized, quantization_mode: str, keywords, ids: List[str], chunks: List[str], metadatas: List[Dict], vectors: np.ndarray):
+    """
+    Upsert embedded chunks into the store and keyword index. Quantized
+    collections keep the vectors in the quantized index only; the store gets
+    placeholders. The index is written first, so a chunk the store holds
+    always has its vector.
+    """
+    if quantization_mode != "none":
+        if not quantized.exists:
+            quantized.create(quantization_mode, vectors.shape[1])
+        quantized.add(ids, vectors)
+        vectors = placeholder_vectors(len(ids))
+    
+    collection.upsert(ids=ids, embeddings=vectors, documents=chunks, metadatas=metadatas)
+    keywords.add(ids, chunks)
+
+
+def _update_metadata(collection, ids: List[str], metadatas: List[Dict]):
+    collection.update(ids=ids, metadatas=metadatas)
+
+
+def _replace_source_ids(manifest: SourceManifest, source: str, ids: List[str]) -> List[str]:
+    """Record the source's ids; returns those it produced last time but not now"""
+    current = set(ids)
+    return [chunk_id for chunk_id in manifest.set_ids(source, ids) if chunk_id not in current]
+
+
+def _remove_chunks(collection, quantized, keywords, ids: List[str]):
+    if ids:
+        collection.delete(ids=ids)
+        quantized.remove(ids)
+        keywords.remove(ids)
+
+
+def _record_collection(
+    collection_name: str,
+    persist_dir: str,
+    store,
+    manifest: SourceManifest,
+    backend: str,
+    quantization_mode: str,
+    unnamed_documents: int = 0,
+    indexed: bool = True
+) -> Dict[str, Any]:
+    """
+    Rewrite the collection's metadata record after its writes are done, and
+    bump its generation so cached query results are dropped.
+    Documents are named sources plus unnamed texts that stored new chunks.
+    Counters are incremented on the record as read under its lock.
+    """
+    provider_info = _read_provider_info(collection_name)
+    
+    fields = {
+        "name": collection_name,
+        "chunk_count": store.count(),
+        "bytes": directory_size(persist_dir),
+        "provider": provider_info.get("provider", "unknown"),
+        "model": provider_info.get("model", "unknown"),
+        "created_at": provider_info.get("created_at", "unknown"),
+        "backend": backend,
+        "quantization": quantization_mode
+    }
+    if indexed:
+        fields["last_indexed_at"] = str(datetime.now())
+    
+    def update(record: Dict[str, Any]) -> Dict[str, Any]:
+        unnamed = record.get("unnamed_documents", 0) + unnamed_documents
+        return {
+            **fields,
+            "document_count": manifest.count() + unnamed,
+            "unnamed_documents": unnamed,
+            "generation": record.get("generation", 0) + 1
+        }
+    
+    record = update_record(persist_dir, update)
+    query_cache.invalidate(persist_dir)
+    return record
+
+
 def index_documents(
     file_text: str,
     collection_name: str = "default",
     metadata: Optional[Dict] = None,
     chunking_strategy: str = "recursive",
     chunk_size: Optional[int] = None,
-    chunk_overlap: Optional[int] = None
+    chunk_overlap: Optional[int] = None,
+    quantization: Optional[str] = None,
+    backend: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Index text into vector store.
@@ -148,6 +410,9 @@ def index_documents(
         chunking_strategy: Text splitting strategy
         chunk_size: Custom chunk size
         chunk_overlap: Custom chunk overlap
+        quantization: "int8" or "binary" to keep a quantized search index
+            (fixed when the collection first gets one; default VECTOR_QUANTIZATION)
+        backend: "chroma" or "numpy" (fixed when the collection is created; default VECTOR_BACKEND)
         
     Returns:
         Dict with indexing results
@@ -159,68 +424,586 @@ def index_documents(
         embeddings = _get_embeddings()
         current_provider = os.getenv("EMBEDDING_PROVIDER", "openai")
         
-        # Check embedding compatibility
-        _check_embedding_compatibility(collection_name, current_provider)
-        
         # Get persist directory
-        persist_dir = _get_persist_dir(collection_name)
+        persist_dir = _get_persist_dir(collection_name, create=True)
         
-        # Initialize vector store
-        vectorstore = Chroma(
-            collection_name=collection_name,
-            embedding_function=embeddings,
-            persist_directory=persist_dir
-        )
+        # Handles stay open while this call uses them
+        with chroma_pool.lease(persist_dir):
+            # Check embedding compatibility
+            _check_embedding_compatibility(collection_name, current_provider)
+            
+            # Initialize vector store
+            backend = _resolve_backend(persist_dir, backend)
+            collection = _open_store(collection_name, persist_dir, backend)
+            
+            # Split text into chunks
+            splitter_kwargs = {}
+            if chunk_size:
+                splitter_kwargs["chunk_size"] = chunk_size
+            if chunk_overlap:
+                splitter_kwargs["chunk_overlap"] = chunk_overlap
+            
+            splitter = _get_text_splitter(chunking_strategy, **splitter_kwargs)
+            chunks = splitter.split_text(file_text)
+            
+            print(f"📄 [VectorStore] Split into {len(chunks)} chunks")
+            
+            # Prepare metadata
+            base_metadata = metadata or {}
+            base_metadata["indexed_at"] = str(datetime.now())
+            base_metadata["collection"] = collection_name
+            
+            # Chunks of a source keep their ids across re-indexing; unnamed text is keyed by content only
+            source = base_metadata.get("source") or base_metadata.get("filename") or ""
+            ids = chunk_ids(source, chunks)
+            metadatas = [
+                {
+                    **base_metadata,
+                    "chunk_index": i,
+                    "total_chunks": len(chunks),
+                    "chunk_size": len(chunk)
+                }
+                for i, chunk in enumerate(chunks)
+            ]
+            
+            collection, quantized, quantization_mode = _prepare_quantized_index(collection_name, collection, persist_dir, quantization, backend)
+            keywords = _prepare_keyword_index(collection, persist_dir)
+            manifest = SourceManifest(persist_dir)
+            
+            # Only chunks not already stored need embedding
+            new_positions, kept_positions = _partition_stored(collection, ids)
+            
+            if new_positions:
+                new_chunks = [chunks[i] for i in new_positions]
+                vectors = _embed_documents_array(embeddings, new_chunks)
+                _store_chunks(
+                    collection, quantized, quantization_mode, keywords,
+                    [ids[i] for i in new_positions], new_chunks, [metadatas[i] for i in new_positions], vectors
+                )
+            
+            if kept_positions:
+                # Positions may have shifted; refresh metadata without re-embedding
+                _update_metadata(collection, [ids[i] for i in kept_positions], [metadatas[i] for i in kept_positions])
+            
+            # Chunks this source produced last time but not now
+            removed_ids = []
+            if source:
+                removed_ids = _replace_source_ids(manifest, source, ids)
+                _remove_chunks(collection, quantized, keywords, removed_ids)
+            
+            _record_collection(
+                collection_name, persist_dir, collection, manifest, backend, quantization_mode,
+                unnamed_documents=int(not source and bool(new_positions))
+            )
+            
+            result = {
+                "status": "success",
+                "chunks_indexed": len(chunks),
+                "chunks_added": len(new_positions),
+                "chunks_unchanged": len(kept_positions),
+                "chunks_removed": len(removed_ids),
+                "collection": collection_name,
+                "filename": base_metadata.get("filename", "unknown"),
+                "provider": current_provider,
+                "backend": backend,
+                "quantization": quantization_mode
+            }
+            
+            print(f" [VectorStore] Indexed {len(chunks)} chunks: {len(new_positions)} new, {len(kept_positions)} unchanged, {len(removed_ids)} removed")
+            
+            return result
+    
+    except Exception as e:
+        print(f" [VectorStore] Indexing error: {str(e)}")
+        raise VectorStoreError(f"Failed to index documents: {str(e)}")
+
+
+class IngestSession:
+    """
+    Write access to one collection for streaming ingestion pipelines
+    (bulk_index_documents, the pdf_ingest feature).
+    
+    Producers split text and tag chunks via id_generator()/chunk_metadata();
+    embed_batch() skips chunks already stored and embeds the rest;
+    write_batch() upserts the result. Stages may run on different threads,
+    but writes (write_batch/remove) should come from a single writer.
+    finish() updates the collection's metadata record once writes are done
+    and releases the session's lease on the pooled Chroma client.
+    """
+    
+    def __init__(
+        self,
+        collection_name: str = "default",
+        metadata: Optional[Dict] = None,
+        chunking_strategy: str = "recursive",
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+        quantization: Optional[str] = None,
+        backend: Optional[str] = None
+    ):
+        self.collection_name = collection_name
+        self.embeddings = _get_embeddings()
+        self.provider = os.getenv("EMBEDDING_PROVIDER", "openai")
+        
+        self.persist_dir = _get_persist_dir(collection_name, create=True)
+        _check_embedding_compatibility(collection_name, self.provider)
+        
+        self.backend = _resolve_backend(self.persist_dir, backend)
+        chroma_pool.acquire(self.persist_dir)
+        self._leased = True
+        try:
+            self.collection = _open_store(collection_name, self.persist_dir, self.backend)
+            self.collection, self.quantized, self.quantization_mode = _prepare_quantized_index(
+                collection_name, self.collection, self.persist_dir, quantization, self.backend
+            )
+            self.keywords = _prepare_keyword_index(self.collection, self.persist_dir)
+        except Exception:
+            self._release()
+            raise
+        self.manifest = SourceManifest(self.persist_dir)
         
-        # Split text into chunks
         splitter_kwargs = {}
         if chunk_size:
             splitter_kwargs["chunk_size"] = chunk_size
         if chunk_overlap:
             splitter_kwargs["chunk_overlap"] = chunk_overlap
+        self.splitter = _get_text_splitter(chunking_strategy, **splitter_kwargs)
         
-        splitter = _get_text_splitter(chunking_strategy, **splitter_kwargs)
-        chunks = splitter.split_text(file_text)
+        self.base_metadata = {**(metadata or {}), "indexed_at": str(datetime.now()), "collection": collection_name}
         
-        print(f"📄 [VectorStore] Split into {len(chunks)} chunks")
+        # New chunks embedded so far, to tell whether an unnamed text added anything
+        self._embedded = 0
+        self._embedded_at_source = 0
+        self._unnamed_documents = 0
+        self._lock = threading.Lock()
+    
+    def id_generator(self, source: str) -> ChunkIdGenerator:
+        return ChunkIdGenerator(source)
+    
+    def chunk_metadata(self, source_metadata: Dict, chunk_index: int, chunk: str) -> Dict:
+        return {**self.base_metadata, **source_metadata, "chunk_index": chunk_index, "chunk_size": len(chunk)}
+    
+    def embed_batch(self, batch: List[tuple]) -> Dict[str, Any]:
+        """Embed the not-yet-stored chunks of a batch of (id, chunk, metadata)"""
+        # Same id twice in one batch (identical unnamed texts) would be rejected by Chroma
+        unique = list({chunk_id: (chunk_id, chunk, meta) for chunk_id, chunk, meta in batch}.values())
+        ids = [chunk_id for chunk_id, _, _ in unique]
+        new_positions, kept_positions = _partition_stored(self.collection, ids)
         
-        # Prepare metadata
-        base_metadata = metadata or {}
-        base_metadata["indexed_at"] = str(datetime.now())
-        base_metadata["collection"] = collection_name
+        new_chunks = [unique[i][1] for i in new_positions]
+        with self._lock:
+            self._embedded += len(new_chunks)
+        return {
+            "new_ids": [ids[i] for i in new_positions],
+            "new_chunks": new_chunks,
+            "new_metadatas": [unique[i][2] for i in new_positions],
+            "vectors": _embed_documents_array(self.embeddings, new_chunks) if new_chunks else None,
+            "kept_ids": [ids[i] for i in kept_positions],
+            "kept_metadatas": [unique[i][2] for i in kept_positions],
+            "chunks": len(batch),
+            "chars": sum(len(chunk) for _, chunk, _ in batch)
+        }
+    
+    def write_batch(self, embedded: Dict[str, Any]):
+        if embedded["new_ids"]:
+            _store_chunks(
+                self.collection, self.quantized, self.quantization_mode, self.keywords,
+                embedded["new_ids"], embedded["new_chunks"], embedded["new_metadatas"], embedded["vectors"]
+            )
+        if embedded["kept_ids"]:
+            # Positions may have shifted; refresh metadata without re-embedding
+            _update_metadata(self.collection, embedded["kept_ids"], embedded["kept_metadatas"])
+        query_cache.invalidate(self.persist_dir)
+    
+    def finish_source(self, source: str, ids: List[str]) -> List[str]:
+        """Record a named source's chunk ids; returns the ids it no longer produces"""
+        with self._lock:
+            if not source and self._embedded > self._embedded_at_source:
+                self._unnamed_documents += 1
+            self._embedded_at_source = self._embedded
         
-        # Create documents with metadata
-        docs = [
-            Document(
-                page_content=chunk,
-                metadata={
-                    **base_metadata,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                    "chunk_size": len(chunk)
-                }
+        if not source:
+            return []
+        return _replace_source_ids(self.manifest, source, ids)
+    
+    def remove(self, ids: List[str]):
+        _remove_chunks(self.collection, self.quantized, self.keywords, ids)
+        query_cache.invalidate(self.persist_dir)
+    
+    def finish(self) -> Dict[str, Any]:
+        """Update the collection's metadata record and release the session; call after the last write"""
+        try:
+            record = _record_collection(
+                self.collection_name, self.persist_dir, self.collection, self.manifest,
+                self.backend, self.quantization_mode, unnamed_documents=self._unnamed_documents
             )
-            for i, chunk in enumerate(chunks)
-        ]
+            self._unnamed_documents = 0
+            return record
+        finally:
+            self._release()
+    
+    def _release(self):
+        if self._leased:
+            self._leased = False
+            chroma_pool.release(self.persist_dir)
+
+
+def bulk_index_documents(
+    sources: Iterable[Any],
+    collection_name: str = "default",
+    metadata: Optional[Dict] = None,
+    chunking_strategy: str = "recursive",
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    quantization: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    backend: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Stream many documents into the vector store with bounded memory.
+    
+    Sources are read in paragraph-aligned segments and split lazily; chunks are
+    embedded `batch_size` at a time and upserted by a background writer behind a
+    queue of `queue_size` batches. Peak memory is about batch_size * (queue_size + 1)
+    chunks, independent of corpus size. Unchanged chunks are skipped and chunks
+    removed from a named source are deleted, as in index_documents.
+    
+    Args:
+        sources: Iterable of texts, {"text", "metadata"} or {"path", "metadata"} items
+        collection_name: Name of the collection
+        metadata: Metadata applied to every chunk (per-source metadata wins)
+        chunking_strategy, chunk_size, chunk_overlap, quantization, backend: as in index_documents
+        batch_size: Chunks per embedding/upsert batch (default VECTOR_INGEST_BATCH_SIZE)
+        queue_size: Batches waiting for the writer (default VECTOR_INGEST_QUEUE_SIZE)
+        
+    Returns:
+        Dict with ingestion counts and throughput
+    """
+    try:
+        print(f"📥 [VectorStore] Bulk ingesting into collection: {collection_name}")
+        
+        conf = get_ingest_config(batch_size, queue_size)
+        session = IngestSession(collection_name, metadata, chunking_strategy, chunk_size, chunk_overlap, quantization, backend)
+        
+        writer = WriteBehindWriter(conf["queue_size"])
+        progress = IngestProgress(f"Ingest '{collection_name}'")
+        removed = 0
+        
+        def flush(batch: List[tuple]):
+            embedded = session.embed_batch(batch)
+            writer.submit(session.write_batch, embedded)
+            progress.add(embedded["chunks"], len(embedded["new_ids"]), embedded["chars"])
         
-        # Add to vector store
-        vectorstore.add_documents(docs)
+        try:
+            for source, source_metadata, segments in iter_sources(sources):
+                id_generator = session.id_generator(source)
+                source_ids = []
+                batch = []
+                
+                for segment in segments:
+                    for chunk in session.splitter.split_text(segment):
+                        chunk_id = id_generator.next_id(chunk)
+                        batch.append((chunk_id, chunk, session.chunk_metadata(source_metadata, len(source_ids), chunk)))
+                        source_ids.append(chunk_id)
+                        
+                        if len(batch) >= conf["batch_size"]:
+                            flush(batch)
+                            batch = []
+                
+                if batch:
+                    flush(batch)
+                
+                stale = session.finish_source(source, source_ids)
+                if stale:
+                    writer.submit(session.remove, stale)
+                    removed += len(stale)
+                
+                progress.sources += 1
+        finally:
+            writer.close()
+            # Also after a failure: whatever was written is reflected in stats
+            session.finish()
         
+        summary = progress.summary()
         result = {
             "status": "success",
-            "chunks_indexed": len(docs),
+            "sources": summary["sources"],
+            "chunks_indexed": summary["chunks"],
+            "chunks_added": summary["embedded"],
+            "chunks_unchanged": summary["chunks"] - summary["embedded"],
+            "chunks_removed": removed,
             "collection": collection_name,
-            "filename": base_metadata.get("filename", "unknown"),
-            "provider": current_provider
+            "provider": session.provider,
+            "backend": session.backend,
+            "quantization": session.quantization_mode,
+            "throughput": summary
         }
         
-        print(f" [VectorStore] Indexed {len(docs)} chunks successfully")
+        print(
+            f" [VectorStore] Ingested {summary['sources']} sources, {summary['chunks']} chunks "
+            f"({summary['embedded']} new, {removed} removed) in {summary['seconds']}s - "
+            f"{summary['chunks_per_second']} chunks/s, {summary['megabytes_per_second']} MB/s"
+        )
         
         return result
     
     except Exception as e:
-        print(f" [VectorStore] Indexing error: {str(e)}")
-        raise VectorStoreError(f"Failed to index documents: {str(e)}")
+        print(f" [VectorStore] Bulk ingestion error: {str(e)}")
+        raise VectorStoreError(f"Failed to ingest documents: {str(e)}")
+
+
+def _embed_queries_array(embeddings, queries: List[str]) -> np.ndarray:
+    """Embed several queries in one call (query-side weighting when the model distinguishes it)"""
+    if hasattr(embeddings, "embed_queries_array"):
+        return embeddings.embed_queries_array(queries)
+    return _embed_documents_array(embeddings, queries)
+
+
+def _numpy_search(index, query_vectors: np.ndarray, k: int, filter_metadata: Optional[Dict]) -> List[List[tuple]]:
+    """
+    Cosine top-k per query on the NumPy backend (metadata filters applied
+    before scoring), scored on Chroma's relevance scale
+    """
+    return [
+        [
+            (Document(page_content=document, metadata=metadata, id=id_), relevance_from_cosine(score))
+            for id_, document, metadata, score in hits
+        ]
+        for hits in index.search_many(query_vectors, k, where=filter_metadata)
+    ]
+
+
+def _chroma_search(vectorstore: Chroma, query_vectors: np.ndarray, k: int, filter_metadata: Optional[Dict]) -> List[List[tuple]]:
+    """One Chroma query for all query vectors; scores use the collection's relevance function"""
+    found = vectorstore._collection.query(
+        query_embeddings=query_vectors,
+        n_results=k,
+        where=filter_metadata or None,
+        include=["documents", "metadatas", "distances"]
+    )
+    relevance = vectorstore._select_relevance_score_fn()
+    
+    return [
+        [
+            (Document(page_content=document, metadata=metadata or {}, id=id_), relevance(distance))
+            for id_, document, metadata, distance in zip(ids, documents, metadatas, distances)
+            if document is not None
+        ]
+        for ids, documents, metadatas, distances in zip(found["ids"], found["documents"], found["metadatas"], found["distances"])
+    ]
+
+
+def _quantized_search(
+    vectorstore: Chroma,
+    quantized,
+    query_vectors: np.ndarray,
+    k: int,
+    oversample: Optional[int],
+    filter_metadata: Optional[Dict] = None
+) -> List[List[tuple]]:
+    """
+    Candidate search on the quantized codes, exact cosine re-ranking on the
+    candidates' float32 rows, then one Chroma call for the documents of all
+    queries. Metadata filters are resolved by Chroma first and restrict the
+    rows scored. Scores are on the relevance scale of unquantized collections.
+    """
+    allowed_ids = None
+    if filter_metadata:
+        allowed_ids = vectorstore._collection.get(where=filter_metadata, include=[])["ids"]
+    
+    hits = quantized.search_many(query_vectors, k, get_oversample(quantized.mode, oversample), allowed_ids)
+    
+    unique_ids = list(dict.fromkeys(id_ for query_hits in hits for id_, _ in query_hits))
+    if not unique_ids:
+        return [[] for _ in hits]
+    
+    found = vectorstore._collection.get(ids=unique_ids, include=["documents", "metadatas"])
+    docs = {
+        id_: Document(page_content=document, metadata=metadata or {}, id=id_)
+        for id_, document, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+    }
+    
+    return [[(docs[id_], relevance_from_cosine(score)) for id_, score in query_hits if id_ in docs] for query_hits in hits]
+
+
+def _vector_search(
+    collection_name: str,
+    persist_dir: str,
+    embeddings,
+    query_vectors: np.ndarray,
+    k: int,
+    filter_metadata: Optional[Dict] = None,
+    rerank_oversample: Optional[int] = None
+) -> List[List[tuple]]:
+    """(Document, relevance score) lists, one per query vector, on whichever backend the collection uses"""
+    if detect_backend(persist_dir) == "numpy":
+        return _numpy_search(get_numpy_index(persist_dir), query_vectors, k, filter_metadata)
+    
+    vectorstore = _open_collection(collection_name, persist_dir)
+    quantized = get_quantized_index(persist_dir)
+    
+    if quantized.exists:
+        return _quantized_search(vectorstore, quantized, query_vectors, k, rerank_oversample, filter_metadata)
+    
+    return _chroma_search(vectorstore, query_vectors, k, filter_metadata)
+
+
+def _hybrid_search(
+    collection_name: str,
+    persist_dir: str,
+    embeddings,
+    queries: List[str],
+    query_vectors: np.ndarray,
+    k: int,
+    filter_metadata: Optional[Dict] = None,
+    rerank_oversample: Optional[int] = None,
+    score_threshold: Optional[float] = None
+) -> List[List[tuple]]:
+    """
+    Vector and BM25 rankings fused with reciprocal rank fusion. Scores are the
+    fused scores (1.0 = ranked first by both), so score_threshold is applied
+    to the vector relevance scores before fusion; keyword matches are kept.
+    """
+    fetch_k = k * HYBRID_CANDIDATES
+    vector_hits = _vector_search(collection_name, persist_dir, embeddings, query_vectors, fetch_k, filter_metadata, rerank_oversample)
+    if score_threshold:
+        vector_hits = [[(doc, score) for doc, score in hits if score >= score_threshold] for hits in vector_hits]
+    
+    store = _open_store(collection_name, persist_dir, detect_backend(persist_dir) or "chroma")
+    keywords = _prepare_keyword_index(store, persist_dir)
+    keyword_ids = [[chunk_id for chunk_id, _ in keywords.search(query, fetch_k)] for query in queries]
+    
+    docs = {doc.id: doc for hits in vector_hits for doc, _ in hits}
+    
+    # Keyword-only candidates: fetched in one call, with the same metadata filter as the vector search
+    missing = list(dict.fromkeys(chunk_id for ids in keyword_ids for chunk_id in ids if chunk_id not in docs))
+    if missing:
+        found = store.get(ids=missing, where=filter_metadata or None, include=["documents", "metadatas"])
+        for chunk_id, document, metadata in zip(found["ids"], found["documents"], found["metadatas"]):
+            docs[chunk_id] = Document(page_content=document, metadata=metadata or {}, id=chunk_id)
+    
+    results = []
+    for hits, ids in zip(vector_hits, keyword_ids):
+        rankings = [[doc.id for doc, _ in hits], [chunk_id for chunk_id in ids if chunk_id in docs]]
+        results.append([(docs[chunk_id], score) for chunk_id, score in reciprocal_rank_fusion(rankings, k)])
+    
+    return results
+
+
+def _search(
+    collection_name: str,
+    persist_dir: str,
+    embeddings,
+    queries: List[str],
+    query_vectors: np.ndarray,
+    k: int,
+    filter_metadata: Optional[Dict] = None,
+    rerank_oversample: Optional[int] = None,
+    search_mode: Optional[str] = None,
+    score_threshold: Optional[float] = None
+) -> List[List[tuple]]:
+    """(Document, score) lists, one per query, for the requested search mode (score_threshold: hybrid only)"""
+    with chroma_pool.lease(persist_dir):
+        if get_search_mode(search_mode) == "hybrid":
+            return _hybrid_search(
+                collection_name, persist_dir, embeddings, queries, query_vectors, k,
+                filter_metadata, rerank_oversample, score_threshold
+            )
+        return _vector_search(collection_name, persist_dir, embeddings, query_vectors, k, filter_metadata, rerank_oversample)
+
+
+def _cached_query_vectors(queries: List[str]) -> tuple:
+    """
+    Query embeddings, from the cache where possible; misses are embedded in one
+    call. Returns the vectors and the embeddings model (None if it was not needed).
+    """
+    model_key = _get_embeddings_key()
+    vectors = [query_cache.get_embedding(query, model_key) for query in queries]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    embeddings = None
+    
+    if missing:
+        embeddings = _get_embeddings()
+        if len(missing) == 1:
+            embedded = _embed_query_array(embeddings, queries[missing[0]])[None, :]
+        else:
+            embedded = _embed_queries_array(embeddings, [queries[i] for i in missing])
+        for i, vector in zip(missing, embedded):
+            query_cache.put_embedding(queries[i], model_key, vector)
+            vectors[i] = vector
+    
+    return np.stack(vectors), embeddings
+
+
+def _cached_search(
+    collection_name: str,
+    persist_dir: str,
+    queries: List[str],
+    k: int,
+    filter_metadata: Optional[Dict] = None,
+    rerank_oversample: Optional[int] = None,
+    search_mode: Optional[str] = None,
+    score_threshold: Optional[float] = None
+) -> tuple:
+    """
+    (Document, score) lists per query, and how many came from the result cache.
+    Only queries missing from it are searched, and the embeddings provider is
+    only loaded when one of their embeddings is not cached either. Hybrid
+    searches apply score_threshold before fusion; vector results are not
+    filtered here.
+    """
+    mode = get_search_mode(search_mode)
+    vector_threshold = score_threshold if mode == "hybrid" else None
+    generation = query_cache.generation(persist_dir, read_record(persist_dir))
+    keys = [
+        query_cache.result_key(persist_dir, generation, query, k, filter_metadata, mode, rerank_oversample, vector_threshold)
+        for query in queries
+    ]
+    results = [query_cache.get_results(key) for key in keys]
+    missing = [i for i, found in enumerate(results) if found is None]
+    
+    if missing:
+        missing_queries = [queries[i] for i in missing]
+        query_vectors, embeddings = _cached_query_vectors(missing_queries)
+        
+        found = _search(
+            collection_name, persist_dir, embeddings, missing_queries, query_vectors, k,
+            filter_metadata, rerank_oversample, mode, vector_threshold
+        )
+        for i, hits in zip(missing, found):
+            results[i] = hits
+            query_cache.put_results(keys[i], hits)
+    
+    return results, len(queries) - len(missing)
+
+
+def _format_context(docs: List[Document], scores: List[Optional[float]], include_sources: bool) -> tuple:
+    """Context string and source list for retrieved chunks"""
+    context_parts = []
+    sources = []
+    
+    for i, (doc, score) in enumerate(zip(docs, scores)):
+        source_info = {
+            "filename": doc.metadata.get("filename", "Unknown"),
+            "chunk_index": doc.metadata.get("chunk_index", i),
+            "indexed_at": doc.metadata.get("indexed_at", "Unknown")
+        }
+        
+        if score is not None:
+            source_info["relevance_score"] = round(score, 3)
+        
+        sources.append(source_info)
+        
+        if include_sources:
+            source_label = f"[Source: {source_info['filename']}]"
+            if score:
+                source_label += f" (Relevance: {round(score, 2)})"
+            context_parts.append(f"{source_label}\n{doc.page_content}")
+        else:
+            context_parts.append(doc.page_content)
+    
+    return "\n\n---\n\n".join(context_parts), sources
 
 
 def retrieve_context(
@@ -229,7 +1012,9 @@ def retrieve_context(
     k: int = 3,
     filter_metadata: Optional[Dict] = None,
     score_threshold: Optional[float] = None,
-    include_sources: bool = True
+    include_sources: bool = True,
+    rerank_oversample: Optional[int] = None,
+    search_mode: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Retrieve relevant context from vector store.
@@ -239,8 +1024,15 @@ def retrieve_context(
         collection_name: Name of the collection
         k: Number of results to retrieve
         filter_metadata: Optional metadata filters
-        score_threshold: Minimum relevance score (0-1)
+        score_threshold: Minimum relevance score (0-1); in hybrid mode it
+            applies to the vector ranking before fusion
         include_sources: Include source metadata in output
+        rerank_oversample: Quantized collections: candidates per result to re-rank exactly
+        search_mode: "vector", or "hybrid" to fuse BM25 keyword and vector rankings
+            (default VECTOR_SEARCH_MODE)
+        
+    Query embeddings and results are cached until the collection is next
+    written (see query_cache).
         
     Returns:
         Dict with context and metadata
@@ -249,80 +1041,137 @@ def retrieve_context(
         print(f"🔍 [VectorStore] Searching collection: {collection_name}")
         print(f"   Query: {query[:100]}...")
         
-        # Get embeddings
-        embeddings = _get_embeddings()
         persist_dir = _get_persist_dir(collection_name)
         
         # Check if collection exists
         if not os.path.exists(persist_dir):
             raise CollectionNotFoundError(f"Collection '{collection_name}' does not exist")
         
-        # Initialize vector store
-        vectorstore = Chroma(
-            collection_name=collection_name,
-            embedding_function=embeddings,
-            persist_directory=persist_dir
+        # Perform search (repeated queries are answered from the query cache)
+        mode = get_search_mode(search_mode)
+        found, cached = _cached_search(
+            collection_name, persist_dir, [query], k, filter_metadata, rerank_oversample, mode, score_threshold
         )
+        results = found[0]
         
-        # Perform search
-        if score_threshold:
-            results = vectorstore.similarity_search_with_relevance_scores(
-                query,
-                k=k,
-                filter=filter_metadata
-            )
-            # Filter by threshold
-            filtered_results = [(doc, score) for doc, score in results if score >= score_threshold]
-            docs = [doc for doc, score in filtered_results]
-            scores = [score for doc, score in filtered_results]
-        else:
-            docs = vectorstore.similarity_search(
-                query,
-                k=k,
-                filter=filter_metadata
-            )
-            scores = [None] * len(docs)
+        if score_threshold and mode == "vector":
+            results = [(doc, score) for doc, score in results if score >= score_threshold]
+        docs = [doc for doc, score in results]
+        scores = [score if score_threshold else None for doc, score in results]
         
         if not docs:
             print(f"  [VectorStore] No results found")
             return {
                 "context": "",
                 "num_results": 0,
-                "sources": []
+                "sources": [],
+                "cached": bool(cached)
             }
         
-        print(f" [VectorStore] Found {len(docs)} relevant chunks")
+        print(f" [VectorStore] Found {len(docs)} relevant chunks" + (" (cached)" if cached else ""))
         
-        # Format results
-        context_parts = []
-        sources = []
+        context, sources = _format_context(docs, scores, include_sources)
         
-        for i, (doc, score) in enumerate(zip(docs, scores)):
-            source_info = {
-                "filename": doc.metadata.get("filename", "Unknown"),
-                "chunk_index": doc.metadata.get("chunk_index", i),
-                "indexed_at": doc.metadata.get("indexed_at", "Unknown")
-            }
+        return {
+            "context": context,
+            "num_results": len(docs),
+            "sources": sources,
+            "collection": collection_name,
+            "cached": bool(cached)
+        }
+    
+    except CollectionNotFoundError:
+        raise
+    except Exception as e:
+        print(f" [VectorStore] Retrieval error: {str(e)}")
+        raise VectorStoreError(f"Failed to retrieve context: {str(e)}")
+
+
+def retrieve_many(
+    queries: List[str],
+    collection_name: str = "default",
+    k: int = 3,
+    filter_metadata: Optional[Dict] = None,
+    score_threshold: Optional[float] = None,
+    include_sources: bool = True,
+    deduplicate: bool = False,
+    rerank_oversample: Optional[int] = None,
+    search_mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Retrieve context for several queries at once: all queries are embedded in
+    one call and searched in one batched nearest-neighbour query.
+    
+    Args:
+        queries: Search queries
+        collection_name, k, filter_metadata, score_threshold, include_sources,
+        rerank_oversample, search_mode: as in retrieve_context (k applies per query)
+        deduplicate: Skip chunks already returned for an earlier query; each
+            query still gets up to k chunks
+        
+    Returns:
+        Dict with per-query results (query, context, num_results, sources) in query order
+    """
+    try:
+        print(f"🔍 [VectorStore] Searching collection: {collection_name} ({len(queries)} queries)")
+        
+        persist_dir = _get_persist_dir(collection_name)
+        
+        if not os.path.exists(persist_dir):
+            raise CollectionNotFoundError(f"Collection '{collection_name}' does not exist")
+        
+        if not queries:
+            return {"results": [], "num_queries": 0, "duplicates_skipped": 0, "cached": 0, "collection": collection_name}
+        
+        # Enough candidates that every query can still fill k after skipping earlier queries' chunks
+        fetch_k = k * len(queries) if deduplicate else k
+        mode = get_search_mode(search_mode)
+        hits, cached = _cached_search(
+            collection_name, persist_dir, queries, fetch_k, filter_metadata, rerank_oversample, mode, score_threshold
+        )
+        
+        seen = set()
+        duplicates = 0
+        results = []
+        
+        for query, found in zip(queries, hits):
+            if score_threshold and mode == "vector":
+                found = [(doc, score) for doc, score in found if score >= score_threshold]
+            
+            selected = []
+            for doc, score in found:
+                if len(selected) == k:
+                    break
+                key = doc.id or doc.page_content
+                if deduplicate and key in seen:
+                    duplicates += 1
+                    continue
+                selected.append((doc, score))
             
-            if score is not None:
-                source_info["relevance_score"] = round(score, 3)
+            if deduplicate:
+                seen.update(doc.id or doc.page_content for doc, _ in selected)
             
-            sources.append(source_info)
+            docs = [doc for doc, score in selected]
+            scores = [score if score_threshold else None for doc, score in selected]
+            context, sources = _format_context(docs, scores, include_sources)
             
-            if include_sources:
-                source_label = f"[Source: {source_info['filename']}]"
-                if score:
-                    source_label += f" (Relevance: {round(score, 2)})"
-                context_parts.append(f"{source_label}\n{doc.page_content}")
-            else:
-                context_parts.append(doc.page_content)
+            results.append({
+                "query": query,
+                "context": context,
+                "num_results": len(docs),
+                "sources": sources
+            })
         
-        context = "\n\n---\n\n".join(context_parts)
+        print(
+            f" [VectorStore] Found {sum(r['num_results'] for r in results)} chunks for {len(queries)} queries "
+            f"({duplicates} duplicates skipped, {cached} cached)"
+        )
         
         return {
-            "context": context,
-            "num_results": len(docs),
-            "sources": sources,
+            "results": results,
+            "num_queries": len(queries),
+            "duplicates_skipped": duplicates,
+            "cached": cached,
             "collection": collection_name
         }
     
@@ -336,14 +1185,7 @@ def retrieve_context(
 def list_collections() -> List[str]:
     """List all vector store collections"""
     try:
-        base_dir = os.getenv("VECTOR_DB_PATH")
-        
-        if not base_dir:
-            base_dir = os.path.join(
-                os.path.expanduser("~"),
-                ".ai-builder",
-                "vector_dbs"
-            )
+        base_dir = _get_base_dir()
         
         if not os.path.exists(base_dir):
             return []
@@ -366,6 +1208,14 @@ def delete_collection(collection_name: str) -> bool:
         persist_dir = _get_persist_dir(collection_name)
         
         if os.path.exists(persist_dir):
+            # Release open files before removing them
+            chroma_pool.close(persist_dir)
+            drop_quantized_index(persist_dir)
+            drop_numpy_index(persist_dir)
+            drop_keyword_index(persist_dir)
+            drop_record(persist_dir)
+            query_cache.invalidate(persist_dir)
+            _created_dirs.discard(persist_dir)
             shutil.rmtree(persist_dir)
             print(f"🗑️  [VectorStore] Deleted collection: {collection_name}")
             return True
@@ -378,58 +1228,128 @@ def delete_collection(collection_name: str) -> bool:
         raise VectorStoreError(f"Failed to delete collection: {str(e)}")
 
 
-def get_collection_stats(collection_name: str) -> Dict[str, Any]:
-    """Get statistics about a collection"""
+def _load_record(collection_name: str, persist_dir: str) -> Dict[str, Any]:
+    """
+    The collection's metadata record. Collections indexed before records were
+    kept get one built once from the store (no embeddings model needed).
+    """
+    record = read_record(persist_dir)
+    if record is not None:
+        return record
+    
+    backend = detect_backend(persist_dir) or "chroma"
+    quantized = get_quantized_index(persist_dir)
+    print(f"🧾 [VectorStore] Building metadata record for collection: {collection_name}")
+    
+    with chroma_pool.lease(persist_dir):
+        store = _open_store(collection_name, persist_dir, backend)
+        return _record_collection(
+            collection_name, persist_dir, store, SourceManifest(persist_dir), backend,
+            quantized.mode if quantized.exists else "none", indexed=False
+        )
+
+
+def _stats_from_record(persist_dir: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": record["name"],
+        "document_count": record.get("document_count", 0),
+        "chunk_count": record.get("chunk_count", 0),
+        "bytes": record.get("bytes", 0),
+        "size_mb": round(record.get("bytes", 0) / (1024 * 1024), 2),
+        "path": persist_dir,
+        "provider": record.get("provider", "unknown"),
+        "created_at": record.get("created_at", "unknown"),
+        "model": record.get("model", "unknown"),
+        "last_indexed_at": record.get("last_indexed_at"),
+        "backend": record.get("backend", "chroma"),
+        "quantization": record.get("quantization", "none")
+    }
+
+
+def get_collection_stats(collection_name: str, detailed: bool = False) -> Dict[str, Any]:
+    """
+    Get statistics about a collection, read from its metadata record.
+    
+    Args:
+        collection_name: Name of the collection
+        detailed: Also load the collection's indexes and report their internals
+            (vector backend, quantized and keyword index sizes)
+    """
     try:
         persist_dir = _get_persist_dir(collection_name)
         
         if not os.path.exists(persist_dir):
             raise CollectionNotFoundError(f"Collection '{collection_name}' does not exist")
         
-        # Read provider info
-        provider_file = _get_provider_file(collection_name)
-        provider_info = {}
+        stats = _stats_from_record(persist_dir, _load_record(collection_name, persist_dir))
         
-        if os.path.exists(provider_file):
-            with open(provider_file, 'r') as f:
-                provider_info = json.load(f)
+        if detailed:
+            stats["indexes"] = {
+                "backend": get_numpy_index(persist_dir).stats() if stats["backend"] == "numpy" else {"backend": "chroma"},
+                "quantization": get_quantized_index(persist_dir).stats(),
+                "keywords": get_keyword_index(persist_dir).stats()
+            }
         
-        # Get embeddings and initialize vectorstore
-        embeddings = _get_embeddings()
-        vectorstore = Chroma(
-            collection_name=collection_name,
-            embedding_function=embeddings,
-            persist_directory=persist_dir
-        )
+        return stats
+    
+    except CollectionNotFoundError:
+        raise
+    except Exception as e:
+        print(f" [VectorStore] Error getting stats: {str(e)}")
+        raise VectorStoreError(f"Failed to get collection stats: {str(e)}")
+
+
+def list_collection_stats() -> List[Dict[str, Any]]:
+    """Stats of every collection, from their metadata records"""
+    stats = []
+    for collection_name in list_collections():
+        persist_dir = _get_persist_dir(collection_name)
+        try:
+            stats.append(_stats_from_record(persist_dir, _load_record(collection_name, persist_dir)))
+        except Exception as e:
+            print(f"  [VectorStore] No stats for collection '{collection_name}': {str(e)}")
+    return stats
+
+
+def evaluate_quantization(
+    collection_name: str,
+    k: int = 10,
+    sample_size: int = 100,
+    rerank_oversample: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Recall of the collection's quantized search versus exact float32 search,
+    with and without re-ranking, plus the memory saved by keeping only the
+    codes in memory.
+    """
+    try:
+        persist_dir = _get_persist_dir(collection_name)
+        quantized = get_quantized_index(persist_dir)
+        
+        if not quantized.exists:
+            raise InvalidOperationError(
+                f"Collection '{collection_name}' is not quantized. Index with quantization 'int8' or 'binary' first."
+            )
         
-        # Get collection count
-        collection = vectorstore._collection
-        count = collection.count()
+        if not quantized.count():
+            raise CollectionNotFoundError(f"Collection '{collection_name}' is empty")
         
-        # Calculate directory size
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk(persist_dir):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                total_size += os.path.getsize(filepath)
+        report = quantized.evaluate_recall(
+            k=k,
+            oversample=get_oversample(quantized.mode, rerank_oversample),
+            sample_size=sample_size
+        )
+        report["collection"] = collection_name
         
-        size_mb = total_size / (1024 * 1024)
+        print(f"📏 [VectorStore] {report['mode']} recall@{report['k']}: {report['recall_candidates']} candidates, {report['recall_reranked']} re-ranked")
         
-        return {
-            "name": collection_name,
-            "document_count": count,
-            "size_mb": round(size_mb, 2),
-            "path": persist_dir,
-            "provider": provider_info.get("provider", "unknown"),
-            "created_at": provider_info.get("created_at", "unknown"),
-            "model": provider_info.get("model", "unknown")
-        }
+        return report
     
-    except CollectionNotFoundError:
+    except (InvalidOperationError, CollectionNotFoundError):
         raise
     except Exception as e:
-        print(f" [VectorStore] Error getting stats: {str(e)}")
-        raise VectorStoreError(f"Failed to get collection stats: {str(e)}")
+        print(f" [VectorStore] Recall evaluation error: {str(e)}")
+        raise VectorStoreError(f"Failed to evaluate quantization: {str(e)}")
 
 
 def process(
@@ -445,9 +1365,11 @@ def process(
     Main entry point for vector store operations.
     
     Args:
-        operation: "index", "retrieve", "delete", "list", or "stats"
+        operation: "index", "retrieve", "retrieve_many", "delete", "list", "stats", "cache", or "recall"
         file_text: Text to index (for index operation)
+        sources (kwarg): Texts or {"text"|"path", "metadata"} items to stream in bulk (for index operation)
         query: Search query (for retrieve operation)
+        queries (kwarg): Search queries (for retrieve_many operation)
         collection_name: Collection name
         metadata: Document metadata
         k: Number of results (for retrieve)
@@ -458,8 +1380,28 @@ def process(
     """
     try:
         if operation == "index":
+            if kwargs.get("sources"):
+                # Streaming bulk ingestion of many texts/files
+                result = bulk_index_documents(
+                    collection_name=collection_name,
+                    metadata=metadata,
+                    **kwargs
+                )
+                return {
+                    "result": (
+                        f" Ingested {result['sources']} sources ({result['chunks_indexed']} chunks, "
+                        f"{result['chunks_added']} new, {result['chunks_removed']} removed) into '{collection_name}' "
+                        f"at {result['throughput']['chunks_per_second']} chunks/s"
+                    ),
+                    "metadata": result
+                }
+            
             if not file_text:
-                raise InvalidOperationError("file_text is required for index operation")
+                raise InvalidOperationError("file_text or sources is required for index operation")
+            
+            # Streaming-only options
+            for option in ("sources", "batch_size", "queue_size"):
+                kwargs.pop(option, None)
             
             result = index_documents(
                 file_text=file_text,
@@ -469,7 +1411,10 @@ def process(
             )
             
             return {
-                "result": f" Indexed {result['chunks_indexed']} chunks into '{collection_name}'",
+                "result": (
+                    f" Indexed {result['chunks_indexed']} chunks into '{collection_name}' "
+                    f"({result['chunks_added']} new, {result['chunks_removed']} removed)"
+                ),
                 "metadata": result
             }
         
@@ -489,15 +1434,37 @@ def process(
                 "metadata": {
                     "num_results": result["num_results"],
                     "sources": result["sources"],
-                    "collection": result["collection"]
+                    "collection": result["collection"],
+                    "cached": result["cached"]
                 }
             }
         
+        elif operation == "retrieve_many":
+            queries = kwargs.pop("queries", None) or ([query] if query else [])
+            if not queries:
+                raise InvalidOperationError("queries is required for retrieve_many operation")
+            
+            result = retrieve_many(
+                queries=queries,
+                collection_name=collection_name,
+                k=k,
+                **kwargs
+            )
+            
+            return {
+                "result": "\n\n===\n\n".join(r["context"] for r in result["results"]),
+                "metadata": result
+            }
+        
         elif operation == "list":
-            collections = list_collections()
+            stats = list_collection_stats()
             return {
-                "result": f"Found {len(collections)} collections",
-                "metadata": {"collections": collections}
+                "result": f"Found {len(stats)} collections",
+                "metadata": {
+                    "collections": list_collections(),
+                    "stats": stats,
+                    "pool": chroma_pool.stats()
+                }
             }
         
         elif operation == "delete":
@@ -508,14 +1475,40 @@ def process(
             }
         
         elif operation == "stats":
-            stats = get_collection_stats(collection_name)
+            stats = get_collection_stats(collection_name, detailed=bool(kwargs.get("detailed")))
+            return {
+                "result": (
+                    f"Collection '{collection_name}': {stats['document_count']} documents, "
+                    f"{stats['chunk_count']} chunks ({stats['size_mb']} MB)"
+                ),
+                "metadata": stats
+            }
+        
+        elif operation == "cache":
+            if kwargs.get("clear"):
+                query_cache.clear()
+            stats = query_cache.stats()
             return {
-                "result": f"Collection '{collection_name}': {stats['document_count']} documents ({stats['size_mb']} MB)",
+                "result": (
+                    f"Query cache: {stats['embeddings']['hit_ratio']:.0%} embedding hits, "
+                    f"{stats['results']['hit_ratio']:.0%} result hits"
+                ),
                 "metadata": stats
             }
         
+        elif operation == "recall":
+            report = evaluate_quantization(collection_name, k=k, **kwargs)
+            return {
+                "result": (
+                    f"Collection '{collection_name}' {report['mode']} recall@{report['k']}: "
+                    f"{report['recall_reranked']} re-ranked ({report['recall_candidates']} before), "
+                    f"{report['memory_compression']}x less memory"
+                ),
+                "metadata": report
+            }
+        
         else:
-            raise InvalidOperationError(f"Unknown operation: {operation}. Use 'index', 'retrieve', 'delete', 'list', or 'stats'")
+            raise InvalidOperationError(f"Unknown operation: {operation}. Use 'index', 'retrieve', 'retrieve_many', 'delete', 'list', 'stats', 'cache', or 'recall'")
     
     except (VectorStoreError, InvalidOperationError, CollectionNotFoundError, EmbeddingMismatchError) as e:
         return {
@@ -0,0 +1,234 @@
+"""
+Token-aware text splitter (chunking_strategy="token").
+
+Chunk sizes are counted in tokens of the embedding model's tokenizer, so
+chunks line up with its input limit. Text is cut at the coarsest separator
+that fits (paragraph, line, sentence, word) and small pieces are merged back
+up to chunk_size tokens, with chunk_overlap tokens of trailing pieces repeated
+in the next chunk.
+
+Unlike RecursiveCharacterTextSplitter, it works on offsets, counts each
+piece's tokens once, and only looks again at paragraphs that are too large
+on their own. Every chunk is a substring of the input.
+
+Documents larger than VECTOR_SPLIT_PARALLEL_CHARS are cut at paragraph
+boundaries into one segment per worker and split in a process pool. Chunks
+do not overlap across those cuts. Workers are spawned rather than forked
+(the service runs threads) and load the encoding once each.
+
+Without tiktoken (or when its encoding cannot be loaded), tokens are
+estimated as 4 characters each.
+"""
+
+import os
+import time
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .ingest import iter_text_segments
+
+SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Approximation used without tiktoken
+CHARS_PER_TOKEN = 4
+
+# Delay before loading an encoding that failed to load is tried again
+ENCODER_RETRY_SECONDS = 60
+
+# Hard splits of separator-free runs aim this far below chunk_size
+HARD_SPLIT_MARGIN = 0.9
+
+# Words are grouped into runs of about chunk_size / WORD_RUNS tokens rather than counted one by one
+WORD_RUNS = 8
+
+
+def get_encoder(name: Optional[str] = None) -> Any:
+    """Cached tiktoken encoding (default VECTOR_TOKEN_ENCODING), or None if unavailable"""
+    return _load_encoder(name or os.getenv("VECTOR_TOKEN_ENCODING", DEFAULT_ENCODING))
+
+
+_encoders: Dict[str, Any] = {}
+_encoders_lock = threading.Lock()
+# Encoding name -> time of the last failed load
+_failed: Dict[str, float] = {}
+
+
+def _load_encoder(name: str) -> Any:
+    """
+    Loaded encodings are cached. Failures are not (the encoding download may
+    succeed later) but are retried at most every ENCODER_RETRY_SECONDS and
+    reported once.
+    """
+    with _encoders_lock:
+        encoder = _encoders.get(name)
+        if encoder is not None:
+            return encoder
+        failed_at = _failed.get(name)
+        if failed_at is not None and time.monotonic() - failed_at < ENCODER_RETRY_SECONDS:
+            return None
+        try:
+            import tiktoken
+            encoder = _encoders[name] = tiktoken.get_encoding(name)
+            return encoder
+        except ImportError:
+            message = "tiktoken not installed"
+        except Exception as e:
+            message = f"Token encoding '{name}' unavailable ({str(e)})"
+        if failed_at is None:
+            print(f"  [VectorStore] {message}, estimating {CHARS_PER_TOKEN} characters per token")
+        _failed[name] = time.monotonic()
+        return None
+
+
+def token_counter(encoding: Optional[str] = None) -> Callable[[List[str]], List[int]]:
+    """Function counting the tokens of each text in a list"""
+    encoder = get_encoder(encoding)
+    if encoder is None:
+        return lambda texts: [-(-len(text) // CHARS_PER_TOKEN) for text in texts]
+    # encode_ordinary_batch submits a thread pool task per text, which costs more than encoding short pieces
+    encode = encoder.encode_ordinary
+    return lambda texts: [len(encode(text)) for text in texts]
+
+
+class TokenTextSplitter:
+    """Separator-respecting splitter with token-based chunk sizes."""
+
+    def __init__(
+        self,
+        chunk_size: int = 256,
+        chunk_overlap: int = 32,
+        encoding: Optional[str] = None,
+        workers: Optional[int] = None,
+        parallel_chars: Optional[int] = None
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding = encoding or os.getenv("VECTOR_TOKEN_ENCODING", DEFAULT_ENCODING)
+        self.workers = max(1, workers or int(os.getenv("VECTOR_SPLIT_WORKERS", str(min(os.cpu_count() or 1, 8)))))
+        self.parallel_chars = parallel_chars or int(os.getenv("VECTOR_SPLIT_PARALLEL_CHARS", "2000000"))
+
+    def split_text(self, text: str) -> List[str]:
+        if self.workers > 1 and len(text) > self.parallel_chars:
+            return self._split_parallel(text)
+        return self._split(text)
+
+    def _split(self, text: str) -> List[str]:
+        count = token_counter(self.encoding)
+        pieces: List[Tuple[int, int, int]] = []
+        self._pieces(text, 0, len(text), None, 0, count, pieces)
+        return self._merge(text, pieces)
+
+    def _split_parallel(self, text: str) -> List[str]:
+        segment_chars = -(-len(text) // self.workers)
+        segments = list(iter_text_segments(text, segment_chars))
+        settings = (self.chunk_size, self.chunk_overlap, self.encoding)
+
+        chunks: List[str] = []
+        for segment_chunks in _get_pool(self.workers).map(_split_segment, [(settings, segment) for segment in segments]):
+            chunks.extend(segment_chunks)
+        return chunks
+
+    def _pieces(self, text: str, start: int, end: int, tokens: Optional[int], level: int, count: Callable, out: List[Tuple[int, int, int]]):
+        """Append (start, end, tokens) pieces of text[start:end], each within chunk_size where separators allow"""
+        separator = SEPARATORS[level]
+        # Smallest piece: a word run at the word level, else up to the next separator
+        min_chars = 1
+        if separator == " " and tokens:
+            min_chars = max(1, int((end - start) / tokens * self.chunk_size / WORD_RUNS))
+
+        bounds = []
+        position = start
+        while position < end:
+            cut = text.find(separator, min(position + min_chars, end), end)
+            cut = end if cut < 0 else cut + len(separator)
+            bounds.append((position, cut))
+            position = cut
+
+        sizes = count([text[a:b] for a, b in bounds])
+        for (a, b), size in zip(bounds, sizes):
+            if size <= self.chunk_size:
+                out.append((a, b, size))
+            elif level + 1 < len(SEPARATORS):
+                self._pieces(text, a, b, size, level + 1, count, out)
+            else:
+                # No separator left: cut by the piece's average characters per token
+                step = max(1, int((b - a) / size * self.chunk_size * HARD_SPLIT_MARGIN))
+                for offset in range(a, b, step):
+                    self._fit(text, offset, min(offset + step, b), count, out)
+
+    def _fit(self, text: str, start: int, end: int, count: Callable, out: List[Tuple[int, int, int]]):
+        """Append text[start:end], halved until each half fits chunk_size (token density can vary within a run)"""
+        size = count([text[start:end]])[0]
+        if size <= self.chunk_size or end - start <= 1:
+            out.append((start, end, size))
+            return
+        middle = (start + end) // 2
+        self._fit(text, start, middle, count, out)
+        self._fit(text, middle, end, count, out)
+
+    def _merge(self, text: str, pieces: List[Tuple[int, int, int]]) -> List[str]:
+        """Merge consecutive pieces into chunks of at most chunk_size tokens, repeating up to chunk_overlap"""
+        chunks = []
+        window: List[Tuple[int, int, int]] = []
+        total = 0
+
+        def emit():
+            chunk = text[window[0][0]:window[-1][1]].strip()
+            if chunk:
+                chunks.append(chunk)
+
+        for piece in pieces:
+            tokens = piece[2]
+            if window and total + tokens > self.chunk_size:
+                emit()
+                # Keep trailing pieces as overlap, as long as the new piece still fits
+                drop = 0
+                while drop < len(window) and (total > self.chunk_overlap or total + tokens > self.chunk_size):
+                    total -= window[drop][2]
+                    drop += 1
+                window = window[drop:]
+            window.append(piece)
+            total += tokens
+
+        if window:
+            emit()
+        return chunks
+
+
+def _split_segment(args: Tuple[Tuple[int, int, str], str]) -> List[str]:
+    (chunk_size, chunk_overlap, encoding), segment = args
+    return TokenTextSplitter(chunk_size, chunk_overlap, encoding, workers=1)._split(segment)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool kept between calls (worker start-up and encoder loading are
+    paid once). Workers are spawned: forking a process with running threads
+    (API server, ingestion pipeline) can copy locks held by other threads.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False)
@@ -1,17 +1,59 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 from ..core.service import process
 
+# Optional parameters per operation, taken from inputs or node config
+OPERATION_PARAMS = {
+    "index": ("chunking_strategy", "chunk_size", "chunk_overlap", "quantization", "backend", "sources", "batch_size", "queue_size"),
+    "retrieve": ("score_threshold", "include_sources", "rerank_oversample", "search_mode"),
+    "retrieve_many": ("queries", "score_threshold", "include_sources", "deduplicate", "rerank_oversample", "search_mode"),
+    "stats": ("detailed",),
+    "cache": ("clear",),
+    "recall": ("sample_size", "rerank_oversample")
+}
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def _as_queries(value: Any) -> List[str]:
+    """A list of queries, or one query per line"""
+    if isinstance(value, str):
+        return [line.strip() for line in value.splitlines() if line.strip()]
+    return [str(query) for query in value]
+
+
+# Node config values arrive as strings
+PARAM_TYPES = {
+    "queries": _as_queries,
+    "include_sources": _as_bool,
+    "deduplicate": _as_bool,
+    "detailed": _as_bool,
+    "clear": _as_bool,
+    "chunk_size": int,
+    "chunk_overlap": int,
+    "batch_size": int,
+    "queue_size": int,
+    "rerank_oversample": int,
+    "sample_size": int,
+    "score_threshold": float
+}
+
 
 def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
     """
     Runtime adapter for vector store operations.
     
     Supports multiple operations:
-    - index: Store documents in vector DB
+    - index: Store documents in vector DB (file_text, or streamed bulk `sources`)
     - retrieve: Search for relevant context
+    - retrieve_many: Search for several queries in one batched call
     - delete: Remove a collection
     - list: List all collections
     - stats: Get collection statistics
+    - cache: Query cache hit ratios (clear=True empties it)
+    - recall: Quantized search recall versus exact search
     """
     print(f"--- [Runtime] Executing Vector Store ---")
     
@@ -32,6 +74,12 @@ def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
     if "k" in node_config:
         k = int(node_config["k"])
     
+    options = {}
+    for name in OPERATION_PARAMS.get(operation, ()):
+        value = node_config.get(name, inputs.get(name))
+        if value is not None and value != "":
+            options[name] = PARAM_TYPES[name](value) if name in PARAM_TYPES else value
+    
     print(f"   Operation: {operation}")
     print(f"   Collection: {collection_name}")
     
@@ -43,7 +91,8 @@ def run(inputs: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
             query=query,
             collection_name=collection_name,
             metadata=metadata,
-            k=k
+            k=k,
+            **options
         )
         
         return {